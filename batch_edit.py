@@ -0,0 +1,141 @@
+"""
+Batch editing of parameter values across many profile files.
+
+A rule selects parameters by a case-insensitive name pattern (with * and ?
+wildcards) and sets, scales or clamps their values. Files are processed in
+chunks through ProfileScanner.map_chunks, so large batches run on worker
+processes. Each file is read, edited and written back atomically with only the
+changed values re-emitted.
+"""
+import os
+import re
+import fnmatch
+import logging
+from collections import namedtuple
+
+import json_codec
+from profile_io import read_with_snapshot, is_modified_since, write_if_changed
+from format_preserving_json import dumps_preserving
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('BATCH_EDIT')
+
+OPERATION_SET = "set"
+OPERATION_SCALE = "scale"
+OPERATION_CLAMP = "clamp"
+
+# What to change: value is the new value for set and the factor for scale;
+# minimum/maximum bound clamp and may be None
+EditRule = namedtuple("EditRule", ["pattern", "operation", "value", "minimum", "maximum"])
+
+# Outcome for one file
+FileEditResult = namedtuple("FileEditResult", ["file_name", "file_path", "matched", "changed", "written", "error"])
+
+
+class BatchEditCancelled(Exception):
+    """Raised when a batch edit is cancelled before it finishes."""
+
+
+def compile_pattern(pattern):
+    """Return a compiled, case-insensitive regex for a wildcard name pattern."""
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def apply_rule(value, rule):
+    """Return the value after applying the rule (unchanged if it doesn't apply)."""
+    if rule.operation == OPERATION_SET:
+        return rule.value
+    if not _is_number(value):
+        return value
+    if rule.operation == OPERATION_SCALE:
+        return value * rule.value
+    if rule.operation == OPERATION_CLAMP:
+        if rule.minimum is not None and value < rule.minimum:
+            return rule.minimum
+        if rule.maximum is not None and value > rule.maximum:
+            return rule.maximum
+    return value
+
+
+def edit_document(document, rule, matcher=None):
+    """Apply the rule to every matching value in a parsed profile, in place.
+
+    Returns (matched, changed) counts.
+    """
+    matcher = matcher or compile_pattern(rule.pattern)
+    matched = changed = 0
+    saved_settings = document.get("savedSettings") if isinstance(document, dict) else None
+    for profile in saved_settings if isinstance(saved_settings, list) else []:
+        values = profile.get("values") if isinstance(profile, dict) else None
+        for value_obj in values if isinstance(values, list) else []:
+            if not isinstance(value_obj, dict) or "value" not in value_obj:
+                continue
+            if not matcher.match(str(value_obj.get("name", ""))):
+                continue
+            matched += 1
+            new_value = apply_rule(value_obj["value"], rule)
+            if new_value != value_obj["value"]:
+                value_obj["value"] = new_value
+                changed += 1
+    return matched, changed
+
+
+def edit_file(file_path, rule, dry_run, matcher=None):
+    """Apply the rule to one file. With dry_run nothing is written."""
+    file_name = os.path.basename(file_path)
+    try:
+        data, snapshot = read_with_snapshot(file_path)
+        text = data.decode("utf-8")
+        document = json_codec.loads(data)
+        matched, changed = edit_document(document, rule, matcher)
+        if dry_run or not changed:
+            return FileEditResult(file_name, file_path, matched, changed, False, None)
+
+        new_text = dumps_preserving(text, document)
+        # Don't overwrite a write made by the game while we were editing
+        if is_modified_since(file_path, snapshot):
+            return FileEditResult(file_name, file_path, matched, changed, False, "The file changed while it was being edited")
+        written, _ = write_if_changed(file_path, new_text.encode("utf-8"), snapshot)
+        return FileEditResult(file_name, file_path, matched, changed, written, None)
+    except Exception as e:
+        return FileEditResult(file_name, file_path, 0, 0, False, str(e))
+
+
+def edit_chunk(items):
+    """Edit a chunk of (file_path, rule, dry_run) items; runs inside a worker process."""
+    matchers = {}
+    results = []
+    for file_path, rule, dry_run in items:
+        if rule.pattern not in matchers:
+            matchers[rule.pattern] = compile_pattern(rule.pattern)
+        results.append(edit_file(file_path, rule, dry_run, matchers[rule.pattern]))
+    return results
+
+
+def batch_edit(file_paths, rule, dry_run=True, map_chunks=None, progress=None, is_cancelled=None, batch_size=1000):
+    """Apply the rule to every file and return a FileEditResult per file.
+
+    map_chunks(chunk_function, items) runs the edits; pass
+    ProfileScanner.map_chunks to use worker processes. Files are handed out
+    batch_size at a time so progress(done, total) can be reported and
+    is_cancelled() checked between batches.
+    """
+    map_chunks = map_chunks or (lambda function, items: function(items))
+    items = [(file_path, rule, dry_run) for file_path in file_paths]
+    results = []
+    for start in range(0, len(items), batch_size):
+        if is_cancelled and is_cancelled():
+            raise BatchEditCancelled()
+        results.extend(map_chunks(edit_chunk, items[start:start + batch_size]))
+        if progress:
+            progress(len(results), len(items))
+
+    logger.info(f"{'Previewed' if dry_run else 'Applied'} {rule.operation} on '{rule.pattern}': "
+                f"{sum(r.matched for r in results)} matched, {sum(r.changed for r in results)} changed "
+                f"in {sum(1 for r in results if r.changed)} files")
+    return results
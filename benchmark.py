@@ -0,0 +1,349 @@
+"""
+Benchmarks for CVR AAS Profile Manager on a synthetic profile corpus.
+
+Usage:
+    python benchmark.py empty-detection [--files N] [--empty-ratio R]
+    python benchmark.py scan [--files N] [--workers N]
+    python benchmark.py codec [--files N]
+    python benchmark.py records [--files N]
+    python benchmark.py startup [--files N] [--runs N] [--offscreen] [--command EXE]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from types import SimpleNamespace
+
+from profile_io import detect_profile_state, PROFILE_EMPTY, PROFILE_CORRUPT
+from profile_scanner import ProfileScanner, ScanResult, avatar_id_from_file_name
+from profile_records import RecordStore, LOADING_AVATAR
+import json_codec
+
+
+def make_profile(saved_profiles, values_per_profile):
+    """Build the contents of a synthetic .advavtr file."""
+    return {
+        "savedSettings": [
+            {
+                "profileName": f"Profile {p}",
+                "values": [
+                    {"name": f"Parameter {v}", "value": round(random.random(), 6)}
+                    for v in range(values_per_profile)
+                ]
+            }
+            for p in range(saved_profiles)
+        ]
+    }
+
+
+def generate_corpus(directory, files, empty_ratio=0.3, corrupt_ratio=0.01,
+                    saved_profiles=10, values_per_profile=150, seed=1):
+    """Write a synthetic corpus of .advavtr files and return their paths."""
+    random.seed(seed)
+    paths = []
+    for i in range(files):
+        avatar_id = f"{i:08x}-0000-0000-0000-000000000000"
+        path = os.path.join(directory, f"{avatar_id}.advavtr")
+        roll = random.random()
+        if roll < corrupt_ratio:
+            # What an interrupted write typically leaves behind
+            text = "" if roll < corrupt_ratio / 2 else "\0" * 4096
+        elif roll < corrupt_ratio + empty_ratio:
+            text = json.dumps({"savedSettings": []}, indent=4)
+        else:
+            text = json.dumps(make_profile(saved_profiles, values_per_profile), indent=4)
+        with open(path, 'w') as f:
+            f.write(text)
+        paths.append(path)
+    return paths
+
+
+def legacy_is_empty_profile(file_path):
+    """The original json.load based check, kept for comparison."""
+    try:
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+            if "savedSettings" in data and isinstance(data["savedSettings"], list) and len(data["savedSettings"]) == 0:
+                return True
+            return False
+    except:
+        return False
+
+
+def time_call(function, paths, repeat):
+    """Return the best wall time of calling function on every path."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            function(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_empty_detection(args, corpus_dir):
+    paths = generate_corpus(corpus_dir, args.files, args.empty_ratio)
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    print(f"Corpus: {len(paths)} files, {total_bytes / 1024 / 1024:.1f} MiB")
+
+    # Check both implementations agree on every readable file
+    mismatches = 0
+    corrupt = 0
+    for path in paths:
+        state = detect_profile_state(path)
+        if state == PROFILE_CORRUPT:
+            corrupt += 1
+        elif (state == PROFILE_EMPTY) != legacy_is_empty_profile(path):
+            mismatches += 1
+    print(f"Agreement: {mismatches} mismatches, {corrupt} files reported as corrupt")
+
+    legacy = time_call(legacy_is_empty_profile, paths, args.repeat)
+    streaming = time_call(detect_profile_state, paths, args.repeat)
+    print(f"json.load:  {legacy * 1000:8.1f} ms")
+    print(f"streaming:  {streaming * 1000:8.1f} ms  ({legacy / streaming:.1f}x)")
+
+
+def bench_scan(args, corpus_dir):
+    generate_corpus(corpus_dir, args.files)
+    serial = ProfileScanner(max_workers=1)
+    parallel = ProfileScanner(max_workers=args.workers, parallel_threshold=0)
+    try:
+        # Start the pool outside the timed runs; the app keeps it alive between scans
+        expected = serial.scan(corpus_dir)
+        if parallel.scan(corpus_dir) != expected:
+            print("Parallel scan results differ from the serial scan!")
+        serial_time = time_call(serial.scan, [corpus_dir], args.repeat)
+        parallel_time = time_call(parallel.scan, [corpus_dir], args.repeat)
+    finally:
+        parallel.shutdown()
+    print(f"Corpus: {len(expected)} files")
+    print(f"in-process:          {serial_time * 1000:8.1f} ms")
+    print(f"{parallel.max_workers:2d} processes:        {parallel_time * 1000:8.1f} ms  ({serial_time / parallel_time:.1f}x)")
+
+
+def bench_codec(args, corpus_dir):
+    paths = generate_corpus(corpus_dir, args.files, corrupt_ratio=0)
+    blobs = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            blobs.append(f.read())
+    documents = [json.loads(blob) for blob in blobs]
+    cache = {
+        os.path.splitext(os.path.basename(path))[0]: {
+            "name": f"Avatar {i}", "imageUrl": f"https://example.invalid/{i}.png", "lastUpdated": time.time(),
+            "isPublished": i % 2 == 0, "isSharedWithMe": i % 3 == 0, "creatorName": f"Creator {i % 50}"
+        }
+        for i, path in enumerate(paths)
+    }
+    print(f"Corpus: {len(blobs)} files, {sum(map(len, blobs)) / 1024 / 1024:.1f} MiB; backend: {json_codec.BACKEND}")
+
+    # Both backends must read back the same data
+    if any(json_codec.loads(blob) != document for blob, document in zip(blobs, documents)):
+        print("Decoded profiles differ between backends!")
+    if json.loads(json_codec.dumps(cache, indent=2)) != cache:
+        print("Encoded cache differs between backends!")
+
+    cases = [
+        ("profile read", lambda blob: json.loads(blob), lambda blob: json_codec.loads(blob), blobs),
+        ("cache write", lambda c: json.dumps(c, indent=4), lambda c: json_codec.dumps_bytes(c, indent=2), [cache]),
+        ("cache read", json.loads, json_codec.loads, [json_codec.dumps_bytes(cache, indent=2)]),
+    ]
+    for label, stdlib_call, codec_call, inputs in cases:
+        stdlib_time = time_call(stdlib_call, inputs, args.repeat)
+        codec_time = time_call(codec_call, inputs, args.repeat)
+        print(f"{label:13s} json: {stdlib_time * 1000:8.1f} ms   {json_codec.BACKEND}: {codec_time * 1000:8.1f} ms  "
+              f"({stdlib_time / codec_time:.1f}x)")
+
+
+def measure(build):
+    """Return (result, bytes allocated) of calling build."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def bench_records(args, corpus_dir):
+    # The records are built from scan results; no files are needed
+    profiles_dir = os.path.join(corpus_dir, "ChilloutVR_Data", "AvatarsAdvancedSettingsProfiles")
+
+    def scan_results(run):
+        # New names for every run, so each one pays for interning its strings
+        return [
+            ScanResult(name, os.path.join(profiles_dir, name), "non-empty" if i % 3 else "empty", 2048 + i, 1700000000.0 + i)
+            for i, name in enumerate(
+                f"{i:08x}-{run:04x}-0000-0000-000000000000{' (2)' if i % 10 == 0 else ''}.advavtr"
+                for i in range(args.files)
+            )
+        ]
+
+    def avatar_cache(results):
+        return {
+            avatar_id_from_file_name(result.file_name): {
+                "name": f"Avatar {i}", "imageUrl": "", "lastUpdated": 1.0, "isPublished": False,
+                "isSharedWithMe": False, "creatorName": f"Creator {i % 50}"
+            }
+            for i, result in enumerate(results)
+        }
+
+    def unknown_avatar():
+        return {"name": "Unknown Avatar", "imageUrl": "", "lastUpdated": 0, "isPublished": False,
+                "isSharedWithMe": False, "creatorName": "Unknown Creator"}
+
+    # (label, avatar data for a file) for the states the list goes through
+    cases = [
+        ("loading", lambda avatar_id: {"name": "Loading...", "imageUrl": "", "lastUpdated": 0}, lambda avatar_id: LOADING_AVATAR),
+        ("offline", lambda avatar_id: unknown_avatar(), lambda avatar_id: unknown_avatar()),
+        ("cached", None, None)
+    ]
+    print(f"Records: {args.files}")
+    for run, (label, legacy_data, store_data) in enumerate(cases):
+        results = scan_results(run)
+        cache = avatar_cache(results)
+        cache_manager = SimpleNamespace(avatar_cache=cache)
+        legacy_data = legacy_data or cache.get
+        store_data = store_data or cache.get
+
+        # Both are built from fresh scan results, keeping what they reference
+        def build_legacy():
+            # (file_name, avatar_data, file_path, state) tuples plus a scan info tuple per file
+            records = {}
+            scan_info = {}
+            for result in scan_results(run):
+                records[result.file_name] = (result.file_name, legacy_data(avatar_id_from_file_name(result.file_name)),
+                                             result.file_path, result.state)
+                scan_info[result.file_name] = (result.size, result.mtime)
+            return records, scan_info
+
+        def build_store():
+            store = RecordStore(cache_manager)
+            for result in scan_results(run):
+                store.set(result, store_data(avatar_id_from_file_name(result.file_name)))
+            return store
+
+        _, legacy_bytes = measure(build_legacy)
+        store, store_bytes = measure(build_store)
+        if any(store.get(result.file_path).file_path != result.file_path for result in results):
+            print("Record paths differ from the scanned paths!")
+        print(f"{label:8s} tuples: {legacy_bytes / 1024 / 1024:7.2f} MiB   records: {store_bytes / 1024 / 1024:7.2f} MiB  "
+              f"({legacy_bytes / store_bytes:.1f}x smaller)")
+
+
+def run_app(command, work_dir, report_path, env, timeout):
+    """Start the app once and return its startup report, with times relative to the process start."""
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    start = time.time()
+    try:
+        subprocess.run(command, cwd=work_dir, env=env, timeout=timeout,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except subprocess.TimeoutExpired:
+        return None
+    if not os.path.exists(report_path):
+        return None
+    report = json_codec.load(report_path)
+    if "interactive" not in report:
+        return None
+    return {
+        "first_paint": report["first_paint"] - start,
+        "interactive": report["interactive"] - start,
+        "profiles": report["profiles"]
+    }
+
+
+def bench_startup(args, corpus_dir):
+    # A CVR install with a profile corpus, and a working directory holding the
+    # app's settings and a warm avatar cache, as next to the packaged executable
+    cvr_dir = os.path.join(corpus_dir, "ChilloutVR")
+    profiles_dir = os.path.join(cvr_dir, "ChilloutVR_Data", "AvatarsAdvancedSettingsProfiles")
+    work_dir = os.path.join(corpus_dir, "app")
+    cache_dir = os.path.join(work_dir, "cache")
+    os.makedirs(profiles_dir)
+    os.makedirs(os.path.join(cache_dir, "thumbnails"))
+    paths = generate_corpus(profiles_dir, args.files)
+    with open(os.path.join(work_dir, "app_settings.json"), 'w') as f:
+        json.dump({"cvr_directory": cvr_dir}, f)
+    json_codec.dump({
+        avatar_id_from_file_name(path): {
+            "name": f"Avatar {i}", "imageUrl": "", "lastUpdated": time.time(), "isPublished": i % 2 == 0,
+            "isSharedWithMe": i % 3 == 0, "creatorName": f"Creator {i % 50}"
+        }
+        for i, path in enumerate(paths)
+    }, os.path.join(cache_dir, "avatar_cache.json"))
+
+    command = [args.command] if args.command else [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")]
+    report_path = os.path.join(corpus_dir, "startup_report.json")
+    env = dict(os.environ, CVR_AAS_STARTUP_REPORT=report_path)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    print(f"Corpus: {len(paths)} files; command: {' '.join(command)}")
+    # Cold runs start without the list saved at exit, warm runs with it
+    for label in ("cold", "warm"):
+        reports = []
+        for _ in range(args.runs):
+            if label == "cold" and os.path.exists(os.path.join(cache_dir, "profile_list.json")):
+                os.remove(os.path.join(cache_dir, "profile_list.json"))
+            report = run_app(command, work_dir, report_path, env, args.timeout)
+            if report is None:
+                print(f"{label}: the app did not report an interactive list within {args.timeout} s")
+                return 1
+            reports.append(report)
+        first_paint = statistics.median(report["first_paint"] for report in reports)
+        interactive = statistics.median(report["interactive"] for report in reports)
+        print(f"{label}  first paint: {first_paint * 1000:8.1f} ms   interactive list: {interactive * 1000:8.1f} ms  "
+              f"(median of {len(reports)}, {reports[-1]['profiles']} profiles listed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CVR AAS Profile Manager benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions; the best time is reported")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    empty_parser = subparsers.add_parser("empty-detection", help="Empty-profile detection")
+    empty_parser.add_argument("--files", type=int, default=2000)
+    empty_parser.add_argument("--empty-ratio", type=float, default=0.3)
+    empty_parser.set_defaults(run=bench_empty_detection)
+
+    scan_parser = subparsers.add_parser("scan", help="Directory scan, in-process versus process pool")
+    scan_parser.add_argument("--files", type=int, default=5000)
+    scan_parser.add_argument("--workers", type=int, default=None)
+    scan_parser.set_defaults(run=bench_scan)
+
+    codec_parser = subparsers.add_parser("codec", help="JSON codec backend versus the standard library")
+    codec_parser.add_argument("--files", type=int, default=1000)
+    codec_parser.set_defaults(run=bench_codec)
+
+    records_parser = subparsers.add_parser("records", help="Memory use of the profile list records")
+    records_parser.add_argument("--files", type=int, default=50000)
+    records_parser.set_defaults(run=bench_records)
+
+    startup_parser = subparsers.add_parser("startup", help="Time from process start to first paint and interactive list")
+    startup_parser.add_argument("--files", type=int, default=2000)
+    startup_parser.add_argument("--runs", type=int, default=5)
+    startup_parser.add_argument("--timeout", type=float, default=120)
+    startup_parser.add_argument("--offscreen", action="store_true", help="Use Qt's offscreen platform (no display needed)")
+    startup_parser.add_argument("--command", help="Packaged executable to start instead of main.py")
+    startup_parser.set_defaults(run=bench_startup)
+
+    args = parser.parse_args()
+    corpus_dir = tempfile.mkdtemp(prefix="cvr-aas-bench-")
+    try:
+        return args.run(args, corpus_dir)
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,53 @@
 import os
+import argparse
 import subprocess
 import sys
 
+# onefile: a single executable that unpacks itself to a temporary directory on every launch
+# onedir: a folder with the executable and its libraries, which starts without unpacking
+BUILD_MODES = ["onefile", "onedir"]
+
 def install_requirements():
     print("Installing PyInstaller...")
     subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
     print("Installing project requirements...")
     subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
 
-def build_executable():
-    print("Building executable...")
+def build_executable(mode="onefile"):
+    print(f"Building executable ({mode})...")
     # Get the absolute path to the icon file
     icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "icon.ico")
-    
-    # PyInstaller command with common options
+
+    # PyInstaller command with common options. The cache, snapshots and
+    # app_settings.json are not bundled: the app keeps them in its working
+    # directory, next to the executable, so they survive updates and a
+    # onefile build doesn't unpack them on every launch.
     cmd = [
         "pyinstaller",
         "--name=CVR AAS Profile Manager",
-        "--onefile",  # Create a single executable
+        f"--{mode}",
         "--windowed",  # Don't show console window
         f"--icon={icon_path}",  # Set the application icon
-        "--add-data=app_settings.json;.",  # Include settings file
-        "--add-data=cache;cache",  # Include cache directory
-        "--add-data=resources;resources",  # Include resources directory
+        f"--add-data=resources{os.pathsep}resources",  # Include resources directory
+        "--hidden-import=numpy",  # Imported optionally by profile_compare; always bundle it
+        "--noconfirm",  # Replace the previous build of the same mode
         "main.py"
     ]
-    
+
     subprocess.check_call(cmd)
-    print("\nBuild complete! Executable can be found in the 'dist' directory.")
+    if mode == "onedir":
+        print("\nBuild complete! Run 'CVR AAS Profile Manager' in the 'dist/CVR AAS Profile Manager' folder; "
+              "the app keeps its settings and cache in the folder it is started from.")
+    else:
+        print("\nBuild complete! Executable can be found in the 'dist' directory.")
 
 if __name__ == "__main__":
-    install_requirements()
-    build_executable() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the CVR AAS Profile Manager executable")
+    parser.add_argument("--mode", choices=BUILD_MODES, default="onefile",
+                        help="onedir starts faster; compare with: python benchmark.py startup --command <executable>")
+    parser.add_argument("--skip-install", action="store_true", help="Don't install PyInstaller and the requirements first")
+    args = parser.parse_args()
+
+    if not args.skip_install:
+        install_requirements()
+    build_executable(args.mode)
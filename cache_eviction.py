@@ -0,0 +1,154 @@
+"""
+Size- and age-bounded eviction for the avatar cache and thumbnails.
+
+Entries for avatars that no longer have a profile file (orphans) are evicted
+on every run once they have not been used for ORPHAN_GRACE_DAYS, whatever the
+limits. The remaining entries are ranked by when they were last used, orphans
+before entries still in use, each group least recently used first, and are
+evicted until the cache is within the entry and byte limits. Entries not used
+for longer than the age limit are always evicted. Thumbnails go with their entry, and thumbnails without an entry are
+removed outright.
+"""
+import os
+import time
+import logging
+from collections import namedtuple
+
+import json_codec
+from profile_scanner import list_profile_files, avatar_id_from_file_name
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('CACHE_EVICTION')
+
+DEFAULT_LIMITS = {
+    "max_entries": 5000,
+    "max_megabytes": 200,
+    "max_age_days": 180
+}
+
+# Orphans are kept this long after their last use, e.g. while a profile file is
+# moved or its library is unreachable
+ORPHAN_GRACE_DAYS = 7
+
+# What an eviction run removed; evicted_ids still have to be removed from the
+# in-memory cache with CacheManager.remove_entries(evicted_ids, started) on the
+# GUI thread, which keeps entries used or updated since the run started
+EvictionReport = namedtuple("EvictionReport", [
+    "evicted_ids", "orphans_removed", "thumbnails_removed", "bytes_reclaimed",
+    "entries_left", "bytes_left", "started"
+])
+
+
+def entry_size(entry):
+    """Approximate size of a cache entry in avatar_cache.json."""
+    return len(json_codec.dumps_bytes(entry)) + 64
+
+
+def plan_eviction(entries, access_times, thumbnails, live_ids, limits, now=None):
+    """Decide what to evict.
+
+    entries: {avatar_id: cache entry}
+    access_times: {avatar_id: last use}; lastUpdated is used for entries never used
+    thumbnails: {avatar_id: thumbnail size in bytes}
+    live_ids: avatar IDs that still have a profile file
+    limits: dict with the keys of DEFAULT_LIMITS
+
+    Returns (avatar IDs to remove from the cache, avatar IDs whose thumbnail to delete).
+    """
+    now = time.time() if now is None else now
+    max_age = limits["max_age_days"] * 86400
+    orphan_grace = ORPHAN_GRACE_DAYS * 86400
+    max_bytes = limits["max_megabytes"] * 1024 * 1024
+
+    def last_used(avatar_id):
+        return access_times.get(avatar_id) or entries.get(avatar_id, {}).get("lastUpdated", 0)
+
+    # Orphans first, then least recently used first
+    candidates = sorted(entries, key=lambda avatar_id: (avatar_id in live_ids, last_used(avatar_id)))
+    sizes = {avatar_id: entry_size(entry) + thumbnails.get(avatar_id, 0) for avatar_id, entry in entries.items()}
+    count = len(candidates)
+    total = sum(sizes.values())
+
+    evict = []
+    for avatar_id in candidates:
+        live = avatar_id in live_ids
+        unused_for = now - last_used(avatar_id)
+        if (count <= limits["max_entries"] and total <= max_bytes and unused_for <= max_age
+                and (live or unused_for <= orphan_grace)):
+            if live:
+                break  # Live entries are in LRU order; the rest are newer
+            continue
+        evict.append(avatar_id)
+        count -= 1
+        total -= sizes[avatar_id]
+
+    evicted = set(evict)
+    stale_thumbnails = [avatar_id for avatar_id in thumbnails if avatar_id not in entries or avatar_id in evicted]
+    return evict, stale_thumbnails
+
+
+def live_avatar_ids(profiles_dirs):
+    """Return the avatar IDs that have a profile file in any of the directories."""
+    live_ids = set()
+    for profiles_dir in profiles_dirs:
+        if profiles_dir and os.path.isdir(profiles_dir):
+            live_ids.update(avatar_id_from_file_name(os.path.basename(path)) for path in list_profile_files(profiles_dir))
+    return live_ids
+
+
+def thumbnail_sizes(thumbnails_dir, written_before=None):
+    """Return {avatar_id: size} of the thumbnails on disk.
+
+    Thumbnails modified at or after written_before are left out.
+    """
+    sizes = {}
+    with os.scandir(thumbnails_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".jpg") and entry.is_file():
+                stat = entry.stat()
+                if written_before is None or stat.st_mtime < written_before:
+                    sizes[entry.name[:-4]] = stat.st_size
+    return sizes
+
+
+def evict_cache(cache_manager, profiles_dirs, limits):
+    """Delete evicted thumbnails and return an EvictionReport; runs on a worker thread.
+
+    The cache is only read here; the caller removes report.evicted_ids.
+    Thumbnails are listed before the entries are copied, and thumbnails
+    written since the run started are kept, so a thumbnail downloaded while
+    the run is in progress is never taken for one without an entry.
+    """
+    started = time.time()
+    thumbnails = thumbnail_sizes(cache_manager.thumbnails_dir, written_before=started)
+    entries = dict(cache_manager.avatar_cache)
+    access_times = dict(cache_manager.access_times)
+    live_ids = live_avatar_ids(profiles_dirs)
+
+    evict, stale_thumbnails = plan_eviction(entries, access_times, thumbnails, live_ids, limits)
+
+    reclaimed = 0
+    thumbnails_removed = 0
+    for avatar_id in stale_thumbnails:
+        thumbnail_path = os.path.join(cache_manager.thumbnails_dir, f"{avatar_id}.jpg")
+        try:
+            if os.path.getmtime(thumbnail_path) >= started:
+                continue  # Downloaded again while the plan was made
+            os.remove(thumbnail_path)
+            reclaimed += thumbnails[avatar_id]
+            thumbnails_removed += 1
+        except OSError as e:
+            logger.error(f"Error removing thumbnail {avatar_id}: {str(e)}")
+    reclaimed += sum(entry_size(entries[avatar_id]) for avatar_id in evict)
+
+    evicted = set(evict)
+    stale = set(stale_thumbnails)
+    orphans = sum(1 for avatar_id in evict if avatar_id not in live_ids)
+    kept = [avatar_id for avatar_id in entries if avatar_id not in evicted]
+    bytes_left = sum(entry_size(entries[avatar_id]) for avatar_id in kept) + sum(
+        size for avatar_id, size in thumbnails.items() if avatar_id not in stale)
+    report = EvictionReport(evict, orphans, thumbnails_removed, reclaimed, len(kept), bytes_left, started)
+    logger.info(f"Evicted {len(evict)} cache entries ({orphans} orphaned) and "
+                f"{report.thumbnails_removed} thumbnails, reclaiming {report.bytes_reclaimed} bytes")
+    return report
@@ -1,21 +1,37 @@
 import os
-import json
 import time
 import requests
 import logging
 from pathlib import Path
+import json_codec
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('CACHE_MANAGER')
 
+# Entries older than this are still used, but refreshed in the background when the app is idle
+ENTRY_MAX_AGE = 7 * 24 * 3600
+
+def entry_from_api(avatar_data):
+    """Build a cache entry from an API avatar response."""
+    return {
+        "name": avatar_data.get("name", "Unknown Avatar"),
+        "imageUrl": avatar_data.get("imageUrl", ""),
+        "lastUpdated": time.time(),
+        "isPublished": avatar_data.get("isPublished", False),
+        "isSharedWithMe": avatar_data.get("isSharedWithMe", False),
+        "creatorName": avatar_data.get("user", {}).get("name", "Unknown Creator")
+    }
+
 class CacheManager:
     def __init__(self, cache_dir="cache"):
         """Initialize the cache manager."""
         self.cache_dir = cache_dir
         self.avatar_cache_file = os.path.join(cache_dir, "avatar_cache.json")
+        self.access_times_file = os.path.join(cache_dir, "avatar_access.json")
         self.thumbnails_dir = os.path.join(cache_dir, "thumbnails")
         self.avatar_cache = {}
+        self.access_times = {}  # avatar ID -> last time its entry or thumbnail was used
         
         # Create cache directories if they don't exist
         os.makedirs(cache_dir, exist_ok=True)
@@ -28,21 +44,62 @@ class CacheManager:
         """Load the avatar cache from disk."""
         if os.path.exists(self.avatar_cache_file):
             try:
-                with open(self.avatar_cache_file, 'r') as f:
-                    self.avatar_cache = json.load(f)
+                self.avatar_cache = json_codec.load(self.avatar_cache_file)
                 logger.info(f"Loaded {len(self.avatar_cache)} avatar entries from cache")
             except Exception as e:
                 logger.error(f"Error loading cache: {str(e)}")
                 self.avatar_cache = {}
+        if os.path.exists(self.access_times_file):
+            try:
+                self.access_times = json_codec.load(self.access_times_file)
+            except Exception as e:
+                logger.error(f"Error loading cache access times: {str(e)}")
+                self.access_times = {}
     
     def save_cache(self):
         """Save the avatar cache to disk."""
         try:
-            with open(self.avatar_cache_file, 'w') as f:
-                json.dump(self.avatar_cache, f, indent=4)
+            json_codec.dump(self.avatar_cache, self.avatar_cache_file, indent=2)
             logger.info(f"Saved {len(self.avatar_cache)} avatar entries to cache")
         except Exception as e:
             logger.error(f"Error saving cache: {str(e)}")
+        self.save_access_times()
+    
+    def save_access_times(self):
+        """Save when each entry was last used, for LRU eviction."""
+        try:
+            json_codec.dump(self.access_times, self.access_times_file)
+        except Exception as e:
+            logger.error(f"Error saving cache access times: {str(e)}")
+    
+    def touch(self, avatar_id):
+        """Record that an avatar's entry or thumbnail was used."""
+        self.access_times[avatar_id] = time.time()
+    
+    def update_entries(self, entries):
+        """Store entries fetched in the background and save the cache once."""
+        self.avatar_cache.update(entries)
+        if entries:
+            self.save_cache()
+    
+    def remove_entries(self, avatar_ids, unused_since=None):
+        """Remove evicted entries and save the cache once.
+        
+        Entries used or updated at or after unused_since (when the eviction was
+        planned) are kept.
+        """
+        removed = 0
+        for avatar_id in avatar_ids:
+            if unused_since is not None and (
+                    self.access_times.get(avatar_id, 0) >= unused_since
+                    or self.avatar_cache.get(avatar_id, {}).get("lastUpdated", 0) >= unused_since):
+                continue
+            self.access_times.pop(avatar_id, None)
+            if self.avatar_cache.pop(avatar_id, None) is not None:
+                removed += 1
+        if removed:
+            self.save_cache()
+        return removed
     
     def get_avatar_data(self, avatar_id, api_client=None):
         """Get avatar data from cache or API."""
@@ -58,6 +115,7 @@ class CacheManager:
             
             if not missing_fields:
                 logger.info(f"Avatar {avatar_id} found in cache with all required fields")
+                self.touch(avatar_id)
                 return cache_entry
             else:
                 logger.info(f"Avatar {avatar_id} found in cache but missing fields: {missing_fields}")
@@ -72,17 +130,11 @@ class CacheManager:
             avatar_data = api_client.get_avatar_by_id(avatar_id)
             if avatar_data:
                 # Extract relevant fields
-                cache_entry = {
-                    "name": avatar_data.get("name", "Unknown Avatar"),
-                    "imageUrl": avatar_data.get("imageUrl", ""),
-                    "lastUpdated": time.time(),
-                    "isPublished": avatar_data.get("isPublished", False),
-                    "isSharedWithMe": avatar_data.get("isSharedWithMe", False),
-                    "creatorName": avatar_data.get("user", {}).get("name", "Unknown Creator")
-                }
+                cache_entry = entry_from_api(avatar_data)
                 
                 # Save to cache
                 self.avatar_cache[avatar_id] = cache_entry
+                self.touch(avatar_id)
                 self.save_cache()
                 
                 # Download thumbnail if we have an image URL
@@ -101,33 +153,81 @@ class CacheManager:
             "creatorName": "Unknown Creator"
         }
     
-    def download_thumbnail(self, avatar_id, image_url):
-        """Download and cache an avatar thumbnail."""
+    def download_thumbnail(self, avatar_id, image_url, replace=False):
+        """Download and cache an avatar thumbnail.
+        
+        With replace, an existing thumbnail is downloaded again (e.g. after the
+        image URL changed); it is swapped in only once the download completes.
+        """
         if not image_url:
             return
         
-        thumbnail_path = os.path.join(self.thumbnails_dir, f"{avatar_id}.jpg")
+        thumbnail_path = self.thumbnail_file(avatar_id)
         
         # Skip if we already have the thumbnail
-        if os.path.exists(thumbnail_path):
+        if os.path.exists(thumbnail_path) and not replace:
             return
         
         try:
             # Download the image
             response = requests.get(image_url, stream=True)
             if response.status_code == 200:
-                with open(thumbnail_path, 'wb') as f:
+                temp_path = thumbnail_path + ".part"
+                with open(temp_path, 'wb') as f:
                     for chunk in response.iter_content(chunk_size=8192):
                         f.write(chunk)
+                os.replace(temp_path, thumbnail_path)
                 logger.info(f"Downloaded thumbnail for avatar {avatar_id}")
             else:
                 logger.error(f"Failed to download thumbnail for avatar {avatar_id}: {response.status_code}")
         except Exception as e:
             logger.error(f"Error downloading thumbnail for avatar {avatar_id}: {str(e)}")
     
+    def thumbnail_file(self, avatar_id):
+        """Get the path a thumbnail is cached at, whether or not it exists."""
+        return os.path.join(self.thumbnails_dir, f"{avatar_id}.jpg")
+    
     def get_thumbnail_path(self, avatar_id):
         """Get the path to a cached thumbnail."""
-        thumbnail_path = os.path.join(self.thumbnails_dir, f"{avatar_id}.jpg")
+        thumbnail_path = self.thumbnail_file(avatar_id)
         if os.path.exists(thumbnail_path):
             return thumbnail_path
-        return None 
\ No newline at end of file
+        return None
+    
+    def export_entries(self, avatar_ids):
+        """Return (entries, thumbnail_paths) for the given avatars that are cached."""
+        entries = {}
+        thumbnail_paths = {}
+        for avatar_id in avatar_ids:
+            if avatar_id in self.avatar_cache:
+                entries[avatar_id] = self.avatar_cache[avatar_id]
+            thumbnail_path = self.get_thumbnail_path(avatar_id)
+            if thumbnail_path:
+                thumbnail_paths[avatar_id] = thumbnail_path
+        return entries, thumbnail_paths
+    
+    def seed_entries(self, entries):
+        """Add cache entries from elsewhere (e.g. an import bundle).
+        
+        Existing entries are only replaced by ones with a newer lastUpdated.
+        Returns the number of entries added or updated.
+        """
+        seeded = 0
+        for avatar_id, entry in entries.items():
+            current = self.avatar_cache.get(avatar_id)
+            if current is None or entry.get("lastUpdated", 0) > current.get("lastUpdated", 0):
+                self.avatar_cache[avatar_id] = entry
+                seeded += 1
+        if seeded:
+            self.save_cache()
+            logger.info(f"Seeded {seeded} avatar entries")
+        return seeded
+    
+    def store_thumbnail(self, avatar_id, data):
+        """Save thumbnail image data for an avatar unless one is already cached."""
+        thumbnail_path = self.thumbnail_file(avatar_id)
+        if os.path.exists(thumbnail_path):
+            return False
+        with open(thumbnail_path, 'wb') as f:
+            f.write(data)
+        return True
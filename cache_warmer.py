@@ -0,0 +1,78 @@
+"""
+Idle-time warming and revalidation of the avatar cache.
+
+While the user is not interacting with the app, avatars with a profile file
+are looked up in the background, most urgent first: avatars with no cache
+entry, then entries missing fields, then entries past or closest to
+ENTRY_MAX_AGE, oldest first. Missing thumbnails are downloaded, and
+thumbnails are downloaded again when the image URL changed. Entries are only
+read here; fetched entries are handed back to be stored on the GUI thread.
+"""
+import os
+import time
+import logging
+
+from cache_manager import ENTRY_MAX_AGE, entry_from_api
+from cache_eviction import live_avatar_ids
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('CACHE_WARMER')
+
+REQUIRED_FIELDS = ["name", "imageUrl", "lastUpdated", "isPublished", "isSharedWithMe", "creatorName"]
+
+# Entries younger than this share of ENTRY_MAX_AGE are left alone
+REVALIDATE_AFTER = 0.75
+
+
+def warm_candidates(entries, live_ids, thumbnail_ids, now=None, max_age=ENTRY_MAX_AGE, missing_only=False):
+    """Return the avatar IDs to look up, most urgent first.
+
+    With missing_only, only avatars with no entry or a partial one are returned.
+    """
+    now = time.time() if now is None else now
+    candidates = []
+    for avatar_id in live_ids:
+        entry = entries.get(avatar_id)
+        if entry is None:
+            candidates.append(((0, 0), avatar_id))
+        elif any(field not in entry for field in REQUIRED_FIELDS):
+            candidates.append(((1, 0), avatar_id))
+        elif missing_only:
+            continue
+        elif now - entry["lastUpdated"] >= max_age * REVALIDATE_AFTER:
+            candidates.append(((2, entry["lastUpdated"]), avatar_id))
+        elif entry["imageUrl"] and avatar_id not in thumbnail_ids:
+            candidates.append(((3, 0), avatar_id))
+    candidates.sort()
+    return [avatar_id for _, avatar_id in candidates]
+
+
+def warm_cache(cache_manager, api_client, profiles_dirs, is_cancelled, entry_fetched, pause=0.2, missing_only=False):
+    """Look up the candidates one by one until done or is_cancelled() returns True.
+
+    entry_fetched(avatar_id, entry) is called for each fresh entry. Returns
+    the number of avatars looked up.
+    """
+    entries = dict(cache_manager.avatar_cache)
+    live_ids = live_avatar_ids(profiles_dirs)
+    thumbnail_ids = {name[:-4] for name in os.listdir(cache_manager.thumbnails_dir) if name.endswith(".jpg")}
+    candidates = warm_candidates(entries, live_ids, thumbnail_ids, missing_only=missing_only)
+    if candidates:
+        logger.info(f"Warming {len(candidates)} avatar cache entries")
+
+    done = 0
+    for avatar_id in candidates:
+        if is_cancelled():
+            break
+        old_entry = entries.get(avatar_id) or {}
+        avatar_data = api_client.get_avatar_by_id(avatar_id)
+        if avatar_data and not is_cancelled():
+            entry = entry_from_api(avatar_data)
+            if entry["imageUrl"]:
+                changed = bool(old_entry.get("imageUrl")) and old_entry.get("imageUrl") != entry["imageUrl"]
+                cache_manager.download_thumbnail(avatar_id, entry["imageUrl"], replace=changed)
+            entry_fetched(avatar_id, entry)
+        done += 1
+        time.sleep(pause)  # Stay in the background; don't flood the API
+    return done
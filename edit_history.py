@@ -0,0 +1,231 @@
+"""
+Undo/redo history for edits made to a loaded .advavtr profile.
+
+Each edit is recorded as a small command that knows how to apply and revert
+itself against the ``savedSettings`` list, so only the changed fields are kept
+in memory instead of copies of the whole document.
+"""
+
+
+class ValueEdit:
+    """Change the value of a single setting inside a saved profile."""
+    kind = "value"
+
+    def __init__(self, value_obj, old_value, new_value, profile_name=""):
+        self.value_obj = value_obj
+        self.old_value = old_value
+        self.new_value = new_value
+        self.profile_name = profile_name
+
+    def apply(self, saved_settings):
+        self.value_obj["value"] = self.new_value
+
+    def revert(self, saved_settings):
+        self.value_obj["value"] = self.old_value
+
+    def merge(self, other):
+        """Fold a follow-up edit of the same field into this command."""
+        if not isinstance(other, ValueEdit) or other.value_obj is not self.value_obj:
+            return False
+        self.new_value = other.new_value
+        return True
+
+    def is_noop(self):
+        return self.old_value == self.new_value
+
+    def describe(self):
+        return f"edit '{self.value_obj.get('name', '')}'"
+
+
+class RenameProfile:
+    """Rename a saved profile."""
+    kind = "rename"
+
+    def __init__(self, profile_obj, old_name, new_name):
+        self.profile_obj = profile_obj
+        self.old_name = old_name
+        self.new_name = new_name
+
+    def apply(self, saved_settings):
+        self.profile_obj["profileName"] = self.new_name
+
+    def revert(self, saved_settings):
+        self.profile_obj["profileName"] = self.old_name
+
+    def merge(self, other):
+        return False
+
+    def is_noop(self):
+        return self.old_name == self.new_name
+
+    def describe(self):
+        return f"rename '{self.old_name}' to '{self.new_name}'"
+
+
+class MoveProfile:
+    """Move a saved profile from one position to another."""
+    kind = "move"
+
+    def __init__(self, source_row, destination_row):
+        self.source_row = source_row
+        self.destination_row = destination_row
+
+    def apply(self, saved_settings):
+        saved_settings.insert(self.destination_row, saved_settings.pop(self.source_row))
+
+    def revert(self, saved_settings):
+        saved_settings.insert(self.source_row, saved_settings.pop(self.destination_row))
+
+    def merge(self, other):
+        return False
+
+    def is_noop(self):
+        return self.source_row == self.destination_row
+
+    def describe(self):
+        return "reorder profiles"
+
+
+class DeleteProfile:
+    """Remove a saved profile."""
+    kind = "delete"
+
+    def __init__(self, row, profile_obj):
+        self.row = row
+        self.profile_obj = profile_obj
+
+    def apply(self, saved_settings):
+        saved_settings.pop(self.row)
+
+    def revert(self, saved_settings):
+        saved_settings.insert(self.row, self.profile_obj)
+
+    def merge(self, other):
+        return False
+
+    def is_noop(self):
+        return False
+
+    def describe(self):
+        return f"delete '{self.profile_obj.get('profileName', '')}'"
+
+
+class EditHistory:
+    """Linear undo/redo stack with a save point."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self, saved_settings=None):
+        """Forget all recorded commands and bind to a new savedSettings list."""
+        self.saved_settings = saved_settings
+        self._commands = []
+        self._index = 0  # Number of commands currently applied
+        self._saved_index = 0  # Value of _index when the file was last saved
+
+    def push(self, command):
+        """Apply a command and record it, merging with the previous one if possible."""
+        if command.is_noop():
+            return
+        command.apply(self.saved_settings)
+
+        # Discard anything that was undone; the saved state may become unreachable
+        if self._index < len(self._commands):
+            del self._commands[self._index:]
+            if self._saved_index > self._index:
+                self._saved_index = -1
+
+        # Only merge into a command that is not part of the saved state. After
+        # undoing past an unreachable save point there may be no command left.
+        if self._commands and self._index > self._saved_index and self._commands[-1].merge(command):
+            if self._commands[-1].is_noop():
+                self._commands.pop()
+                self._index -= 1
+            return
+
+        self._commands.append(command)
+        self._index += 1
+
+    def can_undo(self):
+        return self._index > 0
+
+    def can_redo(self):
+        return self._index < len(self._commands)
+
+    def undo(self):
+        if not self.can_undo():
+            return None
+        self._index -= 1
+        command = self._commands[self._index]
+        command.revert(self.saved_settings)
+        return command
+
+    def redo(self):
+        if not self.can_redo():
+            return None
+        command = self._commands[self._index]
+        command.apply(self.saved_settings)
+        self._index += 1
+        return command
+
+    def undo_text(self):
+        return self._commands[self._index - 1].describe() if self.can_undo() else ""
+
+    def redo_text(self):
+        return self._commands[self._index].describe() if self.can_redo() else ""
+
+    def is_dirty(self):
+        return self._index != self._saved_index
+
+    def mark_saved(self):
+        self._saved_index = self._index
+
+    def can_revert(self):
+        """Whether the saved state can be reached by replaying the history."""
+        return self._saved_index >= 0
+
+    def revert(self):
+        """Replay the history back to the last saved state."""
+        if not self.can_revert():
+            return False
+        while self._index > self._saved_index:
+            self.undo()
+        while self._index < self._saved_index:
+            self.redo()
+        return True
+
+    def pending_changes(self):
+        """Summarize the net changes between the saved state and the current one.
+
+        Returns a dict with the number of changed values, renamed profiles,
+        deleted and restored profiles, and whether the order was changed.
+        """
+        summary = {"value": 0, "rename": 0, "delete": 0, "restore": 0, "move": False}
+        if self._saved_index < 0:
+            # The saved state is no longer reachable; report the whole history
+            commands, forward = self._commands[:self._index], True
+        elif self._index >= self._saved_index:
+            commands, forward = self._commands[self._saved_index:self._index], True
+        else:
+            commands, forward = reversed(self._commands[self._index:self._saved_index]), False
+
+        # Collapse repeated edits of the same field to their first and last values
+        values = {}
+        names = {}
+        for command in commands:
+            if command.kind == "value":
+                old, new = (command.old_value, command.new_value) if forward else (command.new_value, command.old_value)
+                key = id(command.value_obj)
+                values[key] = (values[key][0] if key in values else old, new)
+            elif command.kind == "rename":
+                old, new = (command.old_name, command.new_name) if forward else (command.new_name, command.old_name)
+                key = id(command.profile_obj)
+                names[key] = (names[key][0] if key in names else old, new)
+            elif command.kind == "delete":
+                summary["delete" if forward else "restore"] += 1
+            elif command.kind == "move":
+                summary["move"] = True
+
+        summary["value"] = sum(1 for old, new in values.values() if old != new)
+        summary["rename"] = sum(1 for old, new in names.values() if old != new)
+        return summary
@@ -0,0 +1,250 @@
+"""
+Format-preserving JSON writer for .advavtr files.
+
+The original file is parsed into a tree that remembers the source span of
+every value. When saving, the edited data is compared against that tree and
+only the spans that actually changed are re-emitted; everything else is
+copied byte for byte from the original text.
+"""
+import re
+import json
+import logging
+from json.decoder import scanstring
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('FORMAT_PRESERVING_JSON')
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?')
+LITERALS = (("true", True), ("false", False), ("null", None))
+
+
+class Node:
+    """A parsed JSON value together with its [start, end) span in the source."""
+    __slots__ = ("start", "end", "value", "children")
+
+    def __init__(self, start, end, value, children=None):
+        self.start = start
+        self.end = end
+        self.value = value
+        # Objects: list of (key, Node). Arrays: list of Node. Scalars: None.
+        self.children = children
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+
+    def skip(self, pos):
+        return WHITESPACE.match(self.text, pos).end()
+
+    def error(self, message, pos):
+        raise json.JSONDecodeError(message, self.text, pos)
+
+    def parse(self):
+        pos = self.skip(0)
+        node = self.parse_value(pos)
+        if self.skip(node.end) != len(self.text):
+            self.error("Extra data", node.end)
+        return node
+
+    def parse_value(self, pos):
+        text = self.text
+        if pos >= len(text):
+            self.error("Expecting value", pos)
+        char = text[pos]
+        if char == '{':
+            return self.parse_object(pos)
+        if char == '[':
+            return self.parse_array(pos)
+        if char == '"':
+            value, end = scanstring(text, pos + 1)
+            return Node(pos, end, value)
+        for literal, value in LITERALS:
+            if text.startswith(literal, pos):
+                return Node(pos, pos + len(literal), value)
+        match = NUMBER.match(text, pos)
+        if match:
+            raw = match.group()
+            value = float(raw) if any(c in raw for c in ".eE") else int(raw)
+            return Node(pos, match.end(), value)
+        self.error("Expecting value", pos)
+
+    def parse_object(self, start):
+        text = self.text
+        value, children = {}, []
+        pos = self.skip(start + 1)
+        if text.startswith('}', pos):
+            return Node(start, pos + 1, value, children)
+        while True:
+            if not text.startswith('"', pos):
+                self.error("Expecting property name enclosed in double quotes", pos)
+            key, pos = scanstring(text, pos + 1)
+            pos = self.skip(pos)
+            if not text.startswith(':', pos):
+                self.error("Expecting ':' delimiter", pos)
+            child = self.parse_value(self.skip(pos + 1))
+            value[key] = child.value
+            children.append((key, child))
+            pos = self.skip(child.end)
+            if text.startswith('}', pos):
+                return Node(start, pos + 1, value, children)
+            if not text.startswith(',', pos):
+                self.error("Expecting ',' delimiter", pos)
+            pos = self.skip(pos + 1)
+
+    def parse_array(self, start):
+        text = self.text
+        value, children = [], []
+        pos = self.skip(start + 1)
+        if text.startswith(']', pos):
+            return Node(start, pos + 1, value, children)
+        while True:
+            child = self.parse_value(pos)
+            value.append(child.value)
+            children.append(child)
+            pos = self.skip(child.end)
+            if text.startswith(']', pos):
+                return Node(start, pos + 1, value, children)
+            if not text.startswith(',', pos):
+                self.error("Expecting ',' delimiter", pos)
+            pos = self.skip(pos + 1)
+
+
+def parse_with_spans(text):
+    """Parse JSON text into a Node tree."""
+    return _Parser(text).parse()
+
+
+def _same(a, b):
+    """Deep equality that doesn't treat True and 1 as the same value."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return list(a) == list(b) and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, (dict, list)) or isinstance(b, (dict, list)):
+        return False
+    if isinstance(a, str) or isinstance(b, str):
+        return type(a) is type(b) and a == b
+    return a == b
+
+
+class _Style:
+    """Formatting conventions inferred from the original file."""
+
+    def __init__(self, text):
+        self.text = text
+        self.newline = "\r\n" if "\r\n" in text else "\n"
+        match = re.search(r'\n([ \t]+)\S', text)
+        self.indent = match.group(1) if match else None
+        match = re.search(r'"\s*(:\s*)', text)
+        self.key_separator = match.group(1) if match else ": "
+
+    def line_indent(self, pos):
+        """Return the leading whitespace of the line containing pos."""
+        line_start = self.text.rfind("\n", 0, pos) + 1
+        return WHITESPACE.match(self.text, line_start).group().replace("\r", "").replace("\n", "")
+
+    def dumps(self, value, pos):
+        """Serialize a new value so it fits in at the given source position."""
+        if self.indent is None:
+            return json.dumps(value, separators=(",", self.key_separator))
+        rendered = json.dumps(value, indent=self.indent, separators=(",", self.key_separator))
+        return rendered.replace("\n", self.newline + self.line_indent(pos))
+
+
+class _Renderer:
+    def __init__(self, text):
+        self.text = text
+        self.style = _Style(text)
+        self.changed_bytes = 0
+
+    def fresh(self, value, pos):
+        rendered = self.style.dumps(value, pos)
+        self.changed_bytes += len(rendered)
+        return rendered
+
+    def render(self, node, value):
+        """Return the text for value, reusing node's source text wherever possible."""
+        text = self.text
+        if _same(node.value, value):
+            return text[node.start:node.end]
+
+        if isinstance(value, dict) and isinstance(node.value, dict) and list(value) == list(node.value):
+            # Same keys in the same order: only re-render the members that changed
+            parts, pos = [], node.start
+            for key, child in node.children:
+                parts.append(text[pos:child.start])
+                parts.append(self.render(child, value[key]))
+                pos = child.end
+            parts.append(text[pos:node.end])
+            return "".join(parts)
+
+        if isinstance(value, list) and isinstance(node.value, list) and node.children:
+            return self.render_array(node, value)
+
+        return self.fresh(value, node.start)
+
+    def render_array(self, node, value):
+        """Render an array, reusing original elements that were kept or moved."""
+        text = self.text
+        children = node.children
+        unused = list(range(len(children)))
+        matches, element_texts = [], []
+        for i, item in enumerate(value):
+            # Prefer an identical original element (handles reorders and deletes),
+            # otherwise re-render the element that used to be at this position
+            match = next((j for j in unused if _same(children[j].value, item)), None)
+            if match is None and i in unused:
+                match = i
+            matches.append(match)
+            if match is None:
+                element_texts.append(self.fresh(item, children[min(i, len(children) - 1)].start))
+            else:
+                unused.remove(match)
+                element_texts.append(self.render(children[match], item))
+
+        if matches == list(range(len(children))):
+            # Every element kept its position; keep the original separators
+            parts, pos = [], node.start
+            for child, element_text in zip(children, element_texts):
+                parts.append(text[pos:child.start])
+                parts.append(element_text)
+                pos = child.end
+            parts.append(text[pos:node.end])
+            return "".join(parts)
+
+        if not value:
+            self.changed_bytes += 2
+            return "[]"
+
+        # Re-join the elements using the original separator between elements
+        if len(children) > 1:
+            separator = text[children[0].end:children[1].start]
+        elif self.style.indent is not None:
+            separator = "," + self.style.newline + self.style.line_indent(children[0].start)
+        else:
+            separator = ","
+        self.changed_bytes += len(separator) * (len(value) - 1)
+        return text[node.start:children[0].start] + separator.join(element_texts) + text[children[-1].end:node.end]
+
+
+def dumps_preserving(original_text, data):
+    """Serialize data, keeping the byte layout of original_text for unchanged regions.
+
+    Falls back to a plain json.dumps with 4-space indentation if the original
+    text can't be parsed.
+    """
+    try:
+        root = parse_with_spans(original_text)
+    except json.JSONDecodeError as e:
+        logger.error(f"Could not parse original file, writing it in full: {str(e)}")
+        return json.dumps(data, indent=4)
+
+    renderer = _Renderer(original_text)
+    rendered = original_text[:root.start] + renderer.render(root, data) + original_text[root.end:]
+    logger.info(f"Re-emitted {renderer.changed_bytes} of {len(rendered)} characters")
+    return rendered
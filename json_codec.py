@@ -0,0 +1,66 @@
+"""
+JSON codec used for profile and cache I/O.
+
+Uses orjson when it is installed and falls back to the standard library json
+module otherwise. Set CVR_AAS_JSON_BACKEND=json to force the standard library.
+"""
+import os
+import json
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('JSON_CODEC')
+
+orjson = None
+if os.environ.get("CVR_AAS_JSON_BACKEND", "").lower() != "json":
+    try:
+        import orjson
+    except ImportError:
+        pass
+
+BACKEND = "orjson" if orjson else "json"
+logger.info(f"Using {BACKEND} for JSON")
+
+
+def loads(data):
+    """Parse JSON from a str or bytes object."""
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (e.g. NaN/Infinity); let the standard library decide
+            pass
+    return json.loads(data)
+
+
+def dumps_bytes(obj, indent=None):
+    """Serialize obj to UTF-8 encoded JSON bytes.
+
+    indent may be None (compact) or 2 on every backend; other indents fall back
+    to the standard library, which orjson can't match byte for byte.
+    """
+    if orjson and indent in (None, 2):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent == 2 else 0)
+        except (orjson.JSONEncodeError, TypeError):
+            pass
+    separators = (",", ":") if indent is None else None
+    return json.dumps(obj, indent=indent, separators=separators, ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj, indent=None):
+    """Serialize obj to a JSON str."""
+    return dumps_bytes(obj, indent).decode("utf-8")
+
+
+def load(file_path):
+    """Read and parse a JSON file."""
+    with open(file_path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump(obj, file_path, indent=None):
+    """Serialize obj and write it to a file."""
+    with open(file_path, 'wb') as f:
+        f.write(dumps_bytes(obj, indent))
@@ -1,23 +1,68 @@
 import sys
-import json
 import os
+import time
+import multiprocessing
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QPushButton, QLabel, QFileDialog, QMessageBox,
                             QHBoxLayout, QListWidget, QStackedWidget, QTextEdit,
                             QScrollArea, QCheckBox, QSplitter, QFrame, QGridLayout,
                             QInputDialog, QLineEdit, QProgressBar, QListWidgetItem,
-                            QComboBox, QMenu, QGroupBox)
-from PyQt6.QtCore import Qt, QMimeData, QSize
-from PyQt6.QtGui import QDrag, QPixmap, QIcon
+                            QComboBox, QMenu, QGroupBox, QProgressDialog, QDialog,
+                            QTableWidget, QTableWidgetItem, QHeaderView, QSpinBox)
+from PyQt6.QtCore import Qt, QObject, QMimeData, QSize, QThread, QTimer, QEvent, pyqtSignal
+from PyQt6.QtGui import QDrag, QPixmap, QImage, QIcon, QKeySequence, QShortcut
 from settings_manager import SettingsManager
 from cvr_api import CVRApi
 from cache_manager import CacheManager
+from cache_eviction import evict_cache
+from cache_warmer import warm_cache
+from thumbnail_loader import ThumbnailLoader
+from edit_history import EditHistory, ValueEdit, RenameProfile, MoveProfile, DeleteProfile
+from profile_io import (read_with_snapshot, is_modified_since, write_if_changed,
+                        PROFILE_EMPTY, PROFILE_NON_EMPTY, PROFILE_CORRUPT)
+from format_preserving_json import dumps_preserving
+from profile_scanner import ProfileScanner, scan_file, avatar_id_from_file_name
+import json_codec
+from profile_archive import export_archive, ExportCancelled, ARCHIVE_EXTENSION
+from profile_compare import compare_values
+from batch_edit import (batch_edit, BatchEditCancelled, EditRule,
+                        OPERATION_SET, OPERATION_SCALE, OPERATION_CLAMP)
+from profile_import import (collect_sources, find_conflicts, import_profiles, ImportCancelled,
+                            CONFLICT_OVERWRITE, CONFLICT_SKIP, CONFLICT_KEEP_NEWER, CONFLICT_KEEP_BOTH)
+from snapshot_store import SnapshotStore
+from profile_index import ProfileIndex, KIND_PARAM, KIND_PROFILE
+from profile_stats import StatsCollector
+from profile_duplicates import find_duplicates, remove_saved_profiles
+from profile_sorting import SortedViews, sort_keys, SORT_ORDERS, SORT_AVATAR_NAME
+from profile_filters import FilterIndex, record_flags, FILTER_GROUPS, FILTER_EMPTY
+from profile_records import RecordStore, LOADING_AVATAR
+from profile_libraries import ProfileLibraries, scan_library, LIBRARY_GROUP
+from profile_list_cache import save_profile_list, load_profile_list
+from refresh_scheduler import RefreshScheduler, LEVEL_FILTER, LEVEL_SORT, LEVEL_SCAN, LEVEL_FETCH
 from version import get_version
 
 print("Starting application...")
 
+# Wait this long after a keystroke before filtering, so typing is not slowed down
+SEARCH_DELAY_MS = 150
+# After painting the list saved last session, wait this long before re-scanning, so the first paint isn't held up
+RECONCILE_DELAY_MS = 200
+# Clean up the avatar cache this long after startup, once the list is loaded
+CACHE_EVICTION_DELAY_MS = 30000
+# Warm the avatar cache after this long without user input, at most once per interval
+IDLE_CHECK_MS = 5000
+IDLE_AFTER_SECONDS = 60
+CACHE_WARMING_INTERVAL_SECONDS = 15 * 60
+# If set, startup milestones are written to this file and the app closes once the list is interactive
+STARTUP_REPORT_ENV = "CVR_AAS_STARTUP_REPORT"
+# Save profile index changes made by single-file updates at most this often
+INDEX_SAVE_INTERVAL_MS = 10000
+# Events that count as the user interacting and stop cache warming
+USER_INPUT_EVENTS = {QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonDblClick,
+                     QEvent.Type.Wheel, QEvent.Type.TouchBegin}
+
 class ProfileListItem(QWidget):
-    def __init__(self, avatar_data, file_name, is_empty=False, parent=None):
+    def __init__(self, avatar_data, file_name, state=PROFILE_NON_EMPTY, parent=None, library=None):
         super().__init__(parent)
         layout = QHBoxLayout(self)
         layout.setContentsMargins(8, 8, 8, 8)  # Increased padding for better spacing
@@ -35,26 +80,13 @@ class ProfileListItem(QWidget):
         """)
         
         # Get avatar ID from filename
-        avatar_id = os.path.splitext(file_name)[0]
-        
-        # Get thumbnail path from cache manager
-        if parent and hasattr(parent, 'cache_manager'):
-            thumbnail_path = parent.cache_manager.get_thumbnail_path(avatar_id)
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                pixmap = QPixmap(thumbnail_path)
-                if not pixmap.isNull():
-                    self.thumbnail.setPixmap(pixmap.scaled(
-                        50, 50, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
-                    ))
-                else:
-                    self.thumbnail.setText("No Image")
-                    self.thumbnail.setStyleSheet("border: 1px solid #ccc; font-size: 7pt;")
-            else:
-                self.thumbnail.setText("No Image")
-                self.thumbnail.setStyleSheet("border: 1px solid #ccc; font-size: 7pt;")
+        avatar_id = avatar_id_from_file_name(file_name)
+        
+        # Decode the thumbnail in the background; the empty frame is shown until then
+        if parent and hasattr(parent, 'thumbnail_loader'):
+            parent.thumbnail_loader.request(parent.cache_manager.thumbnail_file(avatar_id), 50, self.show_thumbnail)
         else:
-            self.thumbnail.setText("No Image")
-            self.thumbnail.setStyleSheet("border: 1px solid #ccc; font-size: 7pt;")
+            self.show_thumbnail(QImage())
         
         layout.addWidget(self.thumbnail)
         
@@ -123,14 +155,36 @@ class ProfileListItem(QWidget):
         
         layout.addLayout(status_layout)
         
-        # Add empty indicator if needed
-        if is_empty:
+        # Show which library the profile comes from, unless it's the CVR install
+        if library:
+            library_label = QLabel(library)
+            library_label.setStyleSheet("color: #1565c0; font-size: 8pt; border: 1px solid #90caf9; border-radius: 3px; padding: 1px 4px;")
+            library_label.setToolTip("Profile library")
+            layout.addWidget(library_label)
+        
+        # Add empty/corrupt indicator if needed
+        if state == PROFILE_EMPTY:
             empty_label = QLabel("[Empty]")
             empty_label.setStyleSheet("color: #999999; font-style: italic;")
             layout.addWidget(empty_label)
+        elif state == PROFILE_CORRUPT:
+            corrupt_label = QLabel("[Corrupt]")
+            corrupt_label.setStyleSheet("color: #c62828; font-style: italic;")
+            corrupt_label.setToolTip("This file could not be read as a valid profile.")
+            layout.addWidget(corrupt_label)
         
         # Set fixed height for the item
         self.setFixedHeight(70)  # Increased height to accommodate new information
+    
+    def show_thumbnail(self, image):
+        """Show a decoded thumbnail, or "No Image" for a null image."""
+        if image.isNull():
+            self.thumbnail.setText("No Image")
+            self.thumbnail.setStyleSheet("border: 1px solid #ccc; font-size: 7pt;")
+            return
+        self.thumbnail.setPixmap(QPixmap.fromImage(image).scaled(
+            50, 50, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        ))
 
 class ProfileListView(QListWidget):
     def __init__(self, parent=None):
@@ -160,15 +214,11 @@ class ProfileListView(QListWidget):
             return
             
         # Perform the move in the data
-        saved_settings = self.parent.settings_data["savedSettings"]
-        item = saved_settings.pop(source_row)
-        saved_settings.insert(destination_row, item)
+        self.parent.history.push(MoveProfile(source_row, destination_row))
         
         # Let the parent class handle the UI update
         super().dropEvent(event)
         
-        # Mark that changes have been made
-        self.parent.has_unsaved_changes = True
         self.parent.update_button_states()
 
     def keyPressEvent(self, event):
@@ -183,10 +233,15 @@ class ProfileContentView(QWidget):
         super().__init__(parent)
         self.parent = parent
         self.cvr_api = CVRApi()
-        self.has_unsaved_changes = False
+        self.history = EditHistory()
         self.current_profile_index = None
         self.setup_ui()
     
+    @property
+    def has_unsaved_changes(self):
+        """Whether the loaded profile differs from what was last saved."""
+        return self.history.is_dirty()
+    
     def setup_ui(self):
         """Set up the user interface."""
         # Create layout
@@ -296,6 +351,14 @@ class ProfileContentView(QWidget):
         self.delete_button.clicked.connect(self.delete_selected_profile)
         profile_actions_layout.addWidget(self.delete_button)
         
+        # Add compare button
+        self.compare_button = QPushButton("Compare...")
+        self.compare_button.setFixedHeight(28)
+        self.compare_button.setStyleSheet(self.delete_button.styleSheet())
+        self.compare_button.setToolTip("Compare this saved profile with another one, in this or another avatar")
+        self.compare_button.clicked.connect(self.compare_profile)
+        profile_actions_layout.addWidget(self.compare_button)
+        
         # Add move up/down buttons
         self.move_up_button = QPushButton("↑")
         self.move_up_button.setFixedSize(28, 28)
@@ -478,17 +541,34 @@ class ProfileContentView(QWidget):
             }
         """)
         self.revert_button.clicked.connect(self.revert_changes)
+        
+        # Add undo/redo buttons
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.setFixedHeight(28)
+        self.undo_button.setStyleSheet(self.save_button.styleSheet())
+        self.undo_button.clicked.connect(self.undo)
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.setFixedHeight(28)
+        self.redo_button.setStyleSheet(self.save_button.styleSheet())
+        self.redo_button.clicked.connect(self.redo)
+        
+        button_layout.addWidget(self.undo_button)
+        button_layout.addWidget(self.redo_button)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.revert_button)
         layout.addLayout(button_layout)
         
+        # Add keyboard shortcuts for undo/redo
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.undo)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.redo)
+        
         # Initialize variables
         self.current_file = None
+        self.file_snapshot = None
+        self.file_text = None  # Text of the file as last read or written
         self.settings_data = None
-        self.original_settings_data = None  # Store original data for revert
         self.current_profile_index = -1
         self.edit_mode_enabled = False
-        self.value_widgets = []  # Store references to value widgets
         
         # Initialize button states
         self.update_button_states()
@@ -497,41 +577,27 @@ class ProfileContentView(QWidget):
         """Display the contents of a profile file."""
         print(f"Displaying profile: {file_path}")
         try:
-            with open(file_path, 'r') as file:
-                # Read the raw file contents first
-                raw_contents = file.read()
-                print("Raw file contents:", raw_contents)
-                
-                # Parse the JSON
-                self.settings_data = json.loads(raw_contents)
-                print("Parsed settings data:", json.dumps(self.settings_data, indent=2))
-                
-                self.original_settings_data = json.loads(json.dumps(self.settings_data))  # Deep copy for revert
-                self.current_file = file_path
-                
-                # Clear the profile list
-                self.profile_list.clear()
-                
-                # Populate the profile list
-                if "savedSettings" in self.settings_data and isinstance(self.settings_data["savedSettings"], list):
-                    for i, profile in enumerate(self.settings_data["savedSettings"]):
-                        if "profileName" in profile:
-                            profile_name = profile["profileName"]
-                            self.profile_list.addItem(profile_name)
-                
-                # Select the first profile if available
-                if self.profile_list.count() > 0:
-                    self.profile_list.setCurrentRow(0)
-                else:
-                    self.profile_name_label.setText("No profiles found")
-                    self.clear_values_display()
-                
-                self.update_button_states()
-                
-                # Get avatar ID from filename and update avatar info
-                avatar_id = os.path.splitext(os.path.basename(file_path))[0]
-                self.update_avatar_info(avatar_id)
-                
+            # Read the raw file contents first, remembering what was on disk
+            raw_bytes, file_snapshot = read_with_snapshot(file_path)
+            raw_contents = raw_bytes.decode("utf-8")
+            print("Raw file contents:", raw_contents)
+            
+            # Parse the JSON
+            self.settings_data = json_codec.loads(raw_bytes)
+            print("Parsed settings data:", json_codec.dumps(self.settings_data, indent=2))
+            
+            self.current_file = file_path
+            self.file_snapshot = file_snapshot
+            self.file_text = raw_contents
+            self.history.clear(self.settings_data.get("savedSettings"))
+            
+            # Populate the profile list and select the first profile
+            self.populate_profile_list(0)
+            
+            # Get avatar ID from filename and update avatar info
+            avatar_id = avatar_id_from_file_name(file_path)
+            self.update_avatar_info(avatar_id)
+        
         except Exception as e:
             print(f"Error loading profile: {str(e)}")
             QMessageBox.critical(
@@ -540,6 +606,23 @@ class ProfileContentView(QWidget):
                 f"An error occurred while loading the file: {str(e)}"
             )
     
+    def populate_profile_list(self, select_row):
+        """Fill the profile list from the loaded data and select a row."""
+        self.profile_list.clear()
+        
+        if "savedSettings" in self.settings_data and isinstance(self.settings_data["savedSettings"], list):
+            for profile in self.settings_data["savedSettings"]:
+                if "profileName" in profile:
+                    self.profile_list.addItem(profile["profileName"])
+        
+        if self.profile_list.count() > 0:
+            self.profile_list.setCurrentRow(max(0, min(select_row, self.profile_list.count() - 1)))
+        else:
+            self.profile_name_label.setText("No profiles found")
+            self.clear_values_display()
+        
+        self.update_button_states()
+    
     def update_avatar_info(self, avatar_id):
         """Update the avatar information display."""
         if not self.parent or not hasattr(self.parent, 'cache_manager'):
@@ -568,18 +651,22 @@ class ProfileContentView(QWidget):
             sharing_status = "Shared with you" if avatar_data["isSharedWithMe"] else "Not shared with you"
         self.sharing_status_label.setText(f"Sharing: {sharing_status}")
         
-        # Update thumbnail
-        thumbnail_path = self.parent.cache_manager.get_thumbnail_path(avatar_id)
-        if thumbnail_path:
-            pixmap = QPixmap(thumbnail_path)
-            if not pixmap.isNull():
-                self.avatar_thumbnail.setPixmap(pixmap.scaled(
-                    100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
-                ))
-            else:
-                self.avatar_thumbnail.setText("No Image")
-        else:
+        # Update thumbnail once it is decoded in the background
+        self.thumbnail_avatar_id = avatar_id
+        self.avatar_thumbnail.clear()
+        self.parent.thumbnail_loader.request(self.parent.cache_manager.thumbnail_file(avatar_id), 100,
+                                             lambda image: self.show_avatar_thumbnail(avatar_id, image))
+    
+    def show_avatar_thumbnail(self, avatar_id, image):
+        """Show a decoded thumbnail unless another avatar was loaded meanwhile."""
+        if avatar_id != self.thumbnail_avatar_id:
+            return
+        if image.isNull():
             self.avatar_thumbnail.setText("No Image")
+            return
+        self.avatar_thumbnail.setPixmap(QPixmap.fromImage(image).scaled(
+            100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        ))
     
     def on_profile_selected(self, current, previous):
         """Handle profile selection."""
@@ -656,7 +743,6 @@ class ProfileContentView(QWidget):
                     value_widget = QLineEdit(str(value))
                     value_widget.setObjectName(f"value_edit_{i+2}")  # +2 for header row and separator
                     value_widget.textChanged.connect(lambda text, row=i+2: self.update_value(row, text))
-                    self.value_widgets.append(value_widget)
                 else:
                     value_widget = QLabel(str(value))
                 
@@ -686,18 +772,14 @@ class ProfileContentView(QWidget):
         if current_row <= 0:
             return
             
-        # Swap profiles in the data
-        saved_settings = self.settings_data["savedSettings"]
-        saved_settings[current_row], saved_settings[current_row - 1] = \
-            saved_settings[current_row - 1], saved_settings[current_row]
+        # Move the profile in the data
+        self.history.push(MoveProfile(current_row, current_row - 1))
             
         # Update the list widget
         current_item = self.profile_list.takeItem(current_row)
         self.profile_list.insertItem(current_row - 1, current_item)
         self.profile_list.setCurrentRow(current_row - 1)
         
-        # Mark that changes have been made
-        self.has_unsaved_changes = True
         self.update_button_states()
 
     def move_profile_down(self):
@@ -709,18 +791,14 @@ class ProfileContentView(QWidget):
         if current_row < 0 or current_row >= self.profile_list.count() - 1:
             return
             
-        # Swap profiles in the data
-        saved_settings = self.settings_data["savedSettings"]
-        saved_settings[current_row], saved_settings[current_row + 1] = \
-            saved_settings[current_row + 1], saved_settings[current_row]
+        # Move the profile in the data
+        self.history.push(MoveProfile(current_row, current_row + 1))
             
         # Update the list widget
         current_item = self.profile_list.takeItem(current_row)
         self.profile_list.insertItem(current_row + 1, current_item)
         self.profile_list.setCurrentRow(current_row + 1)
         
-        # Mark that changes have been made
-        self.has_unsaved_changes = True
         self.update_button_states()
 
     def rename_profile(self):
@@ -750,9 +828,9 @@ class ProfileContentView(QWidget):
         
         if ok and new_name and new_name != current_name:
             # Update the profile name in the data
-            saved_settings = self.settings_data["savedSettings"]
-            if "profileName" in saved_settings[current_row]:
-                saved_settings[current_row]["profileName"] = new_name
+            profile = self.settings_data["savedSettings"][current_row]
+            if "profileName" in profile:
+                self.history.push(RenameProfile(profile, current_name, new_name))
                 
                 # Update the list widget
                 current_item.setText(new_name)
@@ -760,8 +838,6 @@ class ProfileContentView(QWidget):
                 # Update the profile name label
                 self.profile_name_label.setText(new_name)
                 
-                # Mark that changes have been made
-                self.has_unsaved_changes = True
                 self.update_button_states()
 
     def update_button_states(self):
@@ -776,36 +852,39 @@ class ProfileContentView(QWidget):
         
         # Update delete button
         self.delete_button.setEnabled(current_row >= 0)
+        self.compare_button.setEnabled(current_row >= 0)
         
         # Update save/revert buttons
         self.save_button.setEnabled(self.has_unsaved_changes)
         self.revert_button.setEnabled(self.has_unsaved_changes)
+        
+        # Update undo/redo buttons
+        self.undo_button.setEnabled(self.history.can_undo())
+        self.undo_button.setToolTip(f"Undo {self.history.undo_text()}" if self.history.can_undo() else "")
+        self.redo_button.setEnabled(self.history.can_redo())
+        self.redo_button.setToolTip(f"Redo {self.history.redo_text()}" if self.history.can_redo() else "")
 
     def save_changes(self):
         """Save changes to the profile file."""
         if not self.current_file or not self.settings_data:
             return
         
-        # Check if any profiles were deleted
-        profiles_deleted = False
-        if self.original_settings_data and "savedSettings" in self.original_settings_data:
-            original_count = len(self.original_settings_data["savedSettings"])
-            current_count = len(self.settings_data["savedSettings"])
-            if current_count < original_count:
-                profiles_deleted = True
-        
-        # Check if any values were modified in edit mode
-        values_modified = False
-        if self.edit_mode_enabled and self.value_widgets:
-            values_modified = True
+        # Work out exactly what is about to be written
+        changes = self.history.pending_changes()
             
         # Show confirmation dialog if needed
-        if profiles_deleted or values_modified:
+        if changes["delete"] or changes["value"]:
             message = []
-            if profiles_deleted:
-                message.append("You have deleted one or more profiles.")
-            if values_modified:
-                message.append("You have modified values in edit mode.")
+            if changes["delete"]:
+                message.append(f"You have deleted {changes['delete']} profile(s).")
+            if changes["restore"]:
+                message.append(f"You have restored {changes['restore']} deleted profile(s).")
+            if changes["value"]:
+                message.append(f"You have modified {changes['value']} value(s) in edit mode.")
+            if changes["rename"]:
+                message.append(f"You have renamed {changes['rename']} profile(s).")
+            if changes["move"]:
+                message.append("You have reordered profiles.")
             
             reply = QMessageBox.question(
                 self,
@@ -819,19 +898,42 @@ class ProfileContentView(QWidget):
                 return
         
         try:
-            # Save the raw JSON content
-            with open(self.current_file, 'w') as file:
-                json.dump(self.settings_data, file, indent=4)
+            # Don't silently clobber a newer write made by the game
+            if is_modified_since(self.current_file, self.file_snapshot):
+                reply = QMessageBox.warning(
+                    self,
+                    "File Changed",
+                    "This profile was modified by another program since it was loaded.\n\n"
+                    "Do you want to overwrite it with your changes?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                    QMessageBox.StandardButton.No
+                )
+                if reply != QMessageBox.StandardButton.Yes:
+                    return
+            
+            # Re-emit only the changed parts of the file, then write it atomically,
+            # skipping identical contents
+            text = dumps_preserving(self.file_text, self.settings_data)
+            written, self.file_snapshot = write_if_changed(
+                self.current_file,
+                text.encode("utf-8"),
+                self.file_snapshot,
+                before_write=self.backup_before_save
+            )
+            self.file_text = text
+            if written and self.parent and hasattr(self.parent, 'libraries'):
+                profile_index = self.parent.libraries.index_for(os.path.dirname(self.current_file))
+                if profile_index is not None:
+                    profile_index.update_files([self.current_file])
             
-            # Update the original data and reset change tracking
-            self.original_settings_data = json.loads(json.dumps(self.settings_data))
-            self.has_unsaved_changes = False
+            # Reset change tracking
+            self.history.mark_saved()
             self.update_button_states()
             
             QMessageBox.information(
                 self,
                 "Success",
-                "Profile saved successfully."
+                "Profile saved successfully." if written else "The file already contains these settings, nothing was written."
             )
         except Exception as e:
             QMessageBox.critical(
@@ -840,15 +942,19 @@ class ProfileContentView(QWidget):
                 f"An error occurred while saving the file: {str(e)}"
             )
 
+    def backup_before_save(self, file_path):
+        """Capture the file's current contents in a snapshot before it is overwritten."""
+        if self.parent and hasattr(self.parent, 'snapshot_store'):
+            self.parent.snapshot_store.capture([file_path], f"Save {os.path.basename(file_path)}")
+
     def revert_changes(self):
         """Revert changes back to the original state."""
-        if self.original_settings_data:
-            self.settings_data = json.loads(json.dumps(self.original_settings_data))  # Deep copy
-            self.display_profile(self.current_file)  # Refresh the display
-            
-            # Reset change tracking
-            self.has_unsaved_changes = False
-            self.update_button_states()
+        if self.settings_data:
+            if self.history.revert():
+                self.populate_profile_list(self.profile_list.currentRow())
+            else:
+                # The saved state was discarded from the history, reload it from disk
+                self.display_profile(self.current_file)
             
             QMessageBox.information(
                 self,
@@ -856,6 +962,16 @@ class ProfileContentView(QWidget):
                 "Changes have been reverted."
             )
 
+    def undo(self):
+        """Undo the most recent edit."""
+        if self.history.undo():
+            self.populate_profile_list(self.profile_list.currentRow())
+
+    def redo(self):
+        """Redo the most recently undone edit."""
+        if self.history.redo():
+            self.populate_profile_list(self.profile_list.currentRow())
+
     def toggle_edit_mode(self, state):
         """Toggle edit mode for value fields."""
         self.edit_mode_enabled = state == Qt.CheckState.Checked.value
@@ -905,7 +1021,6 @@ class ProfileContentView(QWidget):
                                 value_widget = QLineEdit(str(value))
                                 value_widget.setObjectName(f"value_edit_{i+2}")  # +2 for header row and separator
                                 value_widget.textChanged.connect(lambda text, row=i+2: self.update_value(row, text))
-                                self.value_widgets.append(value_widget)
                             else:
                                 value_widget = QLabel(str(value))
                             
@@ -938,19 +1053,26 @@ class ProfileContentView(QWidget):
                 # Try to convert the text to the appropriate type
                 try:
                     # First try to convert to float
-                    value_obj["value"] = float(text)
+                    new_value = float(text)
                 except ValueError:
                     # If that fails, keep it as a string
-                    value_obj["value"] = text
+                    new_value = text
+                
+                # Only record edits that actually change the value
+                if new_value == value_obj["value"]:
+                    return
                 
-                # Mark that changes have been made
-                self.has_unsaved_changes = True
+                self.history.push(ValueEdit(value_obj, value_obj["value"], new_value, profile.get("profileName", "")))
                 self.update_button_states()
 
     def delete_selected_profile(self):
-        """Delete the selected profile after confirmation."""
+        """Delete the selected saved profile after confirmation."""
+        if not self.settings_data or "savedSettings" not in self.settings_data:
+            return
+        
+        current_row = self.profile_list.currentRow()
         selected_item = self.profile_list.currentItem()
-        if not selected_item:
+        if current_row < 0 or not selected_item:
             QMessageBox.warning(
                 self,
                 "No Profile Selected",
@@ -958,191 +1080,1045 @@ class ProfileContentView(QWidget):
             )
             return
         
-        # Get the widget associated with the item
-        item_widget = self.profile_list.itemWidget(selected_item)
-        if not item_widget:
-            return
-        
-        # Get the file name from the widget's file label
-        file_name = item_widget.file_label.text()
-        
         # Confirm deletion
         reply = QMessageBox.question(
             self,
             "Confirm Deletion",
-            f"Are you sure you want to delete the profile '{file_name}'?\n\nThis action cannot be undone.",
+            f"Are you sure you want to delete the profile '{selected_item.text()}'?\n\nThe file is not changed until you save.",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            profile = self.settings_data["savedSettings"][current_row]
+            self.history.push(DeleteProfile(current_row, profile))
+            self.populate_profile_list(current_row)
+
+    def compare_profile(self):
+        """Compare the selected saved profile with another saved profile."""
+        saved_settings = (self.settings_data or {}).get("savedSettings")
+        current_row = self.profile_list.currentRow()
+        if not isinstance(saved_settings, list) or not 0 <= current_row < len(saved_settings):
+            QMessageBox.warning(
+                self,
+                "No Profile Selected",
+                "Please select a profile to compare."
+            )
+            return
+        
+        other_file = "From another avatar's file..."
+        names = [f"{i + 1}. {profile.get('profileName', '')}" for i, profile in enumerate(saved_settings)]
+        choice, ok = QInputDialog.getItem(
+            self,
+            "Compare Profiles",
+            f"Compare '{saved_settings[current_row].get('profileName', '')}' with:",
+            names + [other_file],
+            0,
+            False
+        )
+        if not ok:
+            return
+        
+        if choice == other_file:
+            profiles_dir = self.parent.settings_manager.get_profiles_directory() if self.parent else ""
+            file_path, _ = QFileDialog.getOpenFileName(
+                self,
+                "Select Profile to Compare With",
+                profiles_dir or "",
+                "Profile Files (*.advavtr)"
+            )
+            if not file_path:
+                return
             try:
-                # Get the file path
-                profiles_dir = self.settings_manager.get_profiles_directory()
-                if not profiles_dir:
-                    return
-                
-                file_path = os.path.join(profiles_dir, file_name)
-                
-                # Delete the file
-                os.remove(file_path)
-                
-                # Refresh the profile list
-                self.refresh_profiles()
-                
-                QMessageBox.information(
-                    self,
-                    "Success",
-                    f"Profile '{file_name}' has been deleted."
-                )
+                other_settings = json_codec.load(file_path).get("savedSettings")
             except Exception as e:
                 QMessageBox.critical(
                     self,
                     "Error",
-                    f"An error occurred while deleting the profile: {str(e)}"
+                    f"An error occurred while loading the file: {str(e)}"
                 )
-
-class CVRProfileManager(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        version = get_version()
-        self.setWindowTitle(f"CVR Advanced Avatar Settings Manager v{version}")
-        self.setMinimumSize(800, 900)
-        
-        # Initialize settings manager
-        self.settings_manager = SettingsManager()
-        
-        # Initialize cache manager
-        self.cache_manager = CacheManager()
+                return
+            if not isinstance(other_settings, list) or not other_settings:
+                QMessageBox.information(
+                    self,
+                    "Compare Profiles",
+                    "That file has no saved profiles."
+                )
+                return
+            other_names = [f"{i + 1}. {profile.get('profileName', '')}" for i, profile in enumerate(other_settings)]
+            other_choice, ok = QInputDialog.getItem(self, "Compare Profiles", "Saved profile:", other_names, 0, False)
+            if not ok:
+                return
+            other_profile = other_settings[other_names.index(other_choice)]
+            other_title = f"{os.path.basename(file_path)}: {other_profile.get('profileName', '')}"
+        else:
+            other_profile = saved_settings[names.index(choice)]
+            other_title = other_profile.get("profileName", "")
         
-        # Create stacked widget for multiple views
-        self.stacked_widget = QStackedWidget()
-        self.setCentralWidget(self.stacked_widget)
+        profile = saved_settings[current_row]
+        result = compare_values(profile.get("values") or [], other_profile.get("values") or [])
+        CompareDialog(profile.get("profileName", ""), other_title, result, self).exec()
+
+class CompareDialog(QDialog):
+    """Shows the parameters that differ between two saved profiles."""
+    
+    def __init__(self, title_a, title_b, result, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Compare Profiles")
+        self.setMinimumSize(650, 500)
         
-        # Create main page
-        self.main_page = QWidget()
-        self.setup_main_page()
-        self.stacked_widget.addWidget(self.main_page)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(
+            f"A: {title_a}\nB: {title_b}\n\n"
+            f"{len(result.changed)} changed, {len(result.only_a)} only in A, "
+            f"{len(result.only_b)} only in B, {result.unchanged} identical"
+        ))
+        
+        rows = [(d.name, d.old, d.new, "" if d.delta is None else f"{d.delta:+g}") for d in result.changed]
+        rows += [(name, value, "", "Only in A") for name, value in result.only_a]
+        rows += [(name, "", value, "Only in B") for name, value in result.only_b]
+        
+        table = QTableWidget(len(rows), 4)
+        table.setHorizontalHeaderLabels(["Parameter", "A", "B", "Difference"])
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
+        layout.addWidget(table, 1)
+        
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        layout.addWidget(close_button, 0, Qt.AlignmentFlag.AlignRight)
+
+class ArchiveExportWorker(QThread):
+    """Writes an export archive in the background."""
+    progress = pyqtSignal(int, int)
+    export_finished = pyqtSignal(int, list)
+    export_cancelled = pyqtSignal()
+    export_failed = pyqtSignal(str)
+    
+    def __init__(self, file_paths, archive_path, avatar_entries=None, thumbnail_paths=None, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.archive_path = archive_path
+        self.avatar_entries = avatar_entries
+        self.thumbnail_paths = thumbnail_paths
+        self.cancelled = False
+    
+    def cancel(self):
+        """Ask the export to stop after the current file."""
+        self.cancelled = True
+    
+    def run(self):
+        try:
+            count, errors = export_archive(
+                self.file_paths,
+                self.archive_path,
+                progress=self.progress.emit,
+                is_cancelled=lambda: self.cancelled,
+                avatar_entries=self.avatar_entries,
+                thumbnail_paths=self.thumbnail_paths
+            )
+            self.export_finished.emit(count, errors)
+        except ExportCancelled:
+            self.export_cancelled.emit()
+        except Exception as e:
+            self.export_failed.emit(str(e))
+
+class ProfileImportWorker(QThread):
+    """Validates and copies imported profiles in the background."""
+    progress = pyqtSignal(int, int)
+    import_finished = pyqtSignal(object)
+    import_cancelled = pyqtSignal(object)
+    import_failed = pyqtSignal(str)
+    
+    def __init__(self, sources, profiles_dir, policy, map_chunks, store_thumbnail=None, backup=None, parent=None):
+        super().__init__(parent)
+        self.sources = sources
+        self.profiles_dir = profiles_dir
+        self.policy = policy
+        self.map_chunks = map_chunks
+        self.store_thumbnail = store_thumbnail
+        self.backup = backup  # PendingSnapshot that receives every file before it is written
+        self.cancelled = False
+    
+    def cancel(self):
+        """Ask the import to stop after the current file."""
+        self.cancelled = True
+    
+    def run(self):
+        try:
+            result = import_profiles(
+                self.sources,
+                self.profiles_dir,
+                self.policy,
+                map_chunks=self.map_chunks,
+                progress=self.progress.emit,
+                is_cancelled=lambda: self.cancelled,
+                store_thumbnail=self.store_thumbnail,
+                before_write=self.backup.add if self.backup else None
+            )
+            self.import_finished.emit(result)
+        except ImportCancelled as e:
+            self.import_cancelled.emit(e.result)
+        except Exception as e:
+            self.import_failed.emit(str(e))
+        finally:
+            # Record whatever was written, even if the import stopped early
+            if self.backup:
+                try:
+                    self.backup.commit()
+                except Exception as e:
+                    print(f"Error saving import backup: {str(e)}")
+
+class SnapshotDialog(QDialog):
+    """Lists backup snapshots and restores files from them."""
+    
+    def __init__(self, snapshot_store, profiles_dir, parent=None):
+        super().__init__(parent)
+        self.snapshot_store = snapshot_store
+        self.profiles_dir = profiles_dir
+        self.restored = set()  # File paths changed by restores, for the caller to re-scan
+        self.setWindowTitle("Backups")
+        self.setMinimumSize(700, 450)
         
-        # Create profile content view
-        self.profile_view = ProfileContentView(self)
-        self.stacked_widget.addWidget(self.profile_view)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Snapshots are taken automatically before profiles are deleted, purged, saved or overwritten by an import."))
         
-        # Store profile data for sorting and filtering
-        self.profile_data = []
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.snapshot_list = QListWidget()
+        self.snapshot_list.currentRowChanged.connect(self.on_snapshot_selected)
+        splitter.addWidget(self.snapshot_list)
+        self.file_list = QListWidget()
+        self.file_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        splitter.addWidget(self.file_list)
+        layout.addWidget(splitter, 1)
         
-        # Show the window first
-        self.show()
+        button_layout = QHBoxLayout()
+        restore_files_button = QPushButton("Restore Selected Files")
+        restore_files_button.clicked.connect(self.restore_selected_files)
+        button_layout.addWidget(restore_files_button)
+        restore_snapshot_button = QPushButton("Restore Snapshot")
+        restore_snapshot_button.setToolTip("Put back every file in this snapshot")
+        restore_snapshot_button.clicked.connect(self.restore_snapshot)
+        button_layout.addWidget(restore_snapshot_button)
+        restore_to_button = QPushButton("Restore to This Point")
+        restore_to_button.setToolTip("Undo this operation and every operation after it")
+        restore_to_button.clicked.connect(self.restore_to_point)
+        button_layout.addWidget(restore_to_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
         
-        # Then check and set CVR directory
-        self.check_cvr_directory()
+        self.load_snapshots()
     
-    def check_cvr_directory(self):
-        """Check if CVR directory is set and valid."""
-        print("Checking CVR directory...")
-        cvr_dir = self.settings_manager.get_cvr_directory()
-        if cvr_dir:
-            print(f"CVR directory found: {cvr_dir}")
-            self.directory_label.setText(f"CVR Directory: {cvr_dir}")
-            self.initialize_api()  # Initialize API after directory is found
-            self.load_initial_profiles()  # Load profiles without cache first
-            self.refresh_profiles()  # Then refresh with cache
+    def load_snapshots(self):
+        """Fill the snapshot list, newest first."""
+        self.snapshots = self.snapshot_store.list_snapshots()
+        self.snapshot_list.clear()
+        for snapshot in self.snapshots:
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["created"]))
+            self.snapshot_list.addItem(f"{created}  {snapshot['reason']} ({len(snapshot['files'])} file(s))")
+        if self.snapshots:
+            self.snapshot_list.setCurrentRow(0)
         else:
-            print("CVR directory not found")
-            self.directory_label.setText("CVR Directory: Not Set")
-            self.prompt_cvr_directory()
+            self.file_list.clear()
     
-    def load_initial_profiles(self):
-        """Load profiles without cache data first to show the UI quickly."""
-        print("Loading initial profiles...")
-        self.profile_list.clear()
-        self.profile_data = []  # Clear stored profile data
-        
-        profiles_dir = self.settings_manager.get_profiles_directory()
-        if not profiles_dir:
-            print("Could not find profiles directory")
-            self.status_label.setText("Could not find profiles directory")
+    def current_snapshot(self):
+        row = self.snapshot_list.currentRow()
+        return self.snapshots[row] if 0 <= row < len(self.snapshots) else None
+    
+    def on_snapshot_selected(self, row):
+        """Show the files captured by the selected snapshot."""
+        self.file_list.clear()
+        snapshot = self.current_snapshot()
+        if not snapshot:
+            return
+        for file_name, entry in sorted(snapshot["files"].items()):
+            item = QListWidgetItem(file_name if entry["sha256"] else f"{file_name} (did not exist)")
+            item.setData(Qt.ItemDataRole.UserRole, file_name)
+            self.file_list.addItem(item)
+    
+    def restore(self, description, file_paths, restore_function):
+        """Confirm, back up the current state of the files, then run the restore."""
+        reply = QMessageBox.question(
+            self,
+            "Confirm Restore",
+            f"{description}\n\n{len(file_paths)} file(s) will be replaced or removed. "
+            "Their current state is backed up first.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
             return
-        
         try:
-            # Get all .advavtr files in the directory
-            total_profiles = 0
-            empty_profiles = 0
-            show_empty = self.show_empty_checkbox.isChecked()
-            
-            # Get list of files first
-            profile_files = []
-            for file_name in os.listdir(profiles_dir):
-                if file_name.endswith(".advavtr"):
-                    total_profiles += 1
-                    file_path = os.path.join(profiles_dir, file_name)
-                    
-                    # Check if the profile is empty
-                    is_empty = self.is_empty_profile(file_path)
-                    if is_empty:
-                        empty_profiles += 1
-                        if not show_empty:
-                            continue
-                    
-                    profile_files.append((file_name, file_path, is_empty))
-            
-            # Create initial profile data with default values
-            for file_name, file_path, is_empty in profile_files:
-                # Get avatar ID from filename
-                avatar_id = os.path.splitext(file_name)[0]
-                
-                # Create default avatar data
-                avatar_data = {
-                    "name": "Loading...",
-                    "imageUrl": "",
-                    "lastUpdated": 0
-                }
-                
-                # Store profile data for sorting and filtering
-                self.profile_data.append((file_name, avatar_data, file_path, is_empty))
-            
-            # Sort and display profiles
-            self.sort_profiles()
-            
-            print(f"Found {total_profiles} profiles ({empty_profiles} empty)")
-            self.status_label.setText(f"Found {total_profiles} profiles ({empty_profiles} empty)")
+            self.snapshot_store.capture(file_paths, "Before restore")
+            restore_function()
+            self.restored.update(file_paths)
+            self.load_snapshots()
+            QMessageBox.information(self, "Success", f"Restored {len(file_paths)} file(s).")
         except Exception as e:
-            print(f"Error loading profiles: {str(e)}")
-            self.status_label.setText(f"Error loading profiles: {str(e)}")
+            QMessageBox.critical(self, "Error", f"An error occurred while restoring: {str(e)}")
     
-    def initialize_api(self):
-        """Initialize the CVR API with credentials from autologin profile."""
-        print("Initializing CVR API...")
-        autologin_path = self.settings_manager.get_autologin_profile_path()
-        if autologin_path:
-            if self.profile_view.cvr_api.load_credentials_from_file(autologin_path):
-                print("Successfully authenticated with CVR API")
-            else:
-                print("Failed to authenticate with CVR API")
-        else:
-            print("Autologin profile not found")
+    def restore_selected_files(self):
+        snapshot = self.current_snapshot()
+        file_names = [item.data(Qt.ItemDataRole.UserRole) for item in self.file_list.selectedItems()]
+        if not snapshot or not file_names:
+            return
+        self.restore(
+            "Restore the selected files from this snapshot?",
+            [self.snapshot_store.target_path(snapshot, name, self.profiles_dir) for name in file_names],
+            lambda: [self.snapshot_store.restore_file(snapshot, name, self.profiles_dir) for name in file_names]
+        )
     
-    def setup_main_page(self):
-        """Set up the main page with directory selection and profile list."""
-        layout = QVBoxLayout(self.main_page)
-        layout.setSpacing(5)  # Reduce spacing between widgets
-        
-        # Add welcome label
-        welcome_label = QLabel("CVR Advanced Avatar Settings Manager")
-        welcome_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        welcome_label.setStyleSheet("font-size: 18pt; font-weight: bold; margin: 10px 0 2px 0;")
-        layout.addWidget(welcome_label)
+    def restore_snapshot(self):
+        snapshot = self.current_snapshot()
+        if not snapshot:
+            return
+        self.restore(
+            "Restore every file in this snapshot?",
+            [self.snapshot_store.target_path(snapshot, name, self.profiles_dir) for name in snapshot["files"]],
+            lambda: self.snapshot_store.restore_snapshot(snapshot, self.profiles_dir)
+        )
+    
+    def restore_to_point(self):
+        snapshot = self.current_snapshot()
+        if not snapshot:
+            return
+        newer = [s for s in self.snapshots if s["id"] >= snapshot["id"]]
+        file_paths = sorted({self.snapshot_store.target_path(s, name, self.profiles_dir)
+                             for s in newer for name in s["files"]})
+        self.restore(
+            f"Undo this operation and the {len(newer) - 1} operation(s) after it?",
+            file_paths,
+            lambda: self.snapshot_store.restore_to(snapshot["id"], self.profiles_dir)
+        )
+
+class BatchEditDialog(QDialog):
+    """Asks for the parameter pattern, the edit rule and the files to edit."""
+    
+    def __init__(self, has_selection, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Edit Parameters")
+        self.setMinimumWidth(420)
+        
+        layout = QGridLayout(self)
+        layout.addWidget(QLabel("Parameter name (* and ? wildcards):"), 0, 0)
+        self.pattern_edit = QLineEdit()
+        self.pattern_edit.setPlaceholderText("e.g. Hue or *Toggle*")
+        layout.addWidget(self.pattern_edit, 0, 1)
+        
+        layout.addWidget(QLabel("Operation:"), 1, 0)
+        self.operation_combo = QComboBox()
+        self.operation_combo.addItem("Set to", OPERATION_SET)
+        self.operation_combo.addItem("Scale by", OPERATION_SCALE)
+        self.operation_combo.addItem("Clamp to range", OPERATION_CLAMP)
+        self.operation_combo.currentIndexChanged.connect(self.update_fields)
+        layout.addWidget(self.operation_combo, 1, 1)
+        
+        self.value_label = QLabel("Value:")
+        layout.addWidget(self.value_label, 2, 0)
+        self.value_edit = QLineEdit()
+        layout.addWidget(self.value_edit, 2, 1)
+        self.maximum_label = QLabel("Maximum:")
+        layout.addWidget(self.maximum_label, 3, 0)
+        self.maximum_edit = QLineEdit()
+        layout.addWidget(self.maximum_edit, 3, 1)
+        
+        layout.addWidget(QLabel("Apply to:"), 4, 0)
+        self.scope_combo = QComboBox()
+        if has_selection:
+            self.scope_combo.addItem("Selected profiles")
+        self.scope_combo.addItem("All profiles in the CVR install")
+        layout.addWidget(self.scope_combo, 4, 1)
         
-        # Add version label
-        version_label = QLabel(f"Version {get_version()}")
-        version_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        version_label.setStyleSheet("font-size: 10pt; color: #666; margin: 0 0 10px 0;")
-        layout.addWidget(version_label)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        preview_button = QPushButton("Preview")
+        preview_button.setDefault(True)
+        preview_button.clicked.connect(self.accept_rule)
+        button_layout.addWidget(preview_button)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout, 5, 0, 1, 2)
+        
+        self.rule = None
+        self.update_fields()
+    
+    def update_fields(self):
+        clamp = self.operation_combo.currentData() == OPERATION_CLAMP
+        self.value_label.setText("Minimum (optional):" if clamp else "Value:")
+        self.maximum_label.setVisible(clamp)
+        self.maximum_edit.setVisible(clamp)
+    
+    @property
+    def selected_only(self):
+        return self.scope_combo.currentText() == "Selected profiles"
+    
+    def accept_rule(self):
+        """Validate the input and build the edit rule."""
+        pattern = self.pattern_edit.text().strip()
+        operation = self.operation_combo.currentData()
+        if not pattern:
+            QMessageBox.warning(self, "Invalid Input", "Please enter a parameter name or pattern.")
+            return
         
-        # Add CVR directory section
-        directory_layout = QHBoxLayout()
-        self.directory_label = QLabel("CVR Directory: Not Set")
-        directory_layout.addWidget(self.directory_label)
+        def number(text, optional):
+            text = text.strip()
+            if not text and optional:
+                return None
+            return float(text)
+        
+        try:
+            if operation == OPERATION_SET:
+                # Same conversion as editing a value by hand: numbers become floats
+                text = self.value_edit.text()
+                try:
+                    value = float(text)
+                except ValueError:
+                    value = text
+                self.rule = EditRule(pattern, operation, value, None, None)
+            elif operation == OPERATION_SCALE:
+                self.rule = EditRule(pattern, operation, number(self.value_edit.text(), False), None, None)
+            else:
+                minimum = number(self.value_edit.text(), True)
+                maximum = number(self.maximum_edit.text(), True)
+                if minimum is None and maximum is None:
+                    raise ValueError("Enter a minimum, a maximum or both.")
+                if minimum is not None and maximum is not None and minimum > maximum:
+                    raise ValueError("The minimum is larger than the maximum.")
+                self.rule = EditRule(pattern, operation, None, minimum, maximum)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", f"Please enter a valid number. {str(e)}")
+            return
+        self.accept()
+
+class BatchEditWorker(QThread):
+    """Previews or applies a batch edit in the background."""
+    progress = pyqtSignal(int, int)
+    edit_finished = pyqtSignal(list)
+    edit_cancelled = pyqtSignal()
+    edit_failed = pyqtSignal(str)
+    
+    def __init__(self, file_paths, rule, dry_run, map_chunks, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.rule = rule
+        self.dry_run = dry_run
+        self.map_chunks = map_chunks
+        self.cancelled = False
+    
+    def cancel(self):
+        """Ask the edit to stop after the current batch of files."""
+        self.cancelled = True
+    
+    def run(self):
+        try:
+            results = batch_edit(
+                self.file_paths,
+                self.rule,
+                dry_run=self.dry_run,
+                map_chunks=self.map_chunks,
+                progress=self.progress.emit,
+                is_cancelled=lambda: self.cancelled
+            )
+            self.edit_finished.emit(results)
+        except BatchEditCancelled:
+            self.edit_cancelled.emit()
+        except Exception as e:
+            self.edit_failed.emit(str(e))
+
+def format_size(size):
+    """Format a byte count for display."""
+    for unit in ("bytes", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+class StatisticsWorker(QThread):
+    """Collects directory statistics in the background."""
+    stats_finished = pyqtSignal(object)
+    stats_failed = pyqtSignal(str)
+    
+    def __init__(self, stats_collector, profiles_dir, map_chunks, parent=None):
+        super().__init__(parent)
+        self.stats_collector = stats_collector
+        self.profiles_dir = profiles_dir
+        self.map_chunks = map_chunks
+    
+    def run(self):
+        try:
+            self.stats_finished.emit(self.stats_collector.collect(self.profiles_dir, self.map_chunks))
+        except Exception as e:
+            self.stats_failed.emit(str(e))
+
+class StatisticsDialog(QDialog):
+    """Shows directory statistics and exports them as JSON or CSV."""
+    
+    def __init__(self, stats, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+        self.setWindowTitle("Profile Statistics")
+        self.setMinimumSize(600, 550)
+        
+        layout = QVBoxLayout(self)
+        text = QTextEdit()
+        text.setReadOnly(True)
+        text.setPlainText(self.describe(stats))
+        layout.addWidget(text, 1)
+        
+        button_layout = QHBoxLayout()
+        export_json_button = QPushButton("Export JSON...")
+        export_json_button.clicked.connect(lambda: self.export("JSON Files (*.json)", ".json", stats.export_json))
+        button_layout.addWidget(export_json_button)
+        export_csv_button = QPushButton("Export CSV...")
+        export_csv_button.clicked.connect(lambda: self.export("CSV Files (*.csv)", ".csv", stats.export_csv))
+        button_layout.addWidget(export_csv_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+    
+    @staticmethod
+    def describe(stats):
+        per_avatar = stats.profiles_per_avatar
+        per_profile = stats.values_per_profile
+        lines = [
+            f"Profile files: {stats.total_files} ({stats.empty} empty, {stats.corrupt} corrupt)",
+            f"Total size: {format_size(stats.total_bytes)}",
+            f"Avatars: {len(stats.avatars)}",
+            f"Saved profiles: {stats.saved_profiles}",
+            f"Values: {stats.total_values}",
+            "",
+            f"Saved profiles per avatar: min {per_avatar['min']}, mean {per_avatar['mean']}, "
+            f"median {per_avatar['median']}, max {per_avatar['max']}",
+            f"Values per saved profile: min {per_profile['min']}, mean {per_profile['mean']}, "
+            f"median {per_profile['median']}, max {per_profile['max']}",
+            "",
+            "Largest files:"
+        ]
+        lines += [f"  {format_size(s.size):>10}  {s.file_name}" for s in stats.largest_files]
+        lines += ["", "Oldest untouched files:"]
+        lines += [f"  {time.strftime('%Y-%m-%d', time.localtime(s.mtime))}  {s.file_name}" for s in stats.oldest_files]
+        lines += ["", "Most saved profiles:"]
+        lines += [f"  {count:>5}  {avatar_id}" for avatar_id, count in stats.most_profiles]
+        return "\n".join(lines)
+    
+    def export(self, file_filter, extension, export_function):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Statistics", f"profile_statistics{extension}", file_filter)
+        if not file_path:
+            return
+        if not file_path.lower().endswith(extension):
+            file_path += extension
+        try:
+            export_function(file_path)
+            QMessageBox.information(self, "Success", f"Statistics exported to {file_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while exporting statistics: {str(e)}")
+
+class DuplicateSearchWorker(QThread):
+    """Fingerprints saved profiles and groups duplicates in the background."""
+    search_finished = pyqtSignal(object)
+    search_failed = pyqtSignal(str)
+    
+    def __init__(self, file_paths, tolerance, map_chunks, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.tolerance = tolerance
+        self.map_chunks = map_chunks
+    
+    def run(self):
+        try:
+            self.search_finished.emit(find_duplicates(self.file_paths, self.tolerance, self.map_chunks))
+        except Exception as e:
+            self.search_failed.emit(str(e))
+
+class DuplicatesDialog(QDialog):
+    """Lists duplicate saved profiles and offers to remove the exact ones."""
+    
+    MAX_GROUPS = 200  # Groups listed per section, to keep the dialog responsive
+    
+    def __init__(self, report, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Duplicate Profiles")
+        self.setMinimumSize(650, 550)
+        
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(
+            f"{len(report.exact)} group(s) of identical saved profiles, "
+            f"{report.duplicate_count} removable duplicate(s).\n"
+            "Within each avatar the first saved profile is kept; matches between different avatars are only listed."
+        ))
+        text = QTextEdit()
+        text.setReadOnly(True)
+        text.setPlainText(self.describe(report))
+        layout.addWidget(text, 1)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        remove_button = QPushButton(f"Remove {report.duplicate_count} Duplicate(s)")
+        remove_button.setEnabled(report.duplicate_count > 0)
+        remove_button.clicked.connect(self.accept)
+        button_layout.addWidget(remove_button)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.reject)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+    
+    def describe(self, report):
+        def member(fingerprint):
+            return f"  {fingerprint.file_name} #{fingerprint.index + 1} '{fingerprint.profile_name}'"
+        
+        lines = ["Identical saved profiles:"]
+        for group in report.exact[:self.MAX_GROUPS]:
+            lines += [member(fingerprint) for fingerprint in group] + [""]
+        if len(report.exact) > self.MAX_GROUPS:
+            lines.append(f"...and {len(report.exact) - self.MAX_GROUPS} more groups\n")
+        if report.near:
+            lines.append("Nearly identical saved profiles (not removed automatically):")
+            for group in report.near[:self.MAX_GROUPS]:
+                lines += [member(fingerprint) for fingerprint in group] + [""]
+            if len(report.near) > self.MAX_GROUPS:
+                lines.append(f"...and {len(report.near) - self.MAX_GROUPS} more groups")
+        return "\n".join(lines)
+
+class CacheEvictionWorker(QThread):
+    """Evicts old and orphaned avatar cache entries and thumbnails in the background."""
+    eviction_finished = pyqtSignal(object)
+    eviction_failed = pyqtSignal(str)
+    
+    def __init__(self, cache_manager, profiles_dirs, limits, parent=None):
+        super().__init__(parent)
+        self.cache_manager = cache_manager
+        self.profiles_dirs = profiles_dirs
+        self.limits = limits
+    
+    def run(self):
+        try:
+            self.eviction_finished.emit(evict_cache(self.cache_manager, self.profiles_dirs, self.limits))
+        except Exception as e:
+            self.eviction_failed.emit(str(e))
+
+class CacheWarmingWorker(QThread):
+    """Revalidates and prefetches avatar cache entries while the app is idle.
+    
+    With missing_only, only avatars without a complete entry are looked up, e.g.
+    after a library scan, and user input doesn't stop the lookups.
+    """
+    entry_fetched = pyqtSignal(str, object)
+    
+    def __init__(self, cache_manager, api_client, profiles_dirs, missing_only=False, parent=None):
+        super().__init__(parent)
+        self.cache_manager = cache_manager
+        self.api_client = api_client
+        self.profiles_dirs = profiles_dirs
+        self.missing_only = missing_only
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def run(self):
+        try:
+            warm_cache(self.cache_manager, self.api_client, self.profiles_dirs,
+                       lambda: self.cancelled, self.entry_fetched.emit, missing_only=self.missing_only)
+        except Exception as e:
+            print(f"Error warming cache: {str(e)}")
+
+class LibraryScanWorker(QThread):
+    """Scans one additional profile library, independently of the others."""
+    library_scanned = pyqtSignal(str, object)
+    library_failed = pyqtSignal(str, str)
+    
+    def __init__(self, root, profile_index, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.profile_index = profile_index
+    
+    def run(self):
+        try:
+            self.library_scanned.emit(self.root, scan_library(self.root, self.profile_index))
+        except Exception as e:
+            self.library_failed.emit(self.root, str(e))
+
+class CacheLimitsDialog(QDialog):
+    """Edits the avatar cache limits before cleaning up the cache."""
+    
+    def __init__(self, limits, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Clean Up Cache")
+        self.setMinimumWidth(380)
+        
+        layout = QGridLayout(self)
+        layout.addWidget(QLabel(
+            "Entries of deleted avatars are removed first, then the least recently used ones."
+        ), 0, 0, 1, 2)
+        self.spin_boxes = {}
+        for row, (key, label, maximum) in enumerate([
+            ("max_entries", "Maximum entries:", 1000000),
+            ("max_megabytes", "Maximum size (MB):", 100000),
+            ("max_age_days", "Remove entries unused for (days):", 3650)
+        ], start=1):
+            layout.addWidget(QLabel(label), row, 0)
+            spin_box = QSpinBox()
+            spin_box.setRange(1, maximum)
+            spin_box.setValue(int(limits[key]))
+            layout.addWidget(spin_box, row, 1)
+            self.spin_boxes[key] = spin_box
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        clean_button = QPushButton("Clean Up")
+        clean_button.setDefault(True)
+        clean_button.clicked.connect(self.accept)
+        button_layout.addWidget(clean_button)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout, 4, 0, 1, 2)
+    
+    @property
+    def limits(self):
+        return {key: spin_box.value() for key, spin_box in self.spin_boxes.items()}
+
+class ProfileLibrariesDialog(QDialog):
+    """Edits the additional profile directories listed next to the CVR install's."""
+    
+    def __init__(self, libraries, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Profile Libraries")
+        self.setMinimumSize(560, 320)
+        
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(
+            "Profiles in these folders (other installs, backup folders) are listed together with\n"
+            "the CVR install's profiles. Each library gets a filter of its own."
+        ))
+        self.library_list = QListWidget()
+        layout.addWidget(self.library_list, 1)
+        for library in libraries:
+            self.add_library(library["path"], library.get("label", ""))
+        
+        button_layout = QHBoxLayout()
+        add_button = QPushButton("Add...")
+        add_button.clicked.connect(self.choose_library)
+        button_layout.addWidget(add_button)
+        remove_button = QPushButton("Remove")
+        remove_button.clicked.connect(lambda: [self.library_list.takeItem(self.library_list.row(item))
+                                               for item in self.library_list.selectedItems()])
+        button_layout.addWidget(remove_button)
+        button_layout.addStretch()
+        save_button = QPushButton("Save")
+        save_button.setDefault(True)
+        save_button.clicked.connect(self.accept)
+        button_layout.addWidget(save_button)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+    
+    def add_library(self, path, label):
+        item = QListWidgetItem(f"{label}  ({path})")
+        item.setData(Qt.ItemDataRole.UserRole, {"path": path, "label": label})
+        self.library_list.addItem(item)
+    
+    def choose_library(self):
+        """Ask for a folder and a label and add it to the list."""
+        path = QFileDialog.getExistingDirectory(self, "Select Profile Folder", "", QFileDialog.Option.ShowDirsOnly)
+        if not path:
+            return
+        label, ok = QInputDialog.getText(self, "Library Label", "Label shown in the list and filters:",
+                                         text=os.path.basename(os.path.normpath(path)))
+        if ok:
+            self.add_library(path, label.strip())
+    
+    @property
+    def libraries(self):
+        return [self.library_list.item(row).data(Qt.ItemDataRole.UserRole) for row in range(self.library_list.count())]
+
+class CVRProfileManager(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        version = get_version()
+        self.setWindowTitle(f"CVR Advanced Avatar Settings Manager v{version}")
+        self.setMinimumSize(800, 900)
+        
+        # Initialize settings manager
+        self.settings_manager = SettingsManager()
+        
+        # Initialize cache manager
+        self.cache_manager = CacheManager()
+        self.thumbnail_loader = ThumbnailLoader(parent=self)
+        
+        # Initialize profile scanner (uses worker processes for large directories)
+        self.profile_scanner = ProfileScanner()
+        
+        # Initialize snapshot store (backups taken before destructive operations)
+        self.snapshot_store = SnapshotStore()
+        
+        # Initialize the index of parameter and saved-profile names
+        self.profile_index = ProfileIndex()
+        
+        # Additional profile libraries, each with its own index and scan thread
+        self.libraries = ProfileLibraries(self.profile_index)
+        self.library_workers = {}  # root -> LibraryScanWorker
+        self.changed_during_scan = {}  # root -> file paths changed while its library was scanned
+        
+        # Initialize the directory statistics collector
+        self.stats_collector = StatsCollector()
+        
+        # Create stacked widget for multiple views
+        self.stacked_widget = QStackedWidget()
+        self.setCentralWidget(self.stacked_widget)
+        
+        self.selected_filters = set()  # Checked filters, kept when the filter menu is rebuilt
+        
+        # Create main page
+        self.main_page = QWidget()
+        self.setup_main_page()
+        self.stacked_widget.addWidget(self.main_page)
+        
+        # Create profile content view
+        self.profile_view = ProfileContentView(self)
+        self.stacked_widget.addWidget(self.profile_view)
+        
+        # Store profile data for sorting and filtering
+        self.profile_data = []  # Records in the current sort order
+        self.profile_records = RecordStore(self.cache_manager)  # file path -> ProfileRecord
+        self.sort_views = SortedViews()
+        self.filter_index = FilterIndex()
+        
+        # Every list update goes through the scheduler, which merges pending
+        # requests and cancels updates that a newer one makes stale
+        self.refresh_scheduler = RefreshScheduler({
+            LEVEL_FILTER: lambda token: self.filter_profiles(),
+            LEVEL_SORT: lambda token: self.sort_profiles(),
+            LEVEL_SCAN: lambda token: self.run_refresh(token, fetch=False),
+            LEVEL_FETCH: lambda token: self.run_refresh(token, fetch=True)
+        }, QTimer.singleShot)
+        
+        # Warm the avatar cache in the background while the user is away
+        self.last_interaction = time.monotonic()
+        self.last_cache_warming = 0
+        self.cache_warming_worker = None
+        self.warmed_entries = {}
+        self.warm_missing_pending = False
+        QApplication.instance().installEventFilter(self)
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.check_idle)
+        self.idle_timer.start(IDLE_CHECK_MS)
+        
+        # Single-file index updates (saves, deletes, restores) are written in batches
+        self.index_save_timer = QTimer(self)
+        self.index_save_timer.timeout.connect(self.save_profile_indexes)
+        self.index_save_timer.start(INDEX_SAVE_INTERVAL_MS)
+        
+        # Show the window first
+        self.show()
+        
+        # Then check and set CVR directory
+        self.check_cvr_directory()
+    
+    def closeEvent(self, event):
+        """Stop background workers when the window closes."""
+        self.idle_timer.stop()
+        self.index_save_timer.stop()
+        if self.cache_warming_worker is not None:
+            self.cache_warming_worker.cancel()
+            self.cache_warming_worker.wait()
+        for worker in list(self.library_workers.values()):
+            worker.wait(2000)  # A library on an unreachable share may not finish; don't hang on it
+        self.profile_scanner.shutdown()
+        self.thumbnail_loader.shutdown()
+        self.save_profile_indexes()
+        self.cache_manager.save_access_times()
+        if self.libraries.roots:
+            order = self.sort_combo.currentText()
+            save_profile_list(self.libraries.roots, order,
+                              [self.profile_records.get(file_path) for file_path in self.sort_views.ordered(order)])
+        super().closeEvent(event)
+    
+    def save_profile_indexes(self):
+        """Save the profile indexes changed since the last save; scanning libraries save their own."""
+        for _, profile_index in self.libraries.available_indexes():
+            profile_index.save_if_dirty()
+    
+    def eventFilter(self, obj, event):
+        """Note user input and stop cache warming as soon as the user interacts."""
+        if event.type() in USER_INPUT_EVENTS:
+            self.last_interaction = time.monotonic()
+            if self.cache_warming_worker is not None and not self.cache_warming_worker.missing_only:
+                self.cache_warming_worker.cancel()
+        return super().eventFilter(obj, event)
+    
+    def check_idle(self):
+        """Start warming the avatar cache once the app has been idle for a while."""
+        now = time.monotonic()
+        if (self.cache_warming_worker is not None
+                or now - self.last_interaction < IDLE_AFTER_SECONDS
+                or now - self.last_cache_warming < CACHE_WARMING_INTERVAL_SECONDS
+                or self.refresh_scheduler.running or self.refresh_scheduler.pending
+                or not self.profile_view.cvr_api.authenticated):
+            return
+        if not self.libraries.roots:
+            return
+        
+        self.last_cache_warming = now
+        self.start_cache_warming(missing_only=False)
+    
+    def start_cache_warming(self, missing_only):
+        """Look up avatar details for every profile directory in the background."""
+        self.warmed_entries = {}
+        worker = CacheWarmingWorker(self.cache_manager, self.profile_view.cvr_api, self.libraries.roots,
+                                    missing_only, self)
+        worker.entry_fetched.connect(self.warmed_entries.__setitem__)
+        worker.finished.connect(self.on_cache_warmed)
+        worker.finished.connect(worker.deleteLater)
+        self.cache_warming_worker = worker  # Keep a reference while it runs
+        if missing_only:
+            # The user is waiting for these; show that details are still coming
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setVisible(True)
+        worker.start(QThread.Priority.LowestPriority)
+    
+    def warm_missing_entries(self):
+        """Look up the avatars without complete details in the background.
+        
+        If warming is already running, the lookup starts once it has finished.
+        """
+        if not self.profile_view.cvr_api.authenticated:
+            return
+        if self.cache_warming_worker is not None:
+            self.warm_missing_pending = True
+            return
+        self.start_cache_warming(missing_only=True)
+    
+    def on_cache_warmed(self):
+        """Store the entries fetched while idle and update the records that use them."""
+        self.cache_warming_worker = None
+        self.progress_bar.setVisible(False)
+        entries, self.warmed_entries = self.warmed_entries, {}
+        if self.warm_missing_pending:
+            self.warm_missing_pending = False
+            QTimer.singleShot(0, self.warm_missing_entries)
+        if not entries:
+            return
+        self.cache_manager.update_entries(entries)
+        for avatar_id in entries:
+            self.thumbnail_loader.invalidate(self.cache_manager.thumbnail_file(avatar_id))
+        for record in list(self.profile_records.values()):
+            entry = entries.get(record.avatar_id)
+            if entry is not None:
+                self.set_profile_record(record, entry)
+        self.refresh_scheduler.request(LEVEL_SORT)
+    
+    def check_cvr_directory(self):
+        """Check if CVR directory is set and valid."""
+        print("Checking CVR directory...")
+        cvr_dir = self.settings_manager.get_cvr_directory()
+        if cvr_dir:
+            print(f"CVR directory found: {cvr_dir}")
+            self.directory_label.setText(f"CVR Directory: {cvr_dir}")
+            self.initialize_api()  # Initialize API after directory is found
+            self.configure_libraries()
+            if self.load_initial_profiles():  # Show the list from last session, or the files without cache first
+                # Keep the details shown and only reconcile them with the directories
+                self.refresh_scheduler.request(LEVEL_SCAN, RECONCILE_DELAY_MS)
+            else:
+                self.refresh_profiles()  # Then refresh with cache
+            QTimer.singleShot(CACHE_EVICTION_DELAY_MS, lambda: self.evict_cache(self.settings_manager.get_cache_limits()))
+        else:
+            print("CVR directory not found")
+            self.directory_label.setText("CVR Directory: Not Set")
+            self.prompt_cvr_directory()
+    
+    def load_initial_profiles(self):
+        """Show the list saved at the end of the last session, or the profiles without cache data.
+        
+        Returns True if the saved list was shown.
+        """
+        print("Loading initial profiles...")
+        self.profile_list.clear()
+        self.clear_profile_records()  # Clear stored profile data
+        
+        profiles_dir = self.settings_manager.get_profiles_directory()
+        if not profiles_dir:
+            print("Could not find profiles directory")
+            self.status_label.setText("Could not find profiles directory")
+            return False
+        
+        saved_list = load_profile_list(self.libraries.roots, self.cache_manager.avatar_cache)
+        if saved_list is not None:
+            sort_order, profiles = saved_list
+            for result, avatar_data in profiles:
+                self.set_profile_record(result, avatar_data)
+            if sort_order in SORT_ORDERS:
+                self.sort_combo.blockSignals(True)
+                self.sort_combo.setCurrentText(sort_order)
+                self.sort_combo.blockSignals(False)
+            # Paint in the saved order; the sorted views are only needed once something changes
+            self.profile_data = [self.profile_records.get(result.file_path) for result, _ in profiles]
+            self.filter_profiles()
+            self.status_label.setText(f"Showing {len(profiles)} profiles from the last session, checking for changes...")
+            return True
+        
+        try:
+            # Get list of files first
+            profile_files, total_profiles, empty_profiles, corrupt_profiles = self.scan_profiles_directory(profiles_dir)
+            
+            # Create initial profile data with placeholder avatar data
+            for result in profile_files:
+                self.set_profile_record(result, LOADING_AVATAR)
+            
+            # Sort and display profiles
+            self.sort_profiles()
+            
+            self.show_scan_summary(total_profiles, empty_profiles, corrupt_profiles)
+        except Exception as e:
+            print(f"Error loading profiles: {str(e)}")
+            self.status_label.setText(f"Error loading profiles: {str(e)}")
+        return False
+    
+    def initialize_api(self):
+        """Initialize the CVR API with credentials from autologin profile."""
+        print("Initializing CVR API...")
+        autologin_path = self.settings_manager.get_autologin_profile_path()
+        if autologin_path:
+            if self.profile_view.cvr_api.load_credentials_from_file(autologin_path):
+                print("Successfully authenticated with CVR API")
+            else:
+                print("Failed to authenticate with CVR API")
+        else:
+            print("Autologin profile not found")
+    
+    def setup_main_page(self):
+        """Set up the main page with directory selection and profile list."""
+        layout = QVBoxLayout(self.main_page)
+        layout.setSpacing(5)  # Reduce spacing between widgets
+        
+        # Add welcome label
+        welcome_label = QLabel("CVR Advanced Avatar Settings Manager")
+        welcome_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        welcome_label.setStyleSheet("font-size: 18pt; font-weight: bold; margin: 10px 0 2px 0;")
+        layout.addWidget(welcome_label)
+        
+        # Add version label
+        version_label = QLabel(f"Version {get_version()}")
+        version_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        version_label.setStyleSheet("font-size: 10pt; color: #666; margin: 0 0 10px 0;")
+        layout.addWidget(version_label)
+        
+        # Add CVR directory section
+        directory_layout = QHBoxLayout()
+        self.directory_label = QLabel("CVR Directory: Not Set")
+        directory_layout.addWidget(self.directory_label)
         
         self.change_dir_button = QPushButton("Change Directory")
         self.change_dir_button.setFixedHeight(28)  # Make button height consistent
@@ -1170,7 +2146,7 @@ class CVRProfileManager(QMainWindow):
         # Add search bar
         search_layout = QHBoxLayout()
         self.search_bar = QLineEdit()
-        self.search_bar.setPlaceholderText("Search profiles...")
+        self.search_bar.setPlaceholderText("Search profiles... (param:Name or profile:Name searches inside the files)")
         self.search_bar.setStyleSheet("""
             QLineEdit {
                 padding: 6px 12px;
@@ -1183,7 +2159,7 @@ class CVRProfileManager(QMainWindow):
                 border: 1px solid #999;
             }
         """)
-        self.search_bar.textChanged.connect(self.filter_profiles)
+        self.search_bar.textChanged.connect(lambda: self.refresh_scheduler.request(LEVEL_FILTER, SEARCH_DELAY_MS))
         search_layout.addWidget(self.search_bar)
         layout.addLayout(search_layout)
         
@@ -1213,19 +2189,32 @@ class CVRProfileManager(QMainWindow):
                 border: 1px solid #999;
             }
         """)
-        self.sort_combo.addItems(["Avatar Name (A-Z)", "Filename (A-Z)"])
-        self.sort_combo.currentIndexChanged.connect(self.sort_profiles)
+        self.sort_combo.addItems(SORT_ORDERS)
+        self.sort_combo.currentIndexChanged.connect(lambda: self.refresh_scheduler.request(LEVEL_SORT))
         sort_layout.addWidget(sort_label)
         sort_layout.addWidget(self.sort_combo)
 
         # Add filter options
         filter_label = QLabel("Filter:")
-        self.filter_combo = QComboBox()
-        self.filter_combo.setStyleSheet(self.sort_combo.styleSheet())  # Reuse the same style
-        self.filter_combo.addItems(["All", "Owned by me", "Shared with me", "Public"])
-        self.filter_combo.currentIndexChanged.connect(self.filter_profiles)
+        self.filter_button = QPushButton("All")
+        self.filter_button.setStyleSheet("""
+            QPushButton {
+                padding: 6px 12px;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+                background-color: white;
+                font-size: 13px;
+                text-align: left;
+            }
+            QPushButton:hover {
+                border: 1px solid #999;
+            }
+        """)
+        self.filter_button.setToolTip("Filters in the same section match any, sections must all match")
+        self.filter_actions = []
+        self.build_filter_menu()
         sort_layout.addWidget(filter_label)
-        sort_layout.addWidget(self.filter_combo)
+        sort_layout.addWidget(self.filter_button)
 
         # Add show empty profiles checkbox
         self.show_empty_checkbox = QCheckBox("Show Empty Profiles")
@@ -1250,7 +2239,7 @@ class CVRProfileManager(QMainWindow):
             }
         """)
         self.show_empty_checkbox.setChecked(False)
-        self.show_empty_checkbox.stateChanged.connect(self.refresh_profiles)
+        self.show_empty_checkbox.stateChanged.connect(lambda: self.refresh_scheduler.request(LEVEL_FILTER))
         sort_layout.addWidget(self.show_empty_checkbox)
         
         # Add purge empty profiles button next to the checkbox
@@ -1288,6 +2277,7 @@ class CVRProfileManager(QMainWindow):
         list_container_layout.setContentsMargins(0, 0, 0, 0)  # Remove margins
         
         self.profile_list = QListWidget()
+        self.profile_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)  # Enable multi-selection for exports
         self.profile_list.itemDoubleClicked.connect(self.load_selected_profile)
         self.profile_list.setSpacing(4)  # Add consistent spacing between items
         self.profile_list.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
@@ -1345,7 +2335,10 @@ class CVRProfileManager(QMainWindow):
         self.import_button = QPushButton("Import Profiles")
         self.import_button.setFixedHeight(28)
         self.import_button.setStyleSheet(self.delete_profile_button.styleSheet())
-        self.import_button.clicked.connect(self.import_profile)
+        import_menu = QMenu(self.import_button)
+        import_menu.addAction("Files or Archives...").triggered.connect(self.import_profile)
+        import_menu.addAction("Folder...").triggered.connect(self.import_profile_folder)
+        self.import_button.setMenu(import_menu)
         import_export_layout.addWidget(self.import_button)
         
         # Add export button
@@ -1355,6 +2348,14 @@ class CVRProfileManager(QMainWindow):
         self.export_button.clicked.connect(lambda: self.export_profile())
         import_export_layout.addWidget(self.export_button)
         
+        # Add export as archive button
+        self.export_archive_button = QPushButton("Export Archive")
+        self.export_archive_button.setFixedHeight(28)
+        self.export_archive_button.setStyleSheet(self.delete_profile_button.styleSheet())
+        self.export_archive_button.setToolTip("Export the selected profiles (or all listed profiles) into a single archive")
+        self.export_archive_button.clicked.connect(self.export_profiles_archive)
+        import_export_layout.addWidget(self.export_archive_button)
+        
         import_export_group.setLayout(import_export_layout)
         profile_management_layout.addWidget(import_export_group)
         
@@ -1366,9 +2367,37 @@ class CVRProfileManager(QMainWindow):
         self.refresh_button = QPushButton("Refresh")
         self.refresh_button.setFixedHeight(28)
         self.refresh_button.setStyleSheet(self.delete_profile_button.styleSheet())
-        self.refresh_button.clicked.connect(self.refresh_profiles)
+        self.refresh_button.clicked.connect(lambda: self.refresh_scheduler.request(LEVEL_SCAN))
         other_actions_layout.addWidget(self.refresh_button)
         
+        # Add tools button with a menu of directory-wide tools
+        self.tools_button = QPushButton("Tools")
+        self.tools_button.setFixedHeight(28)
+        self.tools_button.setStyleSheet(self.delete_profile_button.styleSheet())
+        tools_menu = QMenu(self.tools_button)
+        batch_edit_action = tools_menu.addAction("Batch Edit...")
+        batch_edit_action.setToolTip("Set, scale or clamp a parameter across many profiles at once")
+        batch_edit_action.triggered.connect(self.batch_edit_profiles)
+        self.duplicates_action = tools_menu.addAction("Find Duplicates...")
+        self.duplicates_action.setToolTip("Find saved profiles with identical or nearly identical values")
+        self.duplicates_action.triggered.connect(self.find_duplicate_profiles)
+        self.statistics_action = tools_menu.addAction("Statistics")
+        self.statistics_action.setToolTip("Show size and content statistics for the profiles directory")
+        self.statistics_action.triggered.connect(self.show_statistics)
+        self.cache_cleanup_action = tools_menu.addAction("Clean Up Cache...")
+        self.cache_cleanup_action.setToolTip("Remove cached details and thumbnails of deleted or long unused avatars")
+        self.cache_cleanup_action.triggered.connect(self.clean_up_cache)
+        libraries_action = tools_menu.addAction("Profile Libraries...")
+        libraries_action.setToolTip("List profiles from other installs and backup folders too")
+        libraries_action.triggered.connect(self.edit_profile_libraries)
+        tools_menu.addSeparator()
+        backups_action = tools_menu.addAction("Backups...")
+        backups_action.setToolTip("Restore profiles from the backups taken before deletes, saves and imports")
+        backups_action.triggered.connect(self.show_backups)
+        tools_menu.setToolTipsVisible(True)
+        self.tools_button.setMenu(tools_menu)
+        other_actions_layout.addWidget(self.tools_button)
+        
         other_actions_group.setLayout(other_actions_layout)
         profile_management_layout.addWidget(other_actions_group)
         
@@ -1384,18 +2413,168 @@ class CVRProfileManager(QMainWindow):
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.status_label)
     
+    def build_filter_menu(self):
+        """(Re)build the filter menu, with a section for the libraries if there are any."""
+        filter_menu = QMenu(self.filter_button)
+        self.filter_actions = []
+        for group_name, filters in self.filter_groups():
+            filter_menu.addSection(group_name)
+            for filter_name in filters:
+                action = filter_menu.addAction(filter_name)
+                action.setCheckable(True)
+                action.setChecked(filter_name in self.selected_filters)
+                action.toggled.connect(lambda checked, name=filter_name: self.toggle_filter(name, checked))
+                self.filter_actions.append(action)
+        filter_menu.addSeparator()
+        filter_menu.addAction("Clear Filters").triggered.connect(self.clear_filters)
+        self.filter_button.setMenu(filter_menu)
+    
+    def filter_groups(self):
+        """The filter sections, including the libraries if any are configured."""
+        library_filters = self.libraries.filter_names()
+        return FILTER_GROUPS + [(LIBRARY_GROUP, library_filters)] if library_filters else FILTER_GROUPS
+    
+    def configure_libraries(self):
+        """Apply the library settings; drops the records and filters of removed libraries."""
+        removed = self.libraries.configure(self.settings_manager.get_profiles_directory(),
+                                           self.settings_manager.get_profile_libraries())
+        for file_path in [path for path, record in self.profile_records.records.items() if record.directory in removed]:
+            self.remove_profile_record(file_path)
+        names = {name for _, filters in self.filter_groups() for name in filters}
+        self.selected_filters &= names
+        self.filter_button.setText(", ".join(sorted(self.selected_filters)) if self.selected_filters else "All")
+        self.build_filter_menu()
+    
+    def scan_libraries(self):
+        """Scan every additional library on its own thread; running scans are left alone."""
+        for root in self.libraries.labels:
+            profile_index = self.libraries.begin_scan(root)
+            if profile_index is None:
+                continue  # Still scanning; a slow library doesn't hold up the others
+            worker = LibraryScanWorker(root, profile_index, self)
+            worker.library_scanned.connect(self.on_library_scanned)
+            worker.library_failed.connect(self.on_library_failed)
+            worker.finished.connect(lambda root=root: self.library_workers.pop(root, None))
+            worker.finished.connect(worker.deleteLater)
+            self.library_workers[root] = worker  # Keep a reference while it runs
+            worker.start()
+    
+    def on_library_scanned(self, root, results):
+        """Merge the scan results of a library into the list."""
+        self.libraries.end_scan(root)
+        changed = self.changed_during_scan.pop(root, set())
+        if root not in self.libraries.labels:
+            return  # Removed while it was scanned
+        
+        # Files deleted, saved or imported during the scan may have been seen in their old state
+        if changed:
+            results = [result for result in results if result.file_path not in changed]
+            results += [scan_file(file_path) for file_path in sorted(changed) if os.path.exists(file_path)]
+            self.libraries.index_for(root).update_files(sorted(changed))
+        
+        current = {result.file_path for result in results}
+        for file_path in [path for path, record in self.profile_records.records.items()
+                          if record.directory == root and path not in current]:
+            self.remove_profile_record(file_path)
+        
+        # Details come from the cache only; missing ones are looked up in the background
+        missing = False
+        for result in results:
+            existing = self.profile_records.get(result.file_path)
+            if existing is not None and existing.avatar_data.get("lastUpdated"):
+                avatar_data = existing.avatar_data
+            else:
+                avatar_data = self.cache_manager.get_avatar_data(avatar_id_from_file_name(result.file_name))
+                missing = missing or not avatar_data.get("lastUpdated")
+            self.set_profile_record(result, avatar_data)
+        print(f"Library {self.libraries.label(root)}: {len(results)} profiles")
+        self.refresh_scheduler.request(LEVEL_SORT)
+        
+        if missing:
+            self.warm_missing_entries()
+    
+    def on_library_failed(self, root, message):
+        """Keep the last known records of a library that couldn't be scanned."""
+        self.libraries.end_scan(root)
+        changed = self.changed_during_scan.pop(root, set())
+        if changed and root in self.libraries.labels:
+            self.update_profiles(sorted(changed))
+        print(f"Error scanning library {root}: {message}")
+        self.status_label.setText(f"Could not scan library {self.libraries.label(root)}: {message}")
+    
+    def edit_profile_libraries(self):
+        """Edit the additional libraries and re-scan."""
+        dialog = ProfileLibrariesDialog(self.settings_manager.get_profile_libraries(), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.settings_manager.set_profile_libraries(dialog.libraries)
+        self.configure_libraries()
+        self.refresh_scheduler.request(LEVEL_SCAN)
+    
+    def set_profile_record(self, scan_result, avatar_data):
+        """Add or replace the record for a scanned file and update its sort keys.
+        
+        scan_result is a ScanResult, or an existing record to give new avatar data.
+        """
+        record = self.profile_records.set(scan_result, avatar_data)
+        directory = record.directory
+        profile_index = self.libraries.index_for(directory)
+        saved_profiles = profile_index.saved_profile_count(record.file_name) if profile_index else 0
+        self.sort_views.set(record.file_path, sort_keys(record.file_name, record.avatar_data, record.size, record.mtime,
+                                                        saved_profiles))
+        flags = record_flags(record.avatar_data, record.state, record.size, self.profile_view.cvr_api.username)
+        flags.add(self.libraries.label(directory))
+        self.filter_index.set(record.file_path, flags)
+    
+    def primary_records(self):
+        """The records of the CVR install's profiles, in the current sort order.
+        
+        Operations over all profiles (purge, batch edit, duplicate removal) only
+        change these; the additional libraries are left alone.
+        """
+        primary_root = self.libraries.primary_root
+        return [record for record in self.profile_data if record.directory == primary_root]
+    
+    def remove_profile_record(self, file_path):
+        """Remove a profile record, if present."""
+        if self.profile_records.remove(file_path) is not None:
+            self.sort_views.remove(file_path)
+            self.filter_index.remove(file_path)
+    
+    def clear_profile_records(self):
+        """Remove all profile records, e.g. before a full rescan."""
+        self.profile_records.clear()
+        self.profile_data = []
+        self.sort_views.clear()
+        self.filter_index.clear()
+    
+    def toggle_filter(self, filter_name, checked):
+        """Add or remove one of the multi-select filters."""
+        if checked:
+            self.selected_filters.add(filter_name)
+            if filter_name == FILTER_EMPTY:
+                self.show_empty_checkbox.setChecked(True)
+        else:
+            self.selected_filters.discard(filter_name)
+        self.filter_button.setText(", ".join(sorted(self.selected_filters)) if self.selected_filters else "All")
+        self.refresh_scheduler.request(LEVEL_FILTER)
+    
+    def clear_filters(self):
+        """Uncheck all filters."""
+        for action in self.filter_actions:
+            action.blockSignals(True)
+            action.setChecked(False)
+            action.blockSignals(False)
+        self.selected_filters.clear()
+        self.filter_button.setText("All")
+        self.refresh_scheduler.request(LEVEL_FILTER)
+    
     def sort_profiles(self):
         """Sort the profiles based on the selected option."""
-        if not self.profile_data:
-            return
-            
-        sort_by = self.sort_combo.currentText()
-        if sort_by == "Avatar Name (A-Z)":
-            self.profile_data.sort(key=lambda x: x[1]["name"].lower())
-        else:  # Filename (A-Z)
-            self.profile_data.sort(key=lambda x: x[0].lower())
-            
-        self.update_profile_list()
+        # Sorted orders are cached and kept up to date as records change
+        order = self.sort_combo.currentText()
+        self.profile_data = [self.profile_records.get(file_path) for file_path in self.sort_views.ordered(order)]
+        self.filter_profiles()
     
     def filter_profiles(self):
         """Filter the profiles based on the search text and selected filter."""
@@ -1406,41 +2585,78 @@ class CVRProfileManager(QMainWindow):
         """Update the profile list with the current sort and filter."""
         self.profile_list.clear()
         
-        filter_option = self.filter_combo.currentText()
-        
-        for file_name, avatar_data, file_path, is_empty in self.profile_data:
-            # Apply search filter
-            if search_text and search_text not in file_name.lower() and search_text not in avatar_data["name"].lower():
+        # Combine the filter bitsets with the search results
+        mask = self.filter_index.mask(self.selected_filters, self.filter_groups())
+        if not self.show_empty_checkbox.isChecked():
+            mask &= ~self.filter_index.bits[FILTER_EMPTY]
+        index_matches = self.search_index(search_text)
+        if index_matches is not None:
+            mask &= self.filter_index.paths_mask(index_matches)
+        elif search_text:
+            mask &= self.filter_index.paths_mask(self.search_names(search_text))
+        visible = self.filter_index.matching_paths(mask)
+        
+        primary_root = self.libraries.primary_root
+        for record in self.profile_data:
+            if record.file_path not in visible:
                 continue
             
-            # Apply filter options
-            if filter_option == "Owned by me":
-                if not self.profile_view.cvr_api.username or avatar_data["creatorName"] != self.profile_view.cvr_api.username:
-                    continue
-            elif filter_option == "Shared with me":
-                if not avatar_data["isSharedWithMe"]:
-                    continue
-            elif filter_option == "Public":
-                if not avatar_data["isPublished"]:
-                    continue
-                
             # Create custom list item widget
-            item_widget = ProfileListItem(avatar_data, file_name, is_empty, self)
+            directory = record.directory
+            library = self.libraries.label(directory) if directory != primary_root else None
+            item_widget = ProfileListItem(record.avatar_data, record.file_name, record.state, self, library)
             
             # Create list widget item and set its size
             list_item = QListWidgetItem()
             list_item.setSizeHint(item_widget.sizeHint())
+            list_item.setData(Qt.ItemDataRole.UserRole, record.file_path)
             
             # Add the item to the list
             self.profile_list.addItem(list_item)
             self.profile_list.setItemWidget(list_item, item_widget)
     
+    def search_names(self, search_text):
+        """Return the file paths whose file or avatar name contains the search text."""
+        text = search_text.casefold()
+        # The sort keys already hold the casefolded avatar and file names
+        return [
+            file_path for file_path, keys in self.sort_views.keys.items()
+            if any(text in name for name in keys[SORT_AVATAR_NAME])
+        ]
+    
+    def search_index(self, search_text):
+        """Look up "param:" and "profile:" searches in the profile index.
+        
+        Returns {file path: [saved-profile indexes]}, or None for a plain search.
+        Libraries that are being scanned are left out until their scan is done.
+        """
+        for kind in (KIND_PARAM, KIND_PROFILE):
+            prefix = f"{kind}:"
+            if search_text.startswith(prefix):
+                term = search_text[len(prefix):].strip()
+                matches = {}
+                for root, profile_index in (self.libraries.available_indexes() if term else []):
+                    for file_name, indexes in profile_index.search(kind, term).items():
+                        matches[os.path.join(root, file_name)] = indexes
+                saved_profiles = sum(len(indexes) for indexes in matches.values())
+                self.status_label.setText(f"{kind.capitalize()} '{term}' found in {saved_profiles} saved profile(s) "
+                                          f"across {len(matches)} file(s)")
+                return matches
+        return None
+    
     def refresh_profiles(self):
-        """Refresh the list of available profiles."""
+        """Re-scan the profiles directory and look up every avatar's details again."""
+        self.refresh_scheduler.request(LEVEL_FETCH)
+    
+    def run_refresh(self, token, fetch):
+        """Re-scan the profiles directory and update the list; run by the scheduler.
+        
+        With fetch, every avatar's details are read from the cache again.
+        Otherwise records that already have details keep them and only new files
+        and placeholders are read. Details missing from the cache are looked up
+        in the background, so the list never waits for the API.
+        """
         print("Refreshing profiles...")
-        self.profile_list.clear()
-        self.profile_data = []  # Clear stored profile data
-        
         profiles_dir = self.settings_manager.get_profiles_directory()
         if not profiles_dir:
             print("Could not find profiles directory")
@@ -1448,91 +2664,75 @@ class CVRProfileManager(QMainWindow):
             return
         
         try:
-            # Get all .advavtr files in the directory
-            total_profiles = 0
-            empty_profiles = 0
-            show_empty = self.show_empty_checkbox.isChecked()
-            
             # Get list of files first
-            profile_files = []
-            for file_name in os.listdir(profiles_dir):
-                if file_name.endswith(".advavtr"):
-                    total_profiles += 1
-                    file_path = os.path.join(profiles_dir, file_name)
-                    
-                    # Check if the profile is empty
-                    is_empty = self.is_empty_profile(file_path)
-                    if is_empty:
-                        empty_profiles += 1
-                        if not show_empty:
-                            continue
-                    
-                    profile_files.append((file_name, file_path, is_empty))
+            profile_files, total_profiles, empty_profiles, corrupt_profiles = self.scan_profiles_directory(profiles_dir)
             
-            # Update UI with progress bar
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, len(profile_files))
-            self.progress_bar.setValue(0)
+            # Drop records of files that are gone; other libraries are reconciled by their own scans
+            current = {result.file_path for result in profile_files}
+            primary_root = self.libraries.primary_root
+            for file_path in [path for path, record in self.profile_records.records.items()
+                              if path not in current and record.directory == primary_root]:
+                self.remove_profile_record(file_path)
+            self.scan_libraries()
             
-            # Process files and update cache
-            for i, (file_name, file_path, is_empty) in enumerate(profile_files):
-                # Get avatar ID from filename
-                avatar_id = os.path.splitext(file_name)[0]
-                
-                # Get avatar data from cache or API
-                avatar_data = self.cache_manager.get_avatar_data(avatar_id, self.profile_view.cvr_api)
+            # Details come from the cache only; events are not processed in between,
+            # so nothing can delete a file while its record is written
+            missing = False
+            for result in profile_files:
+                existing = self.profile_records.get(result.file_path)
+                if not fetch and existing is not None and existing.avatar_data.get("lastUpdated"):
+                    avatar_data = existing.avatar_data
+                else:
+                    avatar_data = self.cache_manager.get_avatar_data(avatar_id_from_file_name(result.file_name))
+                    missing = missing or not avatar_data.get("lastUpdated")
                 
                 # Store profile data for sorting and filtering
-                self.profile_data.append((file_name, avatar_data, file_path, is_empty))
-                
-                # Update progress
-                self.progress_bar.setValue(i + 1)
-                QApplication.processEvents()  # Keep UI responsive
+                self.set_profile_record(result, avatar_data)
             
             # Sort and display profiles
             self.sort_profiles()
             
-            # Hide progress bar when done
-            self.progress_bar.setVisible(False)
-            
-            print(f"Found {total_profiles} profiles ({empty_profiles} empty)")
-            self.status_label.setText(f"Found {total_profiles} profiles ({empty_profiles} empty)")
+            self.show_scan_summary(total_profiles, empty_profiles, corrupt_profiles)
+            if missing:
+                self.warm_missing_entries()
         except Exception as e:
             print(f"Error loading profiles: {str(e)}")
             self.status_label.setText(f"Error loading profiles: {str(e)}")
-            self.progress_bar.setVisible(False)
     
-    def is_empty_profile(self, file_path):
-        """Check if a profile is empty (has no saved settings)."""
-        try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
-                # Check if savedSettings is an empty array
-                if "savedSettings" in data and isinstance(data["savedSettings"], list) and len(data["savedSettings"]) == 0:
-                    return True
-                return False
-        except:
-            # If there's any error reading the file, consider it non-empty
-            return False
+    def scan_profiles_directory(self, profiles_dir):
+        """Scan the profiles directory and return the files to list plus counts.
+        
+        Returns (profile_files, total, empty, corrupt) where profile_files is a
+        list of ScanResults in directory order.
+        """
+        empty_profiles = 0
+        corrupt_profiles = 0
+        
+        results = self.profile_scanner.scan(profiles_dir)
+        self.profile_index.update(profiles_dir, results, self.profile_scanner.map_chunks)
+        for result in results:
+            if result.state == PROFILE_CORRUPT:
+                corrupt_profiles += 1
+            elif result.state == PROFILE_EMPTY:
+                empty_profiles += 1
+        
+        return results, len(results), empty_profiles, corrupt_profiles
+    
+    def show_scan_summary(self, total_profiles, empty_profiles, corrupt_profiles):
+        """Show the number of profiles found by the last directory scan."""
+        summary = f"Found {total_profiles} profiles ({empty_profiles} empty"
+        if corrupt_profiles:
+            summary += f", {corrupt_profiles} corrupt"
+        summary += ")"
+        print(summary)
+        self.status_label.setText(summary)
     
     def load_selected_profile(self, item):
         """Load the selected profile and switch to the profile view."""
         if not item:
             return
         
-        profiles_dir = self.settings_manager.get_profiles_directory()
-        if not profiles_dir:
-            return
-        
-        # Get the widget associated with the item
-        item_widget = self.profile_list.itemWidget(item)
-        if not item_widget:
-            return
-        
-        # Get the file name from the widget's file label
-        file_name = item_widget.file_label.text()
-        
-        file_path = os.path.join(profiles_dir, file_name)
+        file_path = self.item_file_path(item)
         print(f"Loading profile: {file_path}")
         self.profile_view.display_profile(file_path)
         self.show_profile_content()
@@ -1610,32 +2810,27 @@ class CVRProfileManager(QMainWindow):
         if not item_widget:
             return
         
-        # Get the file name from the widget's file label
-        file_name = item_widget.file_label.text()
+        # Get the file from the list item
+        file_path = self.item_file_path(selected_item)
+        file_name = os.path.basename(file_path)
         
         # Confirm deletion
         reply = QMessageBox.question(
             self,
             "Confirm Deletion",
-            f"Are you sure you want to delete the profile '{file_name}'?\n\nThis action cannot be undone.",
+            f"Are you sure you want to delete the profile '{file_name}'?\n\nA backup is kept and can be restored from Tools > Backups.",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                # Get the file path
-                profiles_dir = self.settings_manager.get_profiles_directory()
-                if not profiles_dir:
-                    return
-                
-                file_path = os.path.join(profiles_dir, file_name)
-                
-                # Delete the file
+                # Back up the file, then delete it
+                self.snapshot_store.capture([file_path], f"Delete {file_name}")
                 os.remove(file_path)
                 
-                # Refresh the profile list
-                self.refresh_profiles()
+                # Update only the deleted entry
+                self.update_profiles([file_path])
                 
                 QMessageBox.information(
                     self,
@@ -1652,13 +2847,13 @@ class CVRProfileManager(QMainWindow):
     def purge_empty_profiles(self):
         """Delete all empty profiles after confirmation."""
         # Count empty profiles
-        empty_profiles = [profile for profile in self.profile_data if profile[3]]  # profile[3] is is_empty
+        empty_profiles = [record for record in self.primary_records() if record.state == PROFILE_EMPTY]
         
         if not empty_profiles:
             QMessageBox.information(
                 self,
                 "No Empty Profiles",
-                "There are no empty profiles to purge."
+                "There are no empty profiles in the CVR install to purge."
             )
             return
         
@@ -1666,7 +2861,7 @@ class CVRProfileManager(QMainWindow):
         reply = QMessageBox.question(
             self,
             "Confirm Purge",
-            f"Are you sure you want to delete all {len(empty_profiles)} empty profiles?\n\nThis action cannot be undone.",
+            f"Are you sure you want to delete all {len(empty_profiles)} empty profiles in the CVR install?\n\nA backup is kept and can be restored from Tools > Backups.",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
@@ -1678,17 +2873,19 @@ class CVRProfileManager(QMainWindow):
                 if not profiles_dir:
                     return
                 
-                # Delete each empty profile
-                deleted_count = 0
-                for file_name, _, file_path, _ in empty_profiles:
+                # Back up all empty profiles in one snapshot, then delete each of them
+                self.snapshot_store.capture([record.file_path for record in empty_profiles], "Purge empty profiles")
+                deleted = []
+                for record in empty_profiles:
                     try:
-                        os.remove(file_path)
-                        deleted_count += 1
+                        os.remove(record.file_path)
+                        deleted.append(record.file_path)
                     except Exception as e:
-                        print(f"Error deleting {file_name}: {str(e)}")
+                        print(f"Error deleting {record.file_name}: {str(e)}")
+                deleted_count = len(deleted)
                 
-                # Refresh the profile list
-                self.refresh_profiles()
+                # Update only the deleted entries
+                self.update_profiles(deleted)
                 
                 QMessageBox.information(
                     self,
@@ -1718,6 +2915,10 @@ class CVRProfileManager(QMainWindow):
         export_action = menu.addAction("Export Profile")
         export_action.triggered.connect(lambda: self.export_profile(item))
         
+        # Add Export as Archive action
+        export_archive_action = menu.addAction("Export Selected as Archive")
+        export_archive_action.triggered.connect(self.export_profiles_archive)
+        
         menu.exec(self.profile_list.mapToGlobal(position))
     
     def export_profile(self, item=None):
@@ -1736,20 +2937,9 @@ class CVRProfileManager(QMainWindow):
         # If only one profile is selected, use the single file dialog
         if len(items_to_export) == 1:
             item = items_to_export[0]
-            # Get the widget associated with the item
-            item_widget = self.profile_list.itemWidget(item)
-            if not item_widget:
-                return
-                
-            # Get the file name from the widget's file label
-            file_name = item_widget.file_label.text()
-            
             # Get the source file path
-            profiles_dir = self.settings_manager.get_profiles_directory()
-            if not profiles_dir:
-                return
-                
-            source_path = os.path.join(profiles_dir, file_name)
+            source_path = self.item_file_path(item)
+            file_name = os.path.basename(source_path)
             
             # Open file dialog for saving
             target_path, _ = QFileDialog.getSaveFileName(
@@ -1795,12 +2985,8 @@ class CVRProfileManager(QMainWindow):
                     error_count = 0
                     
                     for item in items_to_export:
-                        item_widget = self.profile_list.itemWidget(item)
-                        if not item_widget:
-                            continue
-                            
-                        file_name = item_widget.file_label.text()
-                        source_path = os.path.join(profiles_dir, file_name)
+                        source_path = self.item_file_path(item)
+                        file_name = os.path.basename(source_path)
                         target_path = os.path.join(export_dir, file_name)
                         
                         try:
@@ -1830,88 +3016,547 @@ class CVRProfileManager(QMainWindow):
                         f"An error occurred while exporting profiles: {str(e)}"
                     )
 
+    def item_file_path(self, item):
+        """Return the full path of the profile file shown by a list item."""
+        return item.data(Qt.ItemDataRole.UserRole)
+    
+    def export_profiles_archive(self):
+        """Export the selected profiles, or all listed ones, into a single archive."""
+        items = self.profile_list.selectedItems()
+        if not items:
+            items = [self.profile_list.item(row) for row in range(self.profile_list.count())]
+        
+        if not items:
+            QMessageBox.warning(
+                self,
+                "No Profiles",
+                "There are no profiles to export."
+            )
+            return
+        
+        file_paths = [self.item_file_path(item) for item in items]
+        
+        archive_path, _ = QFileDialog.getSaveFileName(
+            self,
+            f"Export {len(file_paths)} Profile(s) as Archive",
+            "AAS Profiles" + ARCHIVE_EXTENSION,
+            f"Profile Archives (*{ARCHIVE_EXTENSION});;All Files (*.*)"
+        )
+        if not archive_path:
+            return
+        
+        # Optionally bundle what we know about the avatars so the archive is self-contained
+        avatar_entries, thumbnail_paths = None, None
+        reply = QMessageBox.question(
+            self,
+            "Include Avatar Details",
+            "Include cached avatar names, creators and thumbnails in the archive?\n\n"
+            "This lets another installation show the profiles without looking them up online.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            avatar_ids = {avatar_id_from_file_name(file_path) for file_path in file_paths}
+            avatar_entries, thumbnail_paths = self.cache_manager.export_entries(avatar_ids)
+        
+        # Show progress while the archive is written in the background
+        progress_dialog = QProgressDialog("Exporting profiles...", "Cancel", 0, len(file_paths), self)
+        progress_dialog.setWindowTitle("Export Archive")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setValue(0)
+        
+        worker = ArchiveExportWorker(file_paths, archive_path, avatar_entries, thumbnail_paths, self)
+        worker.progress.connect(lambda done, total: progress_dialog.setValue(done))
+        progress_dialog.canceled.connect(worker.cancel)
+        worker.export_finished.connect(self.on_archive_export_finished)
+        worker.export_cancelled.connect(lambda: self.status_label.setText("Export cancelled"))
+        worker.export_failed.connect(lambda message: QMessageBox.critical(
+            self,
+            "Error",
+            f"An error occurred while exporting profiles: {message}"
+        ))
+        worker.finished.connect(progress_dialog.close)
+        worker.finished.connect(worker.deleteLater)
+        
+        self.export_worker = worker  # Keep a reference while it runs
+        worker.start()
+    
+    def on_archive_export_finished(self, exported_count, errors):
+        """Show the results of an archive export."""
+        message = [f"Successfully exported {exported_count} profile(s)."]
+        if errors:
+            message.append(f"Failed to export {len(errors)} profile(s).")
+        
+        QMessageBox.information(
+            self,
+            "Export Results",
+            "\n".join(message)
+        )
+    
     def import_profile(self):
-        """Import profile file(s) and copy them to the profiles directory."""
+        """Import profile files and/or export archives into the profiles directory."""
         file_names, _ = QFileDialog.getOpenFileNames(
             self,
-            "Select .advavtr File(s) to Import",
+            "Select .advavtr File(s) or Archives to Import",
             "",
-            "Advanced Avatar Settings (*.advavtr);;All Files (*.*)"
+            f"Profiles and Archives (*.advavtr *{ARCHIVE_EXTENSION});;Advanced Avatar Settings (*.advavtr);;"
+            f"Profile Archives (*{ARCHIVE_EXTENSION});;All Files (*.*)"
+        )
+        
+        if file_names:
+            self.run_import(file_names)
+    
+    def import_profile_folder(self):
+        """Import every profile found in a folder and its subfolders."""
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "Select Folder to Import",
+            "",
+            QFileDialog.Option.ShowDirsOnly
         )
         
-        if not file_names:
+        if folder:
+            self.run_import([folder])
+    
+    def ask_conflict_policy(self, conflict_count):
+        """Ask once how to handle profiles that already exist. Returns None if cancelled."""
+        policies = {
+            "Overwrite existing profiles": CONFLICT_OVERWRITE,
+            "Skip existing profiles": CONFLICT_SKIP,
+            "Keep whichever is newer": CONFLICT_KEEP_NEWER,
+            "Keep both (imported copy is renamed)": CONFLICT_KEEP_BOTH
+        }
+        choice, ok = QInputDialog.getItem(
+            self,
+            "Existing Profiles",
+            f"{conflict_count} profile(s) already exist. Identical files are always skipped.\n\n"
+            "How should the others be handled?",
+            list(policies),
+            1,
+            False
+        )
+        return policies[choice] if ok else None
+    
+    def run_import(self, paths):
+        """Validate and import profiles from the given files, folders and archives."""
+        profiles_dir = self.settings_manager.get_profiles_directory()
+        if not profiles_dir:
+            QMessageBox.critical(
+                self,
+                "Error",
+                "Could not find profiles directory. Please set CVR directory first."
+            )
             return
-            
+        
         try:
-            # Get the profiles directory
-            profiles_dir = self.settings_manager.get_profiles_directory()
-            if not profiles_dir:
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    "Could not find profiles directory. Please set CVR directory first."
-                )
-                return
-            
-            success_count = 0
-            error_count = 0
-            skipped_count = 0
-            
-            for file_name in file_names:
-                # Get the source filename and construct target path
-                source_filename = os.path.basename(file_name)
-                target_path = os.path.join(profiles_dir, source_filename)
-                
-                # Check if file already exists
-                if os.path.exists(target_path):
-                    reply = QMessageBox.question(
-                        self,
-                        "File Exists",
-                        f"A profile with the name '{source_filename}' already exists. Do you want to overwrite it?",
-                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.YesToAll | QMessageBox.StandardButton.NoToAll,
-                        QMessageBox.StandardButton.No
-                    )
-                    
-                    if reply == QMessageBox.StandardButton.No:
-                        skipped_count += 1
-                        continue
-                    elif reply == QMessageBox.StandardButton.NoToAll:
-                        skipped_count += 1
-                        break
-                
-                try:
-                    # Copy the file
-                    import shutil
-                    shutil.copy2(file_name, target_path)
-                    success_count += 1
-                except Exception as e:
-                    print(f"Error importing {source_filename}: {str(e)}")
-                    error_count += 1
-            
-            # Refresh the profile list to update cache
-            self.refresh_profiles()
-            
-            # Show results
-            message = []
-            if success_count > 0:
-                message.append(f"Successfully imported {success_count} profile(s).")
-            if error_count > 0:
-                message.append(f"Failed to import {error_count} profile(s).")
-            if skipped_count > 0:
-                message.append(f"Skipped {skipped_count} profile(s).")
-            
+            sources = collect_sources(paths)
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                "Error",
+                f"An error occurred while reading the import sources: {str(e)}"
+            )
+            return
+        
+        if not sources:
             QMessageBox.information(
                 self,
                 "Import Results",
-                "\n".join(message)
+                "No profiles were found to import."
             )
-            
+            return
+        
+        # Decide how to handle conflicts once, before anything is copied
+        policy = CONFLICT_SKIP
+        conflicts = find_conflicts(sources, profiles_dir)
+        if conflicts:
+            policy = self.ask_conflict_policy(len(conflicts))
+            if policy is None:
+                return
+        
+        # Show progress while the import runs in the background
+        progress_dialog = QProgressDialog("Importing profiles...", "Cancel", 0, len(sources), self)
+        progress_dialog.setWindowTitle("Import Profiles")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setValue(0)
+        
+        worker = ProfileImportWorker(sources, profiles_dir, policy, self.profile_scanner.map_chunks,
+                                     self.cache_manager.store_thumbnail,
+                                     self.snapshot_store.begin(f"Import {len(sources)} profile(s)"), self)
+        worker.progress.connect(lambda done, total: progress_dialog.setValue(done))
+        progress_dialog.canceled.connect(worker.cancel)
+        worker.import_finished.connect(self.on_import_finished)
+        worker.import_cancelled.connect(self.on_import_cancelled)
+        worker.import_failed.connect(lambda message: QMessageBox.critical(
+            self,
+            "Error",
+            f"An error occurred while importing profiles: {message}"
+        ))
+        worker.finished.connect(progress_dialog.close)
+        worker.finished.connect(worker.deleteLater)
+        
+        self.import_worker = worker  # Keep a reference while it runs
+        worker.start()
+    
+    def apply_import_result(self, result):
+        """Seed the cache and update the list for the profiles an import wrote."""
+        # Seed the cache from bundled avatar details first so no API lookups are needed
+        if result.avatar_entries:
+            self.cache_manager.seed_entries(result.avatar_entries)
+        profiles_dir = self.settings_manager.get_profiles_directory()
+        if profiles_dir:
+            self.update_profiles([os.path.join(profiles_dir, file_name) for file_name in result.imported])
+    
+    def on_import_cancelled(self, result):
+        """List the profiles imported before the import was cancelled."""
+        self.apply_import_result(result)
+        self.status_label.setText(f"Import cancelled after importing {len(result.imported)} profile(s)")
+    
+    def on_import_finished(self, result):
+        """Update the list for the imported profiles and show the results."""
+        self.apply_import_result(result)
+        
+        message = []
+        if result.imported:
+            message.append(f"Successfully imported {len(result.imported)} profile(s).")
+        if result.identical:
+            message.append(f"Skipped {len(result.identical)} profile(s) identical to the existing ones.")
+        if result.skipped:
+            message.append(f"Skipped {len(result.skipped)} existing profile(s).")
+        if result.errors:
+            message.append(f"Failed to import {len(result.errors)} profile(s):")
+            message.extend(f"  {name}: {error}" for name, error in result.errors[:10])
+            if len(result.errors) > 10:
+                message.append(f"  ...and {len(result.errors) - 10} more")
+        
+        QMessageBox.information(
+            self,
+            "Import Results",
+            "\n".join(message) or "Nothing was imported."
+        )
+    
+    def batch_edit_profiles(self):
+        """Ask for an edit rule, preview how many values it changes, then apply it."""
+        selected = [self.item_file_path(item) for item in self.profile_list.selectedItems()]
+        dialog = BatchEditDialog(bool(selected), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        
+        if dialog.selected_only:
+            file_paths = selected
+        else:
+            file_paths = [record.file_path for record in self.primary_records()]
+        if not file_paths:
+            QMessageBox.information(self, "Batch Edit", "There are no profiles to edit.")
+            return
+        
+        self.run_batch_edit(file_paths, dialog.rule, True, self.on_batch_preview_finished)
+    
+    def run_batch_edit(self, file_paths, rule, dry_run, on_finished):
+        """Run a batch edit preview or apply pass in the background with a progress dialog."""
+        progress_dialog = QProgressDialog(
+            "Checking profiles..." if dry_run else "Editing profiles...", "Cancel", 0, len(file_paths), self)
+        progress_dialog.setWindowTitle("Batch Edit")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setValue(0)
+        
+        worker = BatchEditWorker(file_paths, rule, dry_run, self.profile_scanner.map_chunks, self)
+        worker.progress.connect(lambda done, total: progress_dialog.setValue(done))
+        progress_dialog.canceled.connect(worker.cancel)
+        worker.edit_finished.connect(lambda results: on_finished(rule, results))
+        worker.edit_cancelled.connect(lambda: self.status_label.setText("Batch edit cancelled"))
+        worker.edit_failed.connect(lambda message: QMessageBox.critical(
+            self,
+            "Error",
+            f"An error occurred during the batch edit: {message}"
+        ))
+        worker.finished.connect(progress_dialog.close)
+        worker.finished.connect(worker.deleteLater)
+        
+        self.batch_edit_worker = worker  # Keep a reference while it runs
+        worker.start()
+    
+    def on_batch_preview_finished(self, rule, results):
+        """Show the dry-run counts and apply the edit if confirmed."""
+        changed_files = [result for result in results if result.changed]
+        matched = sum(result.matched for result in results)
+        changed = sum(result.changed for result in results)
+        errors = [result for result in results if result.error]
+        
+        if not changed_files:
+            QMessageBox.information(
+                self,
+                "Batch Edit",
+                f"{matched} value(s) match '{rule.pattern}' in {len(results)} profile(s), but none would change."
+            )
+            return
+        
+        message = (f"{matched} value(s) match '{rule.pattern}'.\n"
+                   f"{changed} value(s) in {len(changed_files)} profile(s) will be changed.")
+        if errors:
+            message += f"\n{len(errors)} profile(s) could not be read and will be skipped."
+        reply = QMessageBox.question(
+            self,
+            "Confirm Batch Edit",
+            message + "\n\nA backup of the changed profiles is kept. Apply the changes?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        file_paths = [result.file_path for result in changed_files]
+        try:
+            self.snapshot_store.capture(file_paths, f"Batch edit '{rule.pattern}' ({rule.operation})")
         except Exception as e:
             QMessageBox.critical(
                 self,
                 "Error",
-                f"An error occurred while importing profiles: {str(e)}"
+                f"Could not back up the profiles, nothing was changed: {str(e)}"
             )
+            return
+        self.run_batch_edit(file_paths, rule, False, self.on_batch_edit_finished)
+    
+    def on_batch_edit_finished(self, rule, results):
+        """Update the edited profiles in the list and show the results."""
+        written = [result.file_path for result in results if result.written]
+        errors = [result for result in results if result.error]
+        self.update_profiles(written)
+        
+        message = [f"Changed {sum(result.changed for result in results if result.written)} value(s) "
+                   f"in {len(written)} profile(s)."]
+        if errors:
+            message.append(f"Failed to edit {len(errors)} profile(s):")
+            message.extend(f"  {result.file_name}: {result.error}" for result in errors[:10])
+            if len(errors) > 10:
+                message.append(f"  ...and {len(errors) - 10} more")
+        QMessageBox.information(self, "Batch Edit Results", "\n".join(message))
+    
+    def find_duplicate_profiles(self):
+        """Search the listed profiles for duplicate saved profiles in the background."""
+        file_paths = [record.file_path for record in self.primary_records() if record.state == PROFILE_NON_EMPTY]
+        if not file_paths:
+            QMessageBox.information(self, "Find Duplicates", "There are no profiles in the CVR install to search.")
+            return
+        
+        tolerance, ok = QInputDialog.getDouble(
+            self,
+            "Find Duplicates",
+            "Also group saved profiles whose values differ by at most\n(0 finds identical saved profiles only):",
+            0.0,
+            0.0,
+            1000.0,
+            3
+        )
+        if not ok:
+            return
+        
+        self.duplicates_action.setEnabled(False)
+        self.status_label.setText("Searching for duplicates...")
+        worker = DuplicateSearchWorker(file_paths, tolerance, self.profile_scanner.map_chunks, self)
+        worker.search_finished.connect(self.on_duplicates_found)
+        worker.search_failed.connect(lambda message: QMessageBox.critical(
+            self,
+            "Error",
+            f"An error occurred while searching for duplicates: {message}"
+        ))
+        worker.finished.connect(lambda: self.duplicates_action.setEnabled(True))
+        worker.finished.connect(worker.deleteLater)
+        
+        self.duplicate_search_worker = worker  # Keep a reference while it runs
+        worker.start()
+    
+    def on_duplicates_found(self, report):
+        """Show the duplicate groups and remove the duplicates if asked to."""
+        self.status_label.setText(f"Found {report.duplicate_count} duplicate saved profile(s)")
+        if DuplicatesDialog(report, self).exec() != QDialog.DialogCode.Accepted:
+            return
+        
+        removable = report.removable()
+        reply = QMessageBox.question(
+            self,
+            "Confirm Removal",
+            f"Remove {report.duplicate_count} duplicate saved profile(s) from {len(removable)} file(s)?\n\n"
+            "A backup of the changed files is kept.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        # Remove through the same path as saving in the editor, backing up each file first
+        backup = self.snapshot_store.begin("Remove duplicate saved profiles")
+        removed = 0
+        changed_files = []
+        errors = []
+        for file_path, digests in removable.items():
+            try:
+                removed += remove_saved_profiles(file_path, digests, before_write=backup.add)
+                changed_files.append(file_path)
+            except Exception as e:
+                errors.append((os.path.basename(file_path), str(e)))
+        backup.commit()
+        self.update_profiles(changed_files)
+        
+        message = [f"Removed {removed} duplicate saved profile(s) from {len(changed_files)} file(s)."]
+        if errors:
+            message.append(f"Failed to update {len(errors)} file(s):")
+            message.extend(f"  {name}: {error}" for name, error in errors[:10])
+            if len(errors) > 10:
+                message.append(f"  ...and {len(errors) - 10} more")
+        QMessageBox.information(self, "Duplicate Removal Results", "\n".join(message))
+    
+    def show_statistics(self):
+        """Collect directory statistics in the background and show them."""
+        profiles_dir = self.settings_manager.get_profiles_directory()
+        if not profiles_dir:
+            QMessageBox.critical(
+                self,
+                "Error",
+                "Could not find profiles directory. Please set CVR directory first."
+            )
+            return
+        
+        self.statistics_action.setEnabled(False)
+        self.status_label.setText("Collecting statistics...")
+        worker = StatisticsWorker(self.stats_collector, profiles_dir, self.profile_scanner.map_chunks, self)
+        worker.stats_finished.connect(lambda stats: StatisticsDialog(stats, self).exec())
+        worker.stats_failed.connect(lambda message: QMessageBox.critical(
+            self,
+            "Error",
+            f"An error occurred while collecting statistics: {message}"
+        ))
+        worker.finished.connect(lambda: self.statistics_action.setEnabled(True))
+        worker.finished.connect(lambda: self.status_label.setText(""))
+        worker.finished.connect(worker.deleteLater)
+        
+        self.statistics_worker = worker  # Keep a reference while it runs
+        worker.start()
+    
+    def clean_up_cache(self):
+        """Ask for the cache limits, save them and evict the cache in the background."""
+        dialog = CacheLimitsDialog(self.settings_manager.get_cache_limits(), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.settings_manager.set_cache_limits(dialog.limits)
+        self.evict_cache(dialog.limits, show_report=True)
+    
+    def evict_cache(self, limits, show_report=False):
+        """Evict avatar cache entries and thumbnails beyond the limits in the background."""
+        if getattr(self, "cache_eviction_worker", None) is not None:
+            return  # Already running
+        
+        self.cache_cleanup_action.setEnabled(False)
+        worker = CacheEvictionWorker(self.cache_manager, self.libraries.roots, limits, self)
+        worker.eviction_finished.connect(lambda report: self.on_cache_evicted(report, show_report))
+        worker.eviction_failed.connect(lambda message: print(f"Error cleaning up cache: {message}"))
+        worker.finished.connect(lambda: self.cache_cleanup_action.setEnabled(True))
+        worker.finished.connect(lambda: setattr(self, "cache_eviction_worker", None))
+        worker.finished.connect(worker.deleteLater)
+        
+        self.cache_eviction_worker = worker  # Keep a reference while it runs
+        worker.start()
+    
+    def on_cache_evicted(self, report, show_report):
+        """Drop the evicted entries from the cache and report what was reclaimed."""
+        self.cache_manager.remove_entries(report.evicted_ids, report.started)
+        summary = (f"Cache cleanup removed {len(report.evicted_ids)} entries ({report.orphans_removed} of deleted avatars) "
+                   f"and {report.thumbnails_removed} thumbnails, reclaiming {format_size(report.bytes_reclaimed)}. "
+                   f"{report.entries_left} entries ({format_size(report.bytes_left)}) remain.")
+        print(summary)
+        if show_report:
+            QMessageBox.information(self, "Cache Cleaned Up", summary)
+    
+    def show_backups(self):
+        """Show the backup snapshots and re-scan any restored profiles."""
+        profiles_dir = self.settings_manager.get_profiles_directory()
+        if not profiles_dir:
+            QMessageBox.critical(
+                self,
+                "Error",
+                "Could not find profiles directory. Please set CVR directory first."
+            )
+            return
+        
+        dialog = SnapshotDialog(self.snapshot_store, profiles_dir, self)
+        dialog.exec()
+        if dialog.restored:
+            self.update_profiles(sorted(dialog.restored))
+    
+    def update_profiles(self, file_paths):
+        """Re-scan only the given profile files and update their entries in the list.
+        
+        Files outside the listed profile directories are ignored.
+        """
+        if not file_paths:
+            return
+        
+        by_root = {}
+        for file_path in file_paths:
+            by_root.setdefault(os.path.dirname(file_path), []).append(file_path)
+        for root, paths in by_root.items():
+            if root not in self.libraries.roots:
+                continue
+            profile_index = self.libraries.index_for(root)
+            if profile_index is not None:
+                profile_index.update_files(paths)
+            else:  # The running library scan re-checks these files when it is done
+                self.changed_during_scan.setdefault(root, set()).update(paths)
+            
+            for file_path in paths:
+                self.remove_profile_record(file_path)
+                if not os.path.exists(file_path):
+                    continue
+                result = scan_file(file_path)
+                avatar_data = self.cache_manager.get_avatar_data(avatar_id_from_file_name(result.file_name), self.profile_view.cvr_api)
+                self.set_profile_record(result, avatar_data)
+        
+        # A list update that is still running started from the old files; restart it
+        self.refresh_scheduler.request(max(LEVEL_SORT, self.refresh_scheduler.running))
+
+class StartupReport(QObject):
+    """Writes when the list was first painted and when it became interactive, then closes the app.
+    
+    Used by "benchmark.py startup"; the times are time.time() values so they can
+    be compared with when the benchmark started the process.
+    """
+    
+    def __init__(self, window, report_path):
+        super().__init__(window)
+        self.window = window
+        self.report_path = report_path
+        self.milestones = {}
+        window.profile_list.viewport().installEventFilter(self)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check_interactive)
+        self.timer.start(5)
+    
+    def mark(self, milestone):
+        self.milestones[milestone] = time.time()
+        with open(self.report_path, 'wb') as f:
+            f.write(json_codec.dumps_bytes(self.milestones))
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and "first_paint" not in self.milestones:
+            self.mark("first_paint")
+        return super().eventFilter(obj, event)
+    
+    def check_interactive(self):
+        """The list is interactive once the startup refresh and library scans are done."""
+        scheduler = self.window.refresh_scheduler
+        if ("first_paint" not in self.milestones or scheduler.running or scheduler.pending
+                or scheduler.scheduled or self.window.library_workers):
+            return
+        self.timer.stop()
+        self.milestones["profiles"] = len(self.window.profile_records)
+        self.mark("interactive")
+        self.window.close()
 
 def main():
     print("Creating application...")
@@ -1925,8 +3570,12 @@ def main():
     
     window = CVRProfileManager()
     window.show()
+    if os.environ.get(STARTUP_REPORT_ENV):
+        window.startup_report = StartupReport(window, os.environ[STARTUP_REPORT_ENV])
     print("Application started")
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Needed for the scanner's worker processes in the packaged executable
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
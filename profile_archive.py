@@ -0,0 +1,178 @@
+"""
+Single-file archives of .advavtr profiles.
+
+An archive is a zip file holding the profile files plus a manifest.json
+describing them. Files are read on a small thread pool and streamed into the
+archive in order, with only a bounded number of files held in memory.
+
+Archives can also carry the cached avatar details (in the manifest) and
+thumbnails, so they can be imported elsewhere without querying the API.
+"""
+import os
+import re
+import time
+import zipfile
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import json_codec
+from profile_io import content_hash
+from version import get_version
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_ARCHIVE')
+
+ARCHIVE_EXTENSION = ".zip"
+MANIFEST_NAME = "manifest.json"
+PROFILES_FOLDER = "profiles/"
+THUMBNAILS_FOLDER = "thumbnails/"
+ARCHIVE_FORMAT_VERSION = 1
+AVATAR_ID = re.compile(r"^[A-Za-z0-9-]+$")
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled before it finishes."""
+
+
+def _read_file(file_path):
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return data, os.path.getmtime(file_path)
+
+
+def _unique_name(file_name, used_names):
+    """Return file_name, or "<stem> (n)<ext>" if it is already in used_names."""
+    if file_name not in used_names:
+        return file_name
+    stem, extension = os.path.splitext(file_name)
+    number = 2
+    while f"{stem} ({number}){extension}" in used_names:
+        number += 1
+    return f"{stem} ({number}){extension}"
+
+
+def export_archive(file_paths, archive_path, progress=None, is_cancelled=None, max_workers=4,
+                   avatar_entries=None, thumbnail_paths=None):
+    """Write the given profile files into a single compressed archive.
+
+    progress(done, total) is called after each file; is_cancelled() is polled
+    between files and raises ExportCancelled when it returns True. The archive
+    is built in a temporary file and only moved into place once complete.
+
+    avatar_entries (avatar ID -> cache entry) and thumbnail_paths (avatar ID ->
+    image file) are optionally bundled along with the profiles.
+
+    Profiles with the same file name (e.g. from different libraries) are
+    stored as "<id> (2).advavtr" and so on, like copies kept on import.
+
+    Returns (exported_count, errors) where errors is a list of (file_name, message).
+    """
+    total = len(file_paths)
+    errors = []
+    entries = []
+    used_names = set()
+    temp_path = archive_path + ".part"
+    window = max_workers * 2  # Files read ahead of the writer, bounds memory use
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            pending = deque()
+            paths = iter(file_paths)
+            done = 0
+
+            def submit_next():
+                file_path = next(paths, None)
+                if file_path is not None:
+                    pending.append((file_path, executor.submit(_read_file, file_path)))
+
+            for _ in range(window):
+                submit_next()
+
+            while pending:
+                if is_cancelled and is_cancelled():
+                    for _, future in pending:
+                        future.cancel()
+                    raise ExportCancelled()
+
+                file_path, future = pending.popleft()
+                file_name = os.path.basename(file_path)
+                try:
+                    data, mtime = future.result()
+                    entry_name = _unique_name(file_name, used_names)
+                    # Keep the file's own modification time on the archive entry
+                    info = zipfile.ZipInfo(PROFILES_FOLDER + entry_name, date_time=time.localtime(mtime)[:6])
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    archive.writestr(info, data)
+                    used_names.add(entry_name)
+                    entries.append({
+                        "file": entry_name,
+                        "size": len(data),
+                        "sha256": content_hash(data),
+                        "mtime": mtime
+                    })
+                except Exception as e:
+                    logger.error(f"Error exporting {file_name}: {str(e)}")
+                    errors.append((file_name, str(e)))
+
+                done += 1
+                if progress:
+                    progress(done, total)
+                submit_next()
+
+            # Thumbnails are already compressed, store them as they are
+            for avatar_id, thumbnail_path in (thumbnail_paths or {}).items():
+                if is_cancelled and is_cancelled():
+                    raise ExportCancelled()
+                try:
+                    archive.write(thumbnail_path, f"{THUMBNAILS_FOLDER}{avatar_id}.jpg", compress_type=zipfile.ZIP_STORED)
+                except OSError as e:
+                    logger.error(f"Error exporting thumbnail for {avatar_id}: {str(e)}")
+
+            archive.writestr(MANIFEST_NAME, json_codec.dumps_bytes({
+                "formatVersion": ARCHIVE_FORMAT_VERSION,
+                "appVersion": get_version(),
+                "created": time.time(),
+                "profiles": entries,
+                "avatars": avatar_entries or {}
+            }, indent=2))
+
+        os.replace(temp_path, archive_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    logger.info(f"Exported {len(entries)} profiles to {archive_path}")
+    return len(entries), errors
+
+
+def read_bundled_cache(archive_path, store_thumbnail):
+    """Read the avatar details and thumbnails bundled in an archive.
+
+    store_thumbnail(avatar_id, data) is called for every bundled thumbnail.
+    Returns the bundled cache entries (avatar ID -> entry).
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        names = set(archive.namelist())
+        if MANIFEST_NAME not in names:
+            return {}
+        manifest = json_codec.loads(archive.read(MANIFEST_NAME))
+        avatars = manifest.get("avatars") or {}
+        entries = {
+            avatar_id: entry for avatar_id, entry in avatars.items()
+            if AVATAR_ID.match(avatar_id) and isinstance(entry, dict)
+        }
+
+        for name in names:
+            if not name.startswith(THUMBNAILS_FOLDER):
+                continue
+            avatar_id = os.path.splitext(name[len(THUMBNAILS_FOLDER):])[0]
+            # Only accept plain IDs so names can't point outside the cache folder
+            if AVATAR_ID.match(avatar_id):
+                store_thumbnail(avatar_id, archive.read(name))
+    return entries
@@ -0,0 +1,98 @@
+"""
+Comparison of the "values" arrays of two saved profiles.
+
+Values are aligned by parameter name and the numeric differences are computed
+as array operations with numpy, which is in requirements.txt and bundled in
+builds. A plain Python fallback gives the same results if it is missing.
+"""
+import math
+import logging
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_COMPARE')
+
+# One changed parameter; delta is None when the values aren't both numbers
+Difference = namedtuple("Difference", ["name", "old", "new", "delta"])
+
+
+class ComparisonResult:
+    """Differences between two saved profiles."""
+
+    def __init__(self):
+        self.changed = []  # Differences, non-numeric first, then by descending |delta|
+        self.only_a = []  # (name, value) only present in the first profile
+        self.only_b = []  # (name, value) only present in the second profile
+        self.unchanged = 0
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def index_values(values):
+    """Map parameter names to values, keeping the first entry for repeated names."""
+    index = {}
+    for value_obj in values:
+        if isinstance(value_obj, dict) and "name" in value_obj and "value" in value_obj:
+            index.setdefault(value_obj["name"], value_obj["value"])
+    return index
+
+
+def _numeric_deltas(names, old, new):
+    """Return (name, old, new, delta) for changed numeric pairs, by descending |delta|."""
+    if np is not None:
+        a = np.asarray(old, dtype=np.float64)
+        b = np.asarray(new, dtype=np.float64)
+        delta = b - a
+        changed = (a != b) & ~(np.isnan(a) & np.isnan(b))
+        positions = np.flatnonzero(changed)
+        # NaN deltas (a value became or stopped being NaN) sort first
+        magnitude = np.nan_to_num(np.abs(delta[positions]), nan=np.inf)
+        order = positions[np.argsort(-magnitude, kind="stable")]
+        return [(names[i], old[i], new[i], float(delta[i])) for i in order.tolist()]
+
+    rows = [
+        (name, a, b, float(b - a))
+        for name, a, b in zip(names, old, new)
+        if a != b and not (math.isnan(a) and math.isnan(b))
+    ]
+    rows.sort(key=lambda row: -math.inf if math.isnan(row[3]) else -abs(row[3]))
+    return rows
+
+
+def compare_values(values_a, values_b):
+    """Compare two "values" arrays and return a ComparisonResult."""
+    index_a = index_values(values_a)
+    index_b = index_values(values_b)
+    result = ComparisonResult()
+
+    names, old, new = [], [], []
+    for name, a in index_a.items():
+        if name not in index_b:
+            result.only_a.append((name, a))
+            continue
+        b = index_b[name]
+        if _is_number(a) and _is_number(b):
+            names.append(name)
+            old.append(a)
+            new.append(b)
+        elif a != b:
+            result.changed.append(Difference(name, a, b, None))
+        else:
+            result.unchanged += 1
+    result.only_b = [(name, b) for name, b in index_b.items() if name not in index_a]
+
+    numeric = _numeric_deltas(names, old, new)
+    result.changed.extend(Difference(*row) for row in numeric)
+    result.unchanged += len(names) - len(numeric)
+
+    logger.info(f"Compared {len(index_a)} and {len(index_b)} parameters: {len(result.changed)} changed, "
+                f"{len(result.only_a)} only in A, {len(result.only_b)} only in B")
+    return result
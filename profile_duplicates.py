@@ -0,0 +1,177 @@
+"""
+Detection and removal of duplicate saved profiles.
+
+Each saved profile is reduced to its sorted (name, value) list with numbers
+normalized to floats, and hashed. Saved profiles with the same hash are exact
+duplicates, whether in one file or across files. Optionally, saved profiles
+with the same parameter names whose numeric values all differ by at most a
+tolerance are grouped as near-duplicates.
+"""
+import os
+import logging
+from collections import namedtuple
+
+import json_codec
+from profile_io import content_hash, read_with_snapshot, is_modified_since, write_if_changed
+from format_preserving_json import dumps_preserving
+from profile_scanner import avatar_id_from_file_name
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_DUPLICATES')
+
+# One saved profile: names_hash identifies its parameter names, values the
+# normalized values in name order (only collected for near-duplicate search)
+Fingerprint = namedtuple("Fingerprint", ["file_name", "file_path", "index", "profile_name", "digest", "names_hash", "values"])
+
+
+def _normalize(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def fingerprint_profile(profile):
+    """Return (digest, names_hash, values) for a saved profile."""
+    values = profile.get("values") if isinstance(profile.get("values"), list) else []
+    pairs = sorted(
+        ((str(value_obj.get("name", "")), _normalize(value_obj.get("value")))
+         for value_obj in values if isinstance(value_obj, dict)),
+        key=lambda pair: pair[0]
+    )
+    digest = content_hash(json_codec.dumps_bytes(pairs))
+    names_hash = content_hash(json_codec.dumps_bytes([name for name, _ in pairs]))
+    return digest, names_hash, [value for _, value in pairs]
+
+
+def fingerprint_file(file_path, with_values=False):
+    """Return a Fingerprint for every saved profile in a file."""
+    file_name = os.path.basename(file_path)
+    try:
+        saved_settings = json_codec.load(file_path).get("savedSettings")
+    except Exception:
+        return []
+    fingerprints = []
+    for i, profile in enumerate(saved_settings if isinstance(saved_settings, list) else []):
+        if not isinstance(profile, dict):
+            continue
+        digest, names_hash, values = fingerprint_profile(profile)
+        fingerprints.append(Fingerprint(file_name, file_path, i, str(profile.get("profileName", "")),
+                                        digest, names_hash, values if with_values else None))
+    return fingerprints
+
+
+def fingerprint_chunk(items):
+    """Fingerprint a chunk of (file_path, with_values) items; runs inside a worker process."""
+    results = []
+    for file_path, with_values in items:
+        results.extend(fingerprint_file(file_path, with_values))
+    return results
+
+
+def _near(values_a, values_b, tolerance):
+    for a, b in zip(values_a, values_b):
+        if isinstance(a, float) and isinstance(b, float):
+            if abs(a - b) > tolerance:
+                return False
+        elif a != b:
+            return False
+    return True
+
+
+class DuplicateReport:
+    """Exact and near-duplicate groups of saved profiles."""
+
+    def __init__(self, exact, near):
+        self.exact = exact  # Lists of Fingerprints with identical values, originals first
+        self.near = near  # Lists of exact-group representatives within the tolerance
+
+    def removable(self):
+        """Return {file_path: {index: digest}} of exact duplicates that can be removed.
+
+        Within each avatar (including "(n)" copies of its file) the first
+        occurrence is kept. Matches between different avatars are only reported.
+        """
+        removable = {}
+        for group in self.exact:
+            seen_avatars = set()
+            for fingerprint in group:
+                avatar_id = avatar_id_from_file_name(fingerprint.file_name)
+                if avatar_id in seen_avatars:
+                    removable.setdefault(fingerprint.file_path, {})[fingerprint.index] = fingerprint.digest
+                seen_avatars.add(avatar_id)
+        return removable
+
+    @property
+    def duplicate_count(self):
+        return sum(len(digests) for digests in self.removable().values())
+
+
+def find_duplicates(file_paths, tolerance=0.0, map_chunks=None):
+    """Group the saved profiles of the given files into a DuplicateReport."""
+    map_chunks = map_chunks or (lambda function, items: function(items))
+    with_values = tolerance > 0
+    fingerprints = map_chunks(fingerprint_chunk, [(file_path, with_values) for file_path in file_paths])
+
+    groups = {}
+    for fingerprint in fingerprints:
+        groups.setdefault(fingerprint.digest, []).append(fingerprint)
+    # Prefer originals over "(n)" copies, so copies are what gets removed
+    for group in groups.values():
+        group.sort(key=lambda f: (avatar_id_from_file_name(f.file_name) != os.path.splitext(f.file_name)[0],
+                                  f.file_name, f.index))
+    exact = [group for group in groups.values() if len(group) > 1]
+
+    near = []
+    if with_values:
+        # Only profiles with the same parameter names can be near each other;
+        # compare one representative per exact group, joining with union-find
+        buckets = {}
+        for group in groups.values():
+            buckets.setdefault(group[0].names_hash, []).append(group[0])
+        for bucket in buckets.values():
+            parent = list(range(len(bucket)))
+
+            def find(i):
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            for i in range(len(bucket)):
+                for j in range(i + 1, len(bucket)):
+                    if find(i) != find(j) and _near(bucket[i].values, bucket[j].values, tolerance):
+                        parent[find(j)] = find(i)
+            clusters = {}
+            for i, fingerprint in enumerate(bucket):
+                clusters.setdefault(find(i), []).append(fingerprint)
+            near.extend(cluster for cluster in clusters.values() if len(cluster) > 1)
+
+    logger.info(f"Found {len(exact)} exact and {len(near)} near-duplicate groups in {len(fingerprints)} saved profiles")
+    return DuplicateReport(exact, near)
+
+
+def remove_saved_profiles(file_path, expected_digests, before_write=None):
+    """Remove saved profiles from a file the same way the editor saves it.
+
+    expected_digests maps the index of each saved profile to remove to its
+    fingerprint digest (see DuplicateReport.removable); if a saved profile no
+    longer matches (the file changed since it was scanned) nothing
+    is removed. Only the savedSettings array is re-emitted and the file is
+    written atomically. Returns the number of saved profiles removed.
+    """
+    data, snapshot = read_with_snapshot(file_path)
+    document = json_codec.loads(data)
+    saved_settings = document["savedSettings"]
+    indexes = sorted(expected_digests, reverse=True)
+    for index in indexes:
+        if index >= len(saved_settings) or fingerprint_profile(saved_settings[index])[0] != expected_digests[index]:
+            raise ValueError("The profile changed since duplicates were searched")
+
+    for index in indexes:
+        del saved_settings[index]
+    text = dumps_preserving(data.decode("utf-8"), document)
+    if is_modified_since(file_path, snapshot):
+        raise ValueError("The file changed while it was being edited")
+    write_if_changed(file_path, text.encode("utf-8"), snapshot, before_write=before_write)
+    return len(indexes)
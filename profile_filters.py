@@ -0,0 +1,122 @@
+"""
+Bitset filters for the profile list.
+
+Every record gets a slot, and each filter flag is an int used as a bitset over
+the slots. Flags are set when a record is added or its avatar data arrives, so
+applying a filter is a few bitwise operations instead of re-checking every
+record. Filters in the same group are combined with OR, groups with AND.
+Besides FILTER_GROUPS, callers can pass groups of their own (e.g. one filter
+per profile library) with flags of the same names.
+"""
+from profile_io import PROFILE_EMPTY, PROFILE_CORRUPT
+
+FILTER_OWNED = "Owned by me"
+FILTER_SHARED = "Shared with me"
+FILTER_PUBLIC = "Public"
+FILTER_NON_EMPTY = "Has saved profiles"
+FILTER_EMPTY = "Empty"
+FILTER_CORRUPT = "Corrupt"
+FILTER_SMALL = "Small (under 10 KB)"
+FILTER_MEDIUM = "Medium (10-100 KB)"
+FILTER_LARGE = "Large (over 100 KB)"
+
+FILTER_GROUPS = [
+    ("Avatar", [FILTER_OWNED, FILTER_SHARED, FILTER_PUBLIC]),
+    ("Contents", [FILTER_NON_EMPTY, FILTER_EMPTY, FILTER_CORRUPT]),
+    ("Size", [FILTER_SMALL, FILTER_MEDIUM, FILTER_LARGE])
+]
+
+SMALL_SIZE = 10 * 1024
+LARGE_SIZE = 100 * 1024
+
+
+def record_flags(avatar_data, state, size, username):
+    """Return the filter flags that apply to a record.
+
+    avatar_data may be a "Loading..." placeholder without the API fields.
+    """
+    flags = set()
+    if username and avatar_data.get("creatorName") == username:
+        flags.add(FILTER_OWNED)
+    if avatar_data.get("isSharedWithMe"):
+        flags.add(FILTER_SHARED)
+    if avatar_data.get("isPublished"):
+        flags.add(FILTER_PUBLIC)
+    flags.add({PROFILE_EMPTY: FILTER_EMPTY, PROFILE_CORRUPT: FILTER_CORRUPT}.get(state, FILTER_NON_EMPTY))
+    if size < SMALL_SIZE:
+        flags.add(FILTER_SMALL)
+    elif size <= LARGE_SIZE:
+        flags.add(FILTER_MEDIUM)
+    else:
+        flags.add(FILTER_LARGE)
+    return flags
+
+
+class FilterIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.slots = {}  # file path -> slot
+        self.file_flags = {}  # file path -> flags
+        self.free_slots = []
+        self.slot_count = 0
+        self.all_bits = 0
+        self.bits = {flag: 0 for _, flags in FILTER_GROUPS for flag in flags}
+
+    def set(self, file_path, flags):
+        """Add a record or replace its flags."""
+        slot = self.slots.get(file_path)
+        if slot is None:
+            if self.free_slots:
+                slot = self.free_slots.pop()
+            else:
+                slot = self.slot_count
+                self.slot_count += 1
+            self.slots[file_path] = slot
+            self.all_bits |= 1 << slot
+        bit = 1 << slot
+        old_flags = self.file_flags.get(file_path, set())
+        for flag in old_flags - flags:
+            self.bits[flag] &= ~bit
+        for flag in flags - old_flags:
+            self.bits[flag] = self.bits.get(flag, 0) | bit
+        self.file_flags[file_path] = flags
+
+    def remove(self, file_path):
+        slot = self.slots.pop(file_path, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        for flag in self.file_flags.pop(file_path):
+            self.bits[flag] &= ~bit
+        self.all_bits &= ~bit
+        self.free_slots.append(slot)
+
+    def mask(self, selected, groups=FILTER_GROUPS):
+        """Return the bitset of records passing the selected filters."""
+        result = self.all_bits
+        for _, flags in groups:
+            chosen = [flag for flag in flags if flag in selected]
+            if chosen:
+                group_bits = 0
+                for flag in chosen:
+                    group_bits |= self.bits.get(flag, 0)
+                result &= group_bits
+        return result
+
+    def paths_mask(self, file_paths):
+        """Return the bitset of the records with the given file paths."""
+        # Build the bits as a string first; OR-ing ints one by one is quadratic
+        bits = bytearray(b"0" * self.slot_count)
+        for file_path in file_paths:
+            slot = self.slots.get(file_path)
+            if slot is not None:
+                bits[slot] = ord("1")
+        return int(bytes(bits[::-1]) or b"0", 2)
+
+    def matching_paths(self, mask):
+        """Return the set of file paths whose bit is set in mask."""
+        # One conversion to a string instead of a big-int shift per record
+        bits = bin(mask)[:1:-1]
+        return {file_path for file_path, slot in self.slots.items() if slot < len(bits) and bits[slot] == "1"}
@@ -0,0 +1,242 @@
+"""
+Bulk import of .advavtr profiles from files, folders and export archives.
+
+Sources are validated in parallel (through ProfileScanner.map_chunks) before
+anything is written, and name conflicts are resolved with a single policy
+chosen up front. Files identical to the existing profile are skipped.
+"""
+import os
+import re
+import glob
+import time
+import zipfile
+import logging
+from collections import namedtuple
+
+import json_codec
+from profile_io import content_hash, atomic_write
+from profile_scanner import PROFILE_EXTENSION
+from profile_archive import ARCHIVE_EXTENSION, read_bundled_cache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_IMPORT')
+
+# Conflict policies for profiles that already exist
+CONFLICT_OVERWRITE = "overwrite"
+CONFLICT_SKIP = "skip"
+CONFLICT_KEEP_NEWER = "keep-newer"
+CONFLICT_KEEP_BOTH = "keep-both"
+
+# A profile to import: path is a file, or an archive when member is set
+ImportSource = namedtuple("ImportSource", ["name", "path", "member", "mtime"])
+
+# Outcome of validating one source
+Validation = namedtuple("Validation", ["source", "digest", "error"])
+
+
+class ImportCancelled(Exception):
+    """Raised when an import is cancelled before it finishes.
+
+    result is the ImportResult for the sources handled before the cancel; the
+    files it lists were already written.
+    """
+
+    def __init__(self, result):
+        super().__init__("Import cancelled")
+        self.result = result
+
+
+class ImportResult:
+    """Counts and file names produced by an import."""
+
+    def __init__(self):
+        self.imported = []  # File names written to the profiles directory
+        self.skipped = []  # Existing profiles left alone because of the conflict policy
+        self.identical = []  # Sources identical to the existing profile
+        self.errors = []  # (name, message) for invalid or unreadable sources
+        self.avatar_entries = {}  # Cache entries bundled in imported archives
+
+
+def collect_sources(paths):
+    """Expand files, folders and archives into a list of ImportSources."""
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, file_names in os.walk(path):
+                for file_name in sorted(file_names):
+                    if file_name.endswith(PROFILE_EXTENSION):
+                        file_path = os.path.join(root, file_name)
+                        sources.append(ImportSource(file_name, file_path, None, os.path.getmtime(file_path)))
+        elif path.lower().endswith(ARCHIVE_EXTENSION):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if info.filename.endswith(PROFILE_EXTENSION) and not info.is_dir():
+                        mtime = time.mktime(info.date_time + (0, 0, -1))
+                        sources.append(ImportSource(os.path.basename(info.filename), path, info.filename, mtime))
+        else:
+            sources.append(ImportSource(os.path.basename(path), path, None, os.path.getmtime(path)))
+    return sources
+
+
+class _SourceReader:
+    """Reads source contents, keeping each archive open while it is needed."""
+
+    def __init__(self):
+        self.archives = {}
+
+    def read(self, source):
+        if source.member is None:
+            with open(source.path, 'rb') as f:
+                return f.read()
+        if source.path not in self.archives:
+            self.archives[source.path] = zipfile.ZipFile(source.path)
+        return self.archives[source.path].read(source.member)
+
+    def close(self):
+        for archive in self.archives.values():
+            archive.close()
+        self.archives = {}
+
+
+def validate_profile_data(data):
+    """Return None if data is a usable profile, otherwise a description of the problem."""
+    try:
+        document = json_codec.loads(data)
+    except ValueError as e:
+        return f"Invalid JSON: {str(e)}"
+    if not isinstance(document, dict):
+        return "Not a profile: the top level is not an object"
+    if not isinstance(document.get("savedSettings"), list):
+        return "Not a profile: savedSettings is missing or not a list"
+    return None
+
+
+def validate_chunk(sources):
+    """Validate a chunk of sources; runs inside a worker process."""
+    reader = _SourceReader()
+    results = []
+    try:
+        for source in sources:
+            try:
+                data = reader.read(source)
+                results.append(Validation(source, content_hash(data), validate_profile_data(data)))
+            except Exception as e:
+                results.append(Validation(source, None, str(e)))
+    finally:
+        reader.close()
+    return results
+
+
+def find_conflicts(sources, profiles_dir):
+    """Return the sources whose file name already exists in the profiles directory."""
+    return [source for source in sources if os.path.exists(os.path.join(profiles_dir, source.name))]
+
+
+def _free_copy_name(profiles_dir, name):
+    """Return a file name like "<id> (2).advavtr" that doesn't exist yet."""
+    stem, extension = os.path.splitext(name)
+    number = 2
+    while os.path.exists(os.path.join(profiles_dir, f"{stem} ({number}){extension}")):
+        number += 1
+    return f"{stem} ({number}){extension}"
+
+
+def _existing_copies(profiles_dir, name):
+    """Return the paths of the "<id> (n).advavtr" copies of a profile kept by earlier imports."""
+    stem, extension = os.path.splitext(name)
+    copy_name = re.compile(re.escape(stem) + r" \(\d+\)" + re.escape(extension) + "$")
+    return [path for path in glob.glob(os.path.join(glob.escape(profiles_dir), f"{glob.escape(stem)} (*){extension}"))
+            if copy_name.match(os.path.basename(path))]
+
+
+def _file_digest(file_path):
+    with open(file_path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def _apply(validation, profiles_dir, policy, reader, result, before_write=None):
+    """Copy one validated source into the profiles directory according to the policy."""
+    source = validation.source
+    if validation.error:
+        logger.error(f"Skipping invalid profile {source.name}: {validation.error}")
+        result.errors.append((source.name, validation.error))
+        return
+
+    target_name = source.name
+    target_path = os.path.join(profiles_dir, target_name)
+    if os.path.exists(target_path):
+        if _file_digest(target_path) == validation.digest:
+            result.identical.append(source.name)
+            return
+        if policy == CONFLICT_SKIP or (
+                policy == CONFLICT_KEEP_NEWER and source.mtime <= os.path.getmtime(target_path)):
+            result.skipped.append(source.name)
+            return
+        if policy == CONFLICT_KEEP_BOTH:
+            # Importing the same source again must not add another copy
+            if any(_file_digest(path) == validation.digest for path in _existing_copies(profiles_dir, source.name)):
+                result.identical.append(source.name)
+                return
+            target_name = _free_copy_name(profiles_dir, source.name)
+            target_path = os.path.join(profiles_dir, target_name)
+
+    try:
+        data = reader.read(source)
+        if before_write:
+            before_write(target_path)
+        atomic_write(target_path, data)
+        os.utime(target_path, (source.mtime, source.mtime))
+        result.imported.append(target_name)
+    except Exception as e:
+        logger.error(f"Error importing {source.name}: {str(e)}")
+        result.errors.append((source.name, str(e)))
+
+
+def import_profiles(sources, profiles_dir, policy, map_chunks=None, progress=None, is_cancelled=None,
+                    store_thumbnail=None, before_write=None):
+    """Validate sources and copy the valid ones into the profiles directory.
+
+    map_chunks(chunk_function, items) runs the validation; pass
+    ProfileScanner.map_chunks to use worker processes. progress(done, total)
+    and is_cancelled() work as for export_archive.
+
+    If store_thumbnail(avatar_id, data) is given, thumbnails bundled in
+    archives are passed to it and the bundled cache entries are returned in
+    the result's avatar_entries.
+
+    before_write(file_path) is called before each profile file is written, so
+    the previous contents (or their absence) can be backed up.
+
+    Returns an ImportResult. If the import is cancelled, ImportCancelled
+    carries the result for the sources handled until then.
+    """
+    result = ImportResult()
+    validations = (map_chunks or (lambda function, items: function(items)))(validate_chunk, sources)
+
+    reader = _SourceReader()
+    handled = []
+    try:
+        for done, validation in enumerate(validations, start=1):
+            if is_cancelled and is_cancelled():
+                break
+            _apply(validation, profiles_dir, policy, reader, result, before_write)
+            handled.append(validation.source)
+            if progress:
+                progress(done, len(validations))
+    finally:
+        reader.close()
+
+    if store_thumbnail:
+        for archive_path in sorted({source.path for source in handled if source.member is not None}):
+            try:
+                result.avatar_entries.update(read_bundled_cache(archive_path, store_thumbnail))
+            except Exception as e:
+                logger.error(f"Error reading bundled avatar details from {archive_path}: {str(e)}")
+
+    logger.info(f"Imported {len(result.imported)} profiles, skipped {len(result.skipped)}, "
+                f"{len(result.identical)} identical, {len(result.errors)} errors")
+    if len(handled) < len(validations):
+        logger.info(f"Import cancelled after {len(handled)} of {len(validations)} sources")
+        raise ImportCancelled(result)
+    return result
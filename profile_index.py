@@ -0,0 +1,203 @@
+"""
+Inverted index of parameter names and saved-profile names.
+
+Maps each parameter name and profileName (case-insensitively) to the files and
+saved-profile indexes it appears in. Entries are keyed by file modification
+time and size, so after a directory scan only new or changed files are parsed
+again. The index is persisted next to the avatar cache; changes to single
+files are only marked dirty and saved in batches (see save_if_dirty), and a
+file whose entry wasn't saved yet is simply parsed again on the next scan.
+"""
+import os
+import bisect
+import logging
+
+import json_codec
+from profile_io import atomic_write
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_INDEX')
+
+INDEX_VERSION = 2
+
+# Kinds of indexed terms
+KIND_PARAM = "param"
+KIND_PROFILE = "profile"
+KINDS = (KIND_PARAM, KIND_PROFILE)
+
+
+def index_file(file_path):
+    """Return {kind: {term: [saved-profile indexes]}, "count": saved profiles} for one profile file."""
+    entry = {kind: {} for kind in KINDS}
+    entry["count"] = 0
+    try:
+        document = json_codec.load(file_path)
+    except Exception:
+        return entry  # Unreadable files simply have no terms
+    saved_settings = document.get("savedSettings") if isinstance(document, dict) else None
+    entry["count"] = len(saved_settings) if isinstance(saved_settings, list) else 0
+    for i, profile in enumerate(saved_settings if isinstance(saved_settings, list) else []):
+        if not isinstance(profile, dict):
+            continue
+        if isinstance(profile.get("profileName"), str):
+            entry[KIND_PROFILE].setdefault(profile["profileName"], []).append(i)
+        values = profile.get("values")
+        for value_obj in values if isinstance(values, list) else []:
+            if isinstance(value_obj, dict) and isinstance(value_obj.get("name"), str):
+                indexes = entry[KIND_PARAM].setdefault(value_obj["name"], [])
+                if not indexes or indexes[-1] != i:
+                    indexes.append(i)
+    return entry
+
+
+def index_chunk(file_paths):
+    """Index a chunk of files; runs inside a worker process."""
+    return [(os.path.basename(file_path), index_file(file_path)) for file_path in file_paths]
+
+
+class ProfileIndex:
+    def __init__(self, index_file_path=os.path.join("cache", "profile_index.json")):
+        self.index_file_path = index_file_path
+        self.root = None
+        self.dirty = False  # Changed by update_files since the last save
+        self.files = {}  # file name -> {"mtime", "size", "count", kind: {term: [indexes]}}
+        self.postings = {kind: {} for kind in KINDS}  # kind -> casefolded term -> {file name: [indexes]}
+        self.sorted_terms = {kind: None for kind in KINDS}  # Rebuilt lazily after changes
+        self.load()
+
+    def load(self):
+        """Load the persisted index, if there is one."""
+        if not os.path.exists(self.index_file_path):
+            return
+        try:
+            data = json_codec.load(self.index_file_path)
+            if data.get("version") != INDEX_VERSION:
+                return
+            self.root = data["root"]
+            for file_name, entry in data["files"].items():
+                self._add(file_name, entry)
+            logger.info(f"Loaded index of {len(self.files)} profiles")
+        except Exception as e:
+            logger.error(f"Error loading profile index: {str(e)}")
+            self.clear()
+
+    def save(self):
+        self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.index_file_path) or ".", exist_ok=True)
+            atomic_write(self.index_file_path, json_codec.dumps_bytes(
+                {"version": INDEX_VERSION, "root": self.root, "files": self.files}))
+        except Exception as e:
+            logger.error(f"Error saving profile index: {str(e)}")
+
+    def save_if_dirty(self):
+        """Save the changes made by update_files, if there are any."""
+        if self.dirty:
+            self.save()
+
+    def clear(self):
+        self.files = {}
+        self.postings = {kind: {} for kind in KINDS}
+        self.sorted_terms = {kind: None for kind in KINDS}
+
+    def _add(self, file_name, entry):
+        self.files[file_name] = entry
+        for kind in KINDS:
+            postings = self.postings[kind]
+            for term, indexes in entry[kind].items():
+                key = term.casefold()
+                if key not in postings:
+                    postings[key] = {}
+                    self.sorted_terms[kind] = None
+                postings[key][file_name] = postings[key].get(file_name, []) + indexes
+
+    def _remove(self, file_name):
+        entry = self.files.pop(file_name, None)
+        if entry is None:
+            return
+        for kind in KINDS:
+            postings = self.postings[kind]
+            for term in entry[kind]:
+                key = term.casefold()
+                files = postings.get(key)
+                if files is None:
+                    continue
+                files.pop(file_name, None)
+                if not files:
+                    del postings[key]
+                    self.sorted_terms[kind] = None
+
+    def update(self, profiles_dir, scan_results, map_chunks=None):
+        """Bring the index in line with a directory scan.
+
+        Files that disappeared are dropped and only files whose modification
+        time or size changed are parsed again (through map_chunks, if given).
+        """
+        if self.root != profiles_dir:
+            self.clear()
+            self.root = profiles_dir
+
+        current = {result.file_name: result for result in scan_results}
+        removed = [file_name for file_name in self.files if file_name not in current]
+        stale = [
+            result for result in scan_results
+            if result.file_name not in self.files
+            or self.files[result.file_name]["mtime"] != result.mtime
+            or self.files[result.file_name]["size"] != result.size
+        ]
+        if not removed and not stale:
+            return
+
+        for file_name in removed:
+            self._remove(file_name)
+        self._index([(r.file_name, r.file_path, r.mtime, r.size) for r in stale], map_chunks)
+        logger.info(f"Index updated: {len(stale)} profiles indexed, {len(removed)} removed")
+        self.save()
+
+    def update_files(self, file_paths, map_chunks=None):
+        """Re-index specific files after they were written, or drop them if deleted.
+
+        The index is not saved here; call save_if_dirty later.
+        """
+        stale = []
+        for file_path in file_paths:
+            file_name = os.path.basename(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                self._remove(file_name)
+                continue
+            stale.append((file_name, file_path, stat.st_mtime, stat.st_size))
+        self._index(stale, map_chunks)
+        self.dirty = True
+
+    def _index(self, stale, map_chunks):
+        """Index a list of (file_name, file_path, mtime, size) tuples."""
+        if not stale:
+            return
+        map_chunks = map_chunks or (lambda function, items: function(items))
+        stamps = {file_name: (mtime, size) for file_name, _, mtime, size in stale}
+        for file_name, entry in map_chunks(index_chunk, [file_path for _, file_path, _, _ in stale]):
+            self._remove(file_name)
+            entry["mtime"], entry["size"] = stamps[file_name]
+            self._add(file_name, entry)
+
+    def saved_profile_count(self, file_name):
+        """Return the number of saved profiles in an indexed file (0 if unknown)."""
+        entry = self.files.get(file_name)
+        return entry["count"] if entry else 0
+
+    def search(self, kind, text):
+        """Return {file name: [saved-profile indexes]} for terms starting with text (case-insensitive)."""
+        if self.sorted_terms[kind] is None:
+            self.sorted_terms[kind] = sorted(self.postings[kind])
+        terms = self.sorted_terms[kind]
+        prefix = text.casefold()
+        matches = {}
+        for i in range(bisect.bisect_left(terms, prefix), len(terms)):
+            if not terms[i].startswith(prefix):
+                break
+            for file_name, indexes in self.postings[kind][terms[i]].items():
+                matches.setdefault(file_name, set()).update(indexes)
+        return {file_name: sorted(indexes) for file_name, indexes in matches.items()}
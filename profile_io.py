@@ -0,0 +1,295 @@
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+import logging
+from collections import namedtuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_IO')
+
+# What we knew about a file when it was read: stat fingerprint plus content hash
+FileSnapshot = namedtuple("FileSnapshot", ["mtime_ns", "size", "digest"])
+
+
+def content_hash(data):
+    """Return the hex digest used to compare file contents."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_with_snapshot(file_path):
+    """Read a file as bytes and return (data, FileSnapshot)."""
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    return data, FileSnapshot(stat.st_mtime_ns, stat.st_size, content_hash(data))
+
+
+def current_digest(file_path, snapshot=None):
+    """Return the hash of a file on disk, or None if it doesn't exist.
+
+    If the file's stat fingerprint still matches the snapshot, the snapshot's
+    digest is reused instead of re-reading the file.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    if snapshot and stat.st_mtime_ns == snapshot.mtime_ns and stat.st_size == snapshot.size:
+        return snapshot.digest
+    with open(file_path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def is_modified_since(file_path, snapshot):
+    """Check whether a file's contents changed since the snapshot was taken."""
+    if snapshot is None:
+        return False
+    return current_digest(file_path, snapshot) != snapshot.digest
+
+
+# The process umask, read once at import: os.umask can only be read by setting
+# it, which would race with files created by other threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _copy_permissions(file_path, temp_path):
+    """Give the temporary file the target's permissions, or the usual default.
+
+    mkstemp creates files readable only by their owner; without this, every
+    file atomic_write replaced would end up with mode 0600.
+    """
+    try:
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+    except OSError as e:
+        logger.debug(f"Could not set permissions of {file_path}: {str(e)}")
+
+
+def atomic_write(file_path, data):
+    """Write bytes to a file so readers only ever see the old or the new contents.
+
+    The data is written to a temporary file in the same directory, flushed to
+    disk and then renamed over the target. The target keeps its permissions;
+    a new file gets the default ones.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".part", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        _copy_permissions(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(file_path, data, snapshot=None, before_write=None):
+    """Atomically write data unless the file already holds exactly these bytes.
+
+    before_write(file_path) is called right before the file is replaced, e.g.
+    to back up the old contents. Returns a tuple of (written, new_snapshot).
+    """
+    digest = content_hash(data)
+    if current_digest(file_path, snapshot) == digest:
+        logger.info(f"Skipped writing unchanged file: {file_path}")
+        stat = os.stat(file_path)
+        return False, FileSnapshot(stat.st_mtime_ns, stat.st_size, digest)
+
+    if before_write:
+        before_write(file_path)
+    atomic_write(file_path, data)
+    stat = os.stat(file_path)
+    logger.info(f"Saved {len(data)} bytes to {file_path}")
+    return True, FileSnapshot(stat.st_mtime_ns, stat.st_size, digest)
+
+
+# Results of detect_profile_state
+PROFILE_EMPTY = "empty"
+PROFILE_NON_EMPTY = "non_empty"
+PROFILE_CORRUPT = "corrupt"
+
+_WHITESPACE = b" \t\r\n"
+_STRUCTURAL = re.compile(rb'["{}\[\],]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+
+
+class _NeedMore(Exception):
+    pass
+
+
+class _EmptyProfileScanner:
+    """Incremental scanner that decides whether savedSettings is an empty array.
+
+    Bytes are fed in chunks and scanning stops as soon as the answer is known,
+    so large non-empty profiles are decided after reading only their start.
+    Only the structure of the top-level object is tracked; values of other
+    keys are skipped without being parsed.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.pos = 0
+        self.step = self.expect_object
+        self.key = None
+        # State used while skipping over the value of an unrelated key
+        self.depth = 0
+        self.in_string = False
+
+    def feed(self, chunk):
+        """Add bytes and return a PROFILE_* state once decided, otherwise None."""
+        # Drop what has already been consumed to keep memory bounded
+        del self.buffer[:self.pos]
+        self.pos = 0
+        self.buffer += chunk
+        try:
+            while True:
+                result = self.step()
+                if result is not None:
+                    return result
+        except _NeedMore:
+            return None
+
+    def peek(self):
+        """Return the next non-whitespace byte, consuming the whitespace."""
+        buffer = self.buffer
+        while self.pos < len(buffer) and buffer[self.pos] in _WHITESPACE:
+            self.pos += 1
+        if self.pos >= len(buffer):
+            raise _NeedMore()
+        return buffer[self.pos:self.pos + 1]
+
+    def expect_object(self):
+        if self.buffer.startswith(b"\xef\xbb\xbf"):
+            self.pos = 3
+        if self.peek() != b"{":
+            return PROFILE_CORRUPT
+        self.pos += 1
+        self.step = self.key_or_end
+
+    def key_or_end(self):
+        char = self.peek()
+        if char == b"}":
+            # No savedSettings key at all
+            return PROFILE_NON_EMPTY
+        if char != b'"':
+            return PROFILE_CORRUPT
+        # Wait until the whole key is buffered
+        end = self.pos + 1
+        while True:
+            match = _STRING_SPECIAL.search(self.buffer, end)
+            if not match:
+                raise _NeedMore()
+            if match.group() == b"\\":
+                end = match.end() + 1
+                continue
+            break
+        self.key = bytes(self.buffer[self.pos + 1:match.start()])
+        self.pos = match.end()
+        self.step = self.colon
+
+    def colon(self):
+        if self.peek() != b":":
+            return PROFILE_CORRUPT
+        self.pos += 1
+        if self.key == b"savedSettings":
+            self.step = self.saved_settings_open
+        else:
+            self.depth = 0
+            self.in_string = False
+            self.step = self.skip_value
+
+    def saved_settings_open(self):
+        if self.peek() != b"[":
+            # savedSettings isn't an array, so it can't be an empty one
+            return PROFILE_NON_EMPTY
+        self.pos += 1
+        self.step = self.saved_settings_first
+
+    def saved_settings_first(self):
+        return PROFILE_EMPTY if self.peek() == b"]" else PROFILE_NON_EMPTY
+
+    def skip_value(self):
+        buffer = self.buffer
+        while True:
+            if self.in_string:
+                match = _STRING_SPECIAL.search(buffer, self.pos)
+                if not match:
+                    self.pos = len(buffer)
+                    raise _NeedMore()
+                if match.group() == b"\\":
+                    if match.end() >= len(buffer):
+                        self.pos = match.start()
+                        raise _NeedMore()
+                    self.pos = match.end() + 1
+                    continue
+                self.in_string = False
+                self.pos = match.end()
+                continue
+
+            match = _STRUCTURAL.search(buffer, self.pos)
+            if not match:
+                self.pos = len(buffer)
+                raise _NeedMore()
+            char = match.group()
+            if char == b'"':
+                self.in_string = True
+                self.pos = match.end()
+            elif char in (b"{", b"["):
+                self.depth += 1
+                self.pos = match.end()
+            elif self.depth == 0:
+                # A ',' or '}' at the top level ends the value
+                self.pos = match.start()
+                self.step = self.after_value
+                return None
+            elif char in (b"}", b"]"):
+                self.depth -= 1
+                self.pos = match.end()
+            else:
+                self.pos = match.end()
+
+    def after_value(self):
+        char = self.peek()
+        self.pos += 1
+        if char == b",":
+            self.step = self.key_or_end
+            return None
+        if char == b"}":
+            return PROFILE_NON_EMPTY
+        return PROFILE_CORRUPT
+
+
+def detect_profile_state(file_path, chunk_size=4096):
+    """Classify a profile file as empty, non-empty or corrupt.
+
+    A profile is empty when its savedSettings is an empty array. The file is
+    read in chunks only until that can be decided; files that can't be read,
+    aren't a JSON object or end before the decision are reported as corrupt.
+    The rest of the file is not checked: a file cut off after the first
+    savedSettings element is reported as non-empty, not corrupt.
+    """
+    scanner = _EmptyProfileScanner()
+    try:
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return PROFILE_CORRUPT
+                state = scanner.feed(chunk)
+                if state is not None:
+                    return state
+    except OSError as e:
+        logger.error(f"Error reading profile {file_path}: {str(e)}")
+        return PROFILE_CORRUPT
@@ -0,0 +1,120 @@
+"""
+Additional profile libraries (profile directories besides the CVR install's).
+
+Each library has a label, shown in the list and used as its filter, and its
+own profile index (manifest) so unchanged files are not parsed again. The
+libraries are scanned on their own threads; while a library is being scanned
+its index belongs to that thread and is not handed out.
+"""
+import os
+import hashlib
+import logging
+
+from profile_index import ProfileIndex
+from profile_scanner import list_profile_files, scan_chunk
+from profile_filters import FILTER_GROUPS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_LIBRARIES')
+
+PRIMARY_LABEL = "CVR install"
+LIBRARY_GROUP = "Library"
+
+
+def normalize_root(path):
+    """Return a directory path the way it appears in the dirname of its files."""
+    return os.path.dirname(os.path.join(path, "_"))
+
+
+def index_file_path(root):
+    """Return where the profile index of a library is kept."""
+    digest = hashlib.sha1(normalize_root(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join("cache", f"profile_index_{digest}.json")
+
+
+def scan_library(root, profile_index):
+    """Scan a library and bring its index up to date; runs on a worker thread.
+
+    Returns the ScanResults in listing order.
+    """
+    results = scan_chunk(list_profile_files(root))
+    profile_index.update(root, results)
+    logger.info(f"Scanned {len(results)} profiles in {root}")
+    return results
+
+
+class ProfileLibraries:
+    """The primary profiles directory plus the configured additional libraries."""
+
+    def __init__(self, primary_index):
+        self.primary_root = None
+        self.primary_index = primary_index
+        self.labels = {}  # normalized root -> label, additional libraries only
+        self.indexes = {}  # normalized root -> ProfileIndex
+        self.scanning = set()  # Roots whose index is being updated on a worker thread
+
+    def configure(self, primary_root, libraries):
+        """Set the primary directory and the additional [{"path", "label"}] libraries.
+
+        Returns the roots of libraries that were removed.
+        """
+        self.primary_root = normalize_root(primary_root) if primary_root else None
+        old_roots = set(self.labels)
+        self.labels = {}
+        used = {PRIMARY_LABEL} | {name for _, names in FILTER_GROUPS for name in names}
+        for library in libraries:
+            root = normalize_root(library["path"])
+            if root == self.primary_root or root in self.labels:
+                continue
+            label = library.get("label") or os.path.basename(root) or root
+            unique, n = label, 2
+            while unique in used:
+                unique, n = f"{label} ({n})", n + 1
+            used.add(unique)
+            self.labels[root] = unique
+        for root in list(self.indexes):
+            if root not in self.labels:
+                del self.indexes[root]
+        return old_roots - set(self.labels)
+
+    @property
+    def roots(self):
+        """All profile directories, the primary one first."""
+        return ([self.primary_root] if self.primary_root else []) + list(self.labels)
+
+    def label(self, root):
+        return self.labels.get(root, PRIMARY_LABEL)
+
+    def filter_names(self):
+        """The library filters, or none without additional libraries."""
+        return [PRIMARY_LABEL] + list(self.labels.values()) if self.labels else []
+
+    def begin_scan(self, root):
+        """Hand the index of a library to a scan; returns None if one is running."""
+        if root in self.scanning:
+            return None
+        if root not in self.indexes:
+            self.indexes[root] = ProfileIndex(index_file_path(root))
+        self.scanning.add(root)
+        return self.indexes[root]
+
+    def end_scan(self, root):
+        self.scanning.discard(root)
+
+    def index_for(self, root):
+        """Return the profile index of a directory, or None if unavailable right now."""
+        if root == self.primary_root:
+            return self.primary_index
+        if root in self.scanning:
+            return None
+        return self.indexes.get(root)
+
+    def available_indexes(self):
+        """Return (root, ProfileIndex) for every index that can be read right now."""
+        indexes = []
+        for root in self.roots:
+            index = self.index_for(root)
+            if index is not None:
+                indexes.append((root, index))
+        return indexes
@@ -0,0 +1,74 @@
+"""
+The profile list as it was shown at the end of the last session.
+
+On exit the listed profiles are written out in display order with their scan
+details (state, size, mtime) and the avatar details they were shown with
+(names, creators, published/shared flags; thumbnails are referenced by avatar
+ID through the thumbnail cache). The next launch paints this list right away
+and reconciles it with the directories and the avatar cache in the
+background. The file is only used while the same profile directories are
+configured.
+"""
+import os
+import logging
+
+import json_codec
+from profile_io import atomic_write
+from profile_scanner import ScanResult, avatar_id_from_file_name
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_LIST_CACHE')
+
+LIST_CACHE_VERSION = 1
+LIST_CACHE_FILE = os.path.join("cache", "profile_list.json")
+
+
+def save_profile_list(roots, sort_order, records, file_path=LIST_CACHE_FILE):
+    """Write the records (ProfileRecords in display order) for the next launch."""
+    avatars = {}
+    profiles = []
+    for record in records:
+        avatars.setdefault(record.avatar_id, record.avatar_data)
+        profiles.append([record.file_path, record.state, record.size, record.mtime])
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        atomic_write(file_path, json_codec.dumps_bytes({
+            "version": LIST_CACHE_VERSION,
+            "roots": list(roots),
+            "sort_order": sort_order,
+            "avatars": avatars,
+            "profiles": profiles
+        }))
+        logger.info(f"Saved the list of {len(profiles)} profiles")
+    except Exception as e:
+        logger.error(f"Error saving profile list: {str(e)}")
+
+
+def load_profile_list(roots, avatar_cache, file_path=LIST_CACHE_FILE):
+    """Return (sort order, [(ScanResult, avatar details)]) in display order.
+
+    Returns None if there is no saved list, or it was saved for other profile
+    directories. Avatar details that still match avatar_cache use its entry.
+    """
+    if not os.path.exists(file_path):
+        return None
+    try:
+        data = json_codec.load(file_path)
+        if data.get("version") != LIST_CACHE_VERSION or data.get("roots") != list(roots):
+            logger.info("Saved profile list is outdated, not using it")
+            return None
+        avatars = data["avatars"]
+        for avatar_id, details in avatars.items():
+            entry = avatar_cache.get(avatar_id)
+            if entry == details:
+                avatars[avatar_id] = entry
+        profiles = []
+        for path, state, size, mtime in data["profiles"]:
+            file_name = os.path.basename(path)
+            profiles.append((ScanResult(file_name, path, state, size, mtime), avatars[avatar_id_from_file_name(file_name)]))
+        logger.info(f"Loaded the list of {len(profiles)} profiles from the last session")
+        return data["sort_order"], profiles
+    except Exception as e:
+        logger.error(f"Error loading profile list: {str(e)}")
+        return None
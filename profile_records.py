@@ -0,0 +1,90 @@
+"""
+Compact in-memory records for the profile list.
+
+One __slots__ object per profile file instead of a tuple plus a scan info
+tuple. Each file path is kept once, as both the key and the record's path;
+the file name, directory and avatar ID are derived from it on demand. Avatar
+details are referenced, not copied: a record points at the CacheManager entry
+itself, and details that are not in the cache (placeholders while loading,
+the unknown-avatar default when offline) are shared between all records with
+the same contents.
+"""
+import os
+import sys
+
+from profile_scanner import avatar_id_from_file_name
+
+# Shown until the avatar details have been looked up
+LOADING_AVATAR = {"name": "Loading...", "imageUrl": "", "lastUpdated": 0}
+
+
+class ProfileRecord:
+    __slots__ = ("file_path", "state", "size", "mtime", "avatar_data")
+
+    def __init__(self, file_path, state, size, mtime, avatar_data):
+        self.file_path = file_path
+        self.state = state
+        self.size = size
+        self.mtime = mtime
+        self.avatar_data = avatar_data
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.file_path)
+
+    @property
+    def directory(self):
+        return os.path.dirname(self.file_path)
+
+    @property
+    def avatar_id(self):
+        return avatar_id_from_file_name(self.file_name)
+
+
+class RecordStore:
+    """The profile records by file path."""
+
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+        self.records = {}  # file path -> ProfileRecord
+        self.shared_data = {}  # contents -> avatar details not held by the cache
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, file_path):
+        return file_path in self.records
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, file_path):
+        return self.records.get(file_path)
+
+    def values(self):
+        return self.records.values()
+
+    def set(self, scan_result, avatar_data):
+        """Add or replace the record for a ScanResult and return it."""
+        file_path = scan_result.file_path
+        record = ProfileRecord(file_path, sys.intern(scan_result.state), scan_result.size, scan_result.mtime,
+                               self._share(avatar_id_from_file_name(scan_result.file_name), avatar_data))
+        self.records[file_path] = record
+        return record
+
+    def _share(self, avatar_id, avatar_data):
+        if self.cache_manager.avatar_cache.get(avatar_id) is avatar_data:
+            return avatar_data
+        try:
+            key = tuple(sorted(avatar_data.items()))
+        except TypeError:
+            return avatar_data  # Unhashable values; keep the details as they are
+        return self.shared_data.setdefault(key, avatar_data)
+
+    def remove(self, file_path):
+        """Remove and return a record, or None if there is none."""
+        return self.records.pop(file_path, None)
+
+    def clear(self):
+        self.records = {}
+        self.shared_data = {}
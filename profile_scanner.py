@@ -0,0 +1,126 @@
+import os
+import re
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from profile_io import detect_profile_state
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_SCANNER')
+
+PROFILE_EXTENSION = ".advavtr"
+COPY_SUFFIX = re.compile(r" \(\d+\)$")
+
+# Per-file result of a directory scan
+ScanResult = namedtuple("ScanResult", ["file_name", "file_path", "state", "size", "mtime"])
+
+
+def scan_file(file_path):
+    """Compute everything the scan needs to know about a single profile file."""
+    try:
+        stat = os.stat(file_path)
+        size, mtime = stat.st_size, stat.st_mtime
+    except OSError:
+        size, mtime = 0, 0
+    return ScanResult(os.path.basename(file_path), file_path, detect_profile_state(file_path), size, mtime)
+
+
+def scan_chunk(file_paths):
+    """Scan a chunk of files; runs inside a worker process."""
+    return [scan_file(file_path) for file_path in file_paths]
+
+
+def avatar_id_from_file_name(file_name):
+    """Return the avatar ID a profile file belongs to.
+
+    Copies kept side by side on import are named "<id> (2).advavtr" and so on.
+    """
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    return COPY_SUFFIX.sub("", stem)
+
+
+def list_profile_files(profiles_dir):
+    """Return the paths of all profile files in a directory, in listing order."""
+    return [
+        os.path.join(profiles_dir, file_name)
+        for file_name in os.listdir(profiles_dir)
+        if file_name.endswith(PROFILE_EXTENSION)
+    ]
+
+
+class ProfileScanner:
+    """Scans profile directories, fanning large scans out to a process pool.
+
+    The pool is also available to other per-file work (see map_chunks), and
+    is shared by the worker threads that use it.
+    """
+
+    def __init__(self, max_workers=None, parallel_threshold=500, chunks_per_worker=4):
+        """
+        max_workers: number of worker processes (defaults to the CPU count).
+        parallel_threshold: inputs with fewer items (files) than this are
+            processed in-process, since the pool would cost more than it saves.
+        chunks_per_worker: how many chunks each worker gets, to balance load.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.chunks_per_worker = chunks_per_worker
+        self.executor = None
+        self.lock = threading.Lock()  # Guards creating and shutting down the pool
+
+    def scan(self, profiles_dir):
+        """Scan all profile files in a directory and return ScanResults in listing order."""
+        return self.map_chunks(scan_chunk, list_profile_files(profiles_dir))
+
+    def map_chunks(self, chunk_function, items):
+        """Apply chunk_function to chunks of items and return the merged results in order.
+
+        chunk_function takes a list of items and returns a list of results; it
+        must be a module-level function so it can be sent to worker processes.
+        Inputs smaller than the parallel threshold are processed in-process.
+        """
+        if len(items) < self.parallel_threshold or self.max_workers < 2:
+            return chunk_function(items)
+
+        executor = None
+        try:
+            executor = self._get_executor()
+            return self._map_parallel(executor, chunk_function, items)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            # RuntimeError: the pool was shut down by another thread (or on close) meanwhile
+            logger.error(f"Parallel processing failed, falling back to in-process: {str(e)}")
+            self.shutdown(executor)
+            return chunk_function(items)
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.executor
+
+    def _map_parallel(self, executor, chunk_function, items):
+        chunk_size = max(1, -(-len(items) // (self.max_workers * self.chunks_per_worker)))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        logger.info(f"Processing {len(items)} items in {len(chunks)} chunks on {self.max_workers} processes")
+
+        # map() yields chunk results in submission order, so the input order is kept
+        results = []
+        for chunk_results in executor.map(chunk_function, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def shutdown(self, executor=None):
+        """Stop the worker processes, if any were started.
+
+        With executor, only stop the pool if it is still that one, so a thread
+        giving up on a broken pool doesn't stop a replacement another started.
+        """
+        with self.lock:
+            if self.executor is None or (executor is not None and executor is not self.executor):
+                return
+            self.executor.shutdown(wait=False)
+            self.executor = None
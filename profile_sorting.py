@@ -0,0 +1,71 @@
+"""
+Sort orders for the profile list.
+
+Sort keys are computed once per record, with names casefolded up front. The
+sorted order for each sort option is built the first time it is requested and
+then kept up to date as records are added, changed or removed, so switching
+between orders or updating a few records never re-sorts the whole list.
+"""
+import bisect
+
+SORT_AVATAR_NAME = "Avatar Name (A-Z)"
+SORT_FILE_NAME = "Filename (A-Z)"
+SORT_CREATOR = "Creator (A-Z)"
+SORT_MODIFIED = "Last Modified (Newest)"
+SORT_SIZE = "File Size (Largest)"
+SORT_SAVED_PROFILES = "Saved Profiles (Most)"
+SORT_ORDERS = [SORT_AVATAR_NAME, SORT_FILE_NAME, SORT_CREATOR, SORT_MODIFIED, SORT_SIZE, SORT_SAVED_PROFILES]
+
+
+def sort_keys(file_name, avatar_data, size, mtime, saved_profiles):
+    """Return {sort order: key} for one record. Ties are broken by file name.
+
+    SortedViews stores (key, file path), so records whose keys are equal
+    (the same file name in two libraries) are ordered by their path.
+    """
+    file_key = file_name.casefold()
+    name_key = str(avatar_data.get("name", "")).casefold()
+    return {
+        SORT_AVATAR_NAME: (name_key, file_key),
+        SORT_FILE_NAME: (file_key,),
+        SORT_CREATOR: (str(avatar_data.get("creatorName", "")).casefold(), name_key, file_key),
+        SORT_MODIFIED: (-mtime, file_key),
+        SORT_SIZE: (-size, file_key),
+        SORT_SAVED_PROFILES: (-saved_profiles, name_key, file_key)
+    }
+
+
+class SortedViews:
+    """Keeps the file paths of all records sorted by every requested order."""
+
+    def __init__(self):
+        self.keys = {}  # file path -> {sort order: key}
+        self.orders = {}  # sort order -> sorted list of (key, file path)
+
+    def clear(self):
+        self.keys = {}
+        self.orders = {}
+
+    def set(self, file_path, keys):
+        """Add a record or update its keys."""
+        old_keys = self.keys.get(file_path)
+        self.keys[file_path] = keys
+        for order, entries in self.orders.items():
+            if old_keys is not None:
+                if old_keys[order] == keys[order]:
+                    continue
+                del entries[bisect.bisect_left(entries, (old_keys[order], file_path))]
+            bisect.insort(entries, (keys[order], file_path))
+
+    def remove(self, file_path):
+        old_keys = self.keys.pop(file_path, None)
+        if old_keys is None:
+            return
+        for order, entries in self.orders.items():
+            del entries[bisect.bisect_left(entries, (old_keys[order], file_path))]
+
+    def ordered(self, order):
+        """Return all file paths in the given sort order."""
+        if order not in self.orders:
+            self.orders[order] = sorted((keys[order], file_path) for file_path, keys in self.keys.items())
+        return [file_path for _, file_path in self.orders[order]]
@@ -0,0 +1,205 @@
+"""
+Directory-wide profile statistics.
+
+Per-file figures (size, modification time, saved profiles and values per saved
+profile) are cached by modification time and size, so only new or changed
+files are parsed again. The summary is aggregated in one pass over the cached
+records, keeping only bounded top lists in memory.
+"""
+import os
+import csv
+import time
+import heapq
+import logging
+import statistics
+from collections import namedtuple
+
+import json_codec
+from profile_io import atomic_write, detect_profile_state, PROFILE_EMPTY, PROFILE_CORRUPT
+from profile_scanner import list_profile_files, avatar_id_from_file_name
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('PROFILE_STATS')
+
+STATS_VERSION = 1
+
+# Figures for one file; values holds the value count of each saved profile
+FileStats = namedtuple("FileStats", ["file_name", "size", "mtime", "state", "values"])
+
+
+def file_stats(file_path):
+    """Collect the figures for one profile file."""
+    stat = os.stat(file_path)
+    state = detect_profile_state(file_path)
+    values = []
+    if state not in (PROFILE_EMPTY, PROFILE_CORRUPT):
+        try:
+            saved_settings = json_codec.load(file_path).get("savedSettings") or []
+            values = [
+                len(profile.get("values") or []) if isinstance(profile, dict) else 0
+                for profile in saved_settings
+            ]
+        except Exception:
+            state = PROFILE_CORRUPT
+    return FileStats(os.path.basename(file_path), stat.st_size, stat.st_mtime, state, values)
+
+
+def stats_chunk(file_paths):
+    """Collect figures for a chunk of files; runs inside a worker process."""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(file_stats(file_path))
+        except OSError:
+            pass  # Deleted while the statistics were being collected
+    return results
+
+
+class DirectoryStats:
+    """Aggregate statistics for a profiles directory."""
+
+    def __init__(self, files, top=10):
+        self.files = files  # FileStats for every file, in listing order
+        self.total_files = len(files)
+        self.total_bytes = 0
+        self.empty = 0
+        self.corrupt = 0
+        self.saved_profiles = 0
+        self.avatars = {}  # avatar ID -> saved profiles across its files
+
+        values_per_profile = []
+        for stats in files:
+            self.total_bytes += stats.size
+            if stats.state == PROFILE_EMPTY:
+                self.empty += 1
+            elif stats.state == PROFILE_CORRUPT:
+                self.corrupt += 1
+            self.saved_profiles += len(stats.values)
+            values_per_profile.extend(stats.values)
+            avatar_id = avatar_id_from_file_name(stats.file_name)
+            self.avatars[avatar_id] = self.avatars.get(avatar_id, 0) + len(stats.values)
+
+        self.total_values = sum(values_per_profile)
+        self.values_per_profile = self._summary(values_per_profile)
+        self.profiles_per_avatar = self._summary(list(self.avatars.values()))
+        self.largest_files = heapq.nlargest(top, files, key=lambda stats: stats.size)
+        self.oldest_files = heapq.nsmallest(top, files, key=lambda stats: stats.mtime)
+        self.most_profiles = heapq.nlargest(top, self.avatars.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def _summary(numbers):
+        if not numbers:
+            return {"min": 0, "mean": 0, "median": 0, "max": 0}
+        return {
+            "min": min(numbers),
+            "mean": round(statistics.fmean(numbers), 2),
+            "median": statistics.median(numbers),
+            "max": max(numbers)
+        }
+
+    def summary(self):
+        """Return the aggregates as a JSON-serializable dict."""
+        return {
+            "files": self.total_files,
+            "bytes": self.total_bytes,
+            "empty": self.empty,
+            "corrupt": self.corrupt,
+            "avatars": len(self.avatars),
+            "savedProfiles": self.saved_profiles,
+            "values": self.total_values,
+            "savedProfilesPerAvatar": self.profiles_per_avatar,
+            "valuesPerSavedProfile": self.values_per_profile,
+            "largestFiles": [{"file": s.file_name, "size": s.size} for s in self.largest_files],
+            "oldestFiles": [{"file": s.file_name, "mtime": s.mtime} for s in self.oldest_files],
+            "mostSavedProfiles": [{"avatar": a, "savedProfiles": n} for a, n in self.most_profiles]
+        }
+
+    def export_json(self, file_path):
+        """Write the summary plus per-file figures as JSON."""
+        data = self.summary()
+        data["created"] = time.time()
+        data["perFile"] = [self._row(stats) for stats in self.files]
+        atomic_write(file_path, json_codec.dumps_bytes(data, indent=2))
+
+    def export_csv(self, file_path):
+        """Write one row of figures per file as CSV."""
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=["file", "avatarId", "size", "modified", "state",
+                                                   "savedProfiles", "values"])
+            writer.writeheader()
+            for stats in self.files:
+                writer.writerow(self._row(stats))
+
+    @staticmethod
+    def _row(stats):
+        return {
+            "file": stats.file_name,
+            "avatarId": avatar_id_from_file_name(stats.file_name),
+            "size": stats.size,
+            "modified": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(stats.mtime)),
+            "state": stats.state,
+            "savedProfiles": len(stats.values),
+            "values": sum(stats.values)
+        }
+
+
+class StatsCollector:
+    """Collects DirectoryStats, re-reading only files changed since the last run."""
+
+    def __init__(self, cache_file_path=os.path.join("cache", "profile_stats.json")):
+        self.cache_file_path = cache_file_path
+        self.root = None
+        self.files = {}  # file name -> FileStats
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.cache_file_path):
+            return
+        try:
+            data = json_codec.load(self.cache_file_path)
+            if data.get("version") == STATS_VERSION:
+                self.root = data["root"]
+                self.files = {row[0]: FileStats(*row) for row in data["files"]}
+        except Exception as e:
+            logger.error(f"Error loading statistics cache: {str(e)}")
+            self.root, self.files = None, {}
+
+    def save(self):
+        try:
+            atomic_write(self.cache_file_path, json_codec.dumps_bytes(
+                {"version": STATS_VERSION, "root": self.root, "files": [list(stats) for stats in self.files.values()]}))
+        except Exception as e:
+            logger.error(f"Error saving statistics cache: {str(e)}")
+
+    def collect(self, profiles_dir, map_chunks=None, top=10):
+        """Return DirectoryStats for a directory."""
+        if self.root != profiles_dir:
+            self.root, self.files = profiles_dir, {}
+
+        listing = []
+        stale = []
+        for file_path in list_profile_files(profiles_dir):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            file_name = os.path.basename(file_path)
+            listing.append(file_name)
+            cached = self.files.get(file_name)
+            if cached is None or cached.mtime != stat.st_mtime or cached.size != stat.st_size:
+                stale.append(file_path)
+
+        if stale:
+            map_chunks = map_chunks or (lambda function, items: function(items))
+            for stats in map_chunks(stats_chunk, stale):
+                self.files[stats.file_name] = stats
+        current = set(listing)
+        removed = [file_name for file_name in self.files if file_name not in current]
+        for file_name in removed:
+            del self.files[file_name]
+        if stale or removed:
+            self.save()
+        logger.info(f"Statistics for {len(listing)} profiles, {len(stale)} re-read")
+
+        return DirectoryStats([self.files[name] for name in listing if name in self.files], top)
@@ -0,0 +1,80 @@
+"""
+Coalescing scheduler for profile list updates.
+
+Every trigger asks for the cheapest update level that is sufficient: re-filter,
+re-sort, re-scan the directory or re-fetch all avatar details. Requests made
+before the scheduled update runs are merged into one run at the highest level
+requested. A request at or above the level of an update that is already
+running bumps the generation, which tells the running update (through its
+RefreshToken) to stop early; the newer request then runs once it has returned.
+Lower requests made while an update runs are covered by it and dropped.
+"""
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('REFRESH_SCHEDULER')
+
+# Update levels; each one includes everything below it
+LEVEL_FILTER = 1
+LEVEL_SORT = 2
+LEVEL_SCAN = 3
+LEVEL_FETCH = 4
+
+LEVEL_NAMES = {LEVEL_FILTER: "filter", LEVEL_SORT: "sort", LEVEL_SCAN: "scan", LEVEL_FETCH: "fetch"}
+
+
+class RefreshToken:
+    """Handed to a running update so it can check whether it was superseded."""
+
+    def __init__(self, scheduler, generation):
+        self.scheduler = scheduler
+        self.generation = generation
+
+    @property
+    def cancelled(self):
+        return self.generation != self.scheduler.generation
+
+
+class RefreshScheduler:
+    def __init__(self, handlers, call_later):
+        """
+        handlers: {level: function(token)} performing each update level.
+        call_later(delay_ms, function): schedules function on the event loop,
+            e.g. QTimer.singleShot.
+        """
+        self.handlers = handlers
+        self.call_later = call_later
+        self.pending = 0  # Highest level requested but not started yet
+        self.running = 0  # Level of the update in progress, 0 if idle
+        self.scheduled = False
+        self.generation = 0
+
+    def request(self, level, delay_ms=0):
+        """Ask for an update of at least the given level."""
+        if self.running:
+            if level < self.running:
+                return  # The running update covers it
+            self.generation += 1  # Supersede the running update
+            logger.info(f"Cancelling running {LEVEL_NAMES[self.running]} for a new {LEVEL_NAMES[level]}")
+        self.pending = max(self.pending, level)
+        if not self.scheduled:
+            self.scheduled = True
+            self.call_later(delay_ms, self.run)
+
+    def run(self):
+        """Run the pending update; called from the event loop."""
+        self.scheduled = False
+        if self.running or not self.pending:
+            return  # Re-entered from a running update; it reschedules when done
+
+        level, self.pending = self.pending, 0
+        self.generation += 1
+        self.running = level
+        try:
+            self.handlers[level](RefreshToken(self, self.generation))
+        finally:
+            self.running = 0
+        if self.pending and not self.scheduled:
+            self.scheduled = True
+            self.call_later(0, self.run)
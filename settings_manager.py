@@ -1,12 +1,15 @@
 import os
 import json
 from pathlib import Path
+from cache_eviction import DEFAULT_LIMITS
 
 class SettingsManager:
     def __init__(self):
         self.settings_file = "app_settings.json"
         self.default_settings = {
-            "cvr_directory": None
+            "cvr_directory": None,
+            "cache_limits": dict(DEFAULT_LIMITS),
+            "profile_libraries": []
         }
         self.settings = self.load_settings()
 
@@ -44,6 +47,26 @@ class SettingsManager:
         self.settings["cvr_directory"] = directory
         self.save_settings()
 
+    def get_cache_limits(self):
+        """Get the avatar cache limits, filling in defaults for missing keys."""
+        limits = dict(DEFAULT_LIMITS)
+        limits.update(self.settings.get("cache_limits") or {})
+        return limits
+
+    def set_cache_limits(self, limits):
+        """Set and save the avatar cache limits."""
+        self.settings["cache_limits"] = dict(limits)
+        self.save_settings()
+
+    def get_profile_libraries(self):
+        """Get the additional profile directories as [{"path", "label"}]."""
+        return list(self.settings.get("profile_libraries") or [])
+
+    def set_profile_libraries(self, libraries):
+        """Set and save the additional profile directories."""
+        self.settings["profile_libraries"] = list(libraries)
+        self.save_settings()
+
     def _find_default_cvr_directory(self):
         """Try to find the default CVR directory in common Steam locations."""
         # Common Steam installation paths
@@ -0,0 +1,264 @@
+"""
+Content-addressed snapshot store for profile backups.
+
+Before a destructive operation the affected files are captured into a
+snapshot. File contents are stored once per unique SHA-256 as zlib compressed
+blobs, so repeated captures of unchanged files cost no extra space. Each
+snapshot is a small JSON record listing the files it captured; a file that
+didn't exist yet (e.g. one created by an import) is recorded as absent, so
+restoring removes it again. Files are restored into the directory they were
+captured from, so profiles from additional libraries go back where they were.
+"""
+import os
+import time
+import zlib
+import logging
+import threading
+
+import json_codec
+from profile_io import content_hash, atomic_write
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('SNAPSHOT_STORE')
+
+
+class PendingSnapshot:
+    """A snapshot that files are being added to; call commit() when done."""
+
+    def __init__(self, store, reason):
+        self.store = store
+        self.reason = reason
+        self.files = {}
+        store.pending.add(self)
+
+    def add(self, file_path):
+        """Capture the current contents of a file (or the fact that it doesn't exist)."""
+        directory = os.path.dirname(os.path.abspath(file_path))
+        key = os.path.basename(file_path)
+        if key in self.files and self.files[key].get("directory") != directory:
+            key = os.path.join(directory, key)  # Same name in another library
+        if key in self.files:
+            return
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            mtime = os.path.getmtime(file_path)
+        except FileNotFoundError:
+            data = None
+        # Register the blob in the same critical section that writes it, so a
+        # prune on another thread can't delete it before this snapshot refers to it
+        with self.store.lock:
+            digest = self.store.put_blob(data) if data is not None else None
+            if digest is None:
+                entry = {"sha256": None, "size": 0, "mtime": 0}
+            else:
+                entry = {"sha256": digest, "size": len(data), "mtime": mtime}
+            entry["directory"] = directory
+            self.files[key] = entry
+
+    def commit(self):
+        """Write the snapshot record and apply the retention policy. Returns the snapshot ID."""
+        self.store.pending.discard(self)
+        if not self.files:
+            return None
+        return self.store.write_snapshot(self.reason, self.files)
+
+
+class SnapshotStore:
+    def __init__(self, store_dir="snapshots", max_snapshots=200, max_bytes=256 * 1024 * 1024, max_age_days=30):
+        """
+        The retention policy keeps at most max_snapshots snapshots, drops
+        snapshots older than max_age_days, and drops the oldest snapshots while
+        the stored blobs take more than max_bytes. At least the newest snapshot
+        is always kept, even if its blobs alone take more than max_bytes.
+        """
+        self.store_dir = store_dir
+        self.blobs_dir = os.path.join(store_dir, "blobs")
+        self.snapshots_dir = os.path.join(store_dir, "snapshots")
+        self.max_snapshots = max_snapshots
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.pending = set()  # Uncommitted snapshots, whose blobs must survive pruning
+        # Snapshot count, oldest creation time, blob bytes and the byte limit
+        # (raised to what the newest snapshot needs), kept up to date after the
+        # first prune so writes only prune when a limit is crossed
+        self.usage = None
+        self.lock = threading.Lock()  # Snapshots are written from worker threads too
+
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], f"{digest}.z")
+
+    def put_blob(self, data):
+        """Store data unless an identical blob exists. Returns its digest.
+
+        Called with self.lock held; the caller registers the digest before releasing it.
+        """
+        digest = content_hash(data)
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = zlib.compress(data, 6)
+            atomic_write(path, compressed)
+            if self.usage is not None:
+                self.usage["bytes"] += len(compressed)
+        return digest
+
+    def get_blob(self, digest):
+        with open(self.blob_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def begin(self, reason):
+        """Start a snapshot that files can be added to one by one."""
+        return PendingSnapshot(self, reason)
+
+    def capture(self, file_paths, reason):
+        """Capture the given files in a single snapshot. Returns the snapshot ID."""
+        pending = self.begin(reason)
+        for file_path in file_paths:
+            try:
+                pending.add(file_path)
+            except OSError as e:
+                logger.error(f"Error capturing {file_path}: {str(e)}")
+        return pending.commit()
+
+    def write_snapshot(self, reason, files):
+        with self.lock:
+            # IDs sort chronologically; UTC keeps that true across clock changes
+            created = time.time()
+            snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.gmtime(created)) + f"-{int(created * 1e6) % 1000000:06d}"
+            record = {"id": snapshot_id, "created": created, "reason": reason, "files": files}
+            atomic_write(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), json_codec.dumps_bytes(record, indent=2))
+            logger.info(f"Captured {len(files)} file(s) in snapshot {snapshot_id}: {reason}")
+            if self.usage is not None:
+                self.usage["count"] += 1
+                self.usage["oldest"] = min(self.usage["oldest"], created)
+            if self._over_limits():
+                self._prune()
+        return snapshot_id
+
+    def _over_limits(self):
+        """Whether a prune could remove anything; always true before the first prune."""
+        if self.usage is None:
+            return True
+        cutoff = time.time() - self.max_age_days * 24 * 60 * 60
+        return (self.usage["count"] > self.max_snapshots or self.usage["oldest"] < cutoff
+                or self.usage["bytes"] > self.usage["byte_limit"])
+
+    def list_snapshots(self):
+        """Return all snapshot records, newest first."""
+        snapshots = []
+        for file_name in sorted(os.listdir(self.snapshots_dir), reverse=True):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                snapshots.append(json_codec.load(os.path.join(self.snapshots_dir, file_name)))
+            except Exception as e:
+                logger.error(f"Error reading snapshot {file_name}: {str(e)}")
+        return snapshots
+
+    def get_snapshot(self, snapshot_id):
+        return json_codec.load(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"))
+
+    def target_path(self, snapshot, file_name, target_dir):
+        """Return where a captured file is restored to.
+
+        That is the directory it was captured from; snapshots taken before
+        directories were recorded, or of a directory that is gone, restore
+        into target_dir.
+        """
+        directory = snapshot["files"][file_name].get("directory")
+        if not directory or not os.path.isdir(directory):
+            directory = target_dir
+        return os.path.join(directory, os.path.basename(file_name))
+
+    def restore_file(self, snapshot, file_name, target_dir):
+        """Put one file back the way it was when the snapshot was taken. Returns its path."""
+        entry = snapshot["files"][file_name]
+        target_path = self.target_path(snapshot, file_name, target_dir)
+        if entry["sha256"] is None:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            return target_path
+        atomic_write(target_path, self.get_blob(entry["sha256"]))
+        os.utime(target_path, (entry["mtime"], entry["mtime"]))
+        return target_path
+
+    def restore_snapshot(self, snapshot, target_dir):
+        """Put back every file captured by a snapshot. Returns the restored file paths."""
+        return [self.restore_file(snapshot, file_name, target_dir) for file_name in snapshot["files"]]
+
+    def restore_to(self, snapshot_id, target_dir):
+        """Return the directory to its state before the given snapshot's operation.
+
+        Every snapshot from the newest back to snapshot_id is restored in turn,
+        undoing the recorded operations in reverse order. Returns the restored
+        file paths.
+        """
+        restored = set()
+        for snapshot in self.list_snapshots():
+            if snapshot["id"] < snapshot_id:
+                break
+            restored.update(self.restore_snapshot(snapshot, target_dir))
+        return sorted(restored)
+
+    def prune(self):
+        """Apply the retention policy and delete blobs no snapshot refers to."""
+        with self.lock:
+            self._prune()
+
+    def _prune(self):
+        snapshots = self.list_snapshots()
+        cutoff = time.time() - self.max_age_days * 24 * 60 * 60
+        keep = [
+            snapshot for i, snapshot in enumerate(snapshots)
+            if i == 0 or (i < self.max_snapshots and snapshot["created"] >= cutoff)
+        ]
+
+        # Drop the oldest snapshots while the blobs they need exceed the byte limit;
+        # the blobs of the newest one can't be freed, so they never count as excess
+        blob_sizes = self._blob_sizes()
+        byte_limit = max(self.max_bytes, sum(blob_sizes.get(d, 0) for d in self._referenced(keep[:1])))
+        while len(keep) > 1 and sum(blob_sizes.get(d, 0) for d in self._referenced(keep)) > byte_limit:
+            keep.pop()
+
+        kept_ids = {snapshot["id"] for snapshot in keep}
+        for snapshot in snapshots:
+            if snapshot["id"] not in kept_ids:
+                os.remove(os.path.join(self.snapshots_dir, f"{snapshot['id']}.json"))
+
+        referenced = self._referenced(keep)
+        referenced.update(self._referenced([{"files": dict(p.files)} for p in list(self.pending)]))
+        reclaimed = 0
+        for digest, size in blob_sizes.items():
+            if digest not in referenced:
+                os.remove(self.blob_path(digest))
+                reclaimed += size
+        if reclaimed or len(keep) < len(snapshots):
+            logger.info(f"Pruned {len(snapshots) - len(keep)} snapshot(s), reclaimed {reclaimed} bytes")
+        self.usage = {
+            "count": len(keep),
+            # The newest snapshot is always kept, so don't let its age trigger every write
+            "oldest": max(keep[-1]["created"], cutoff) if keep else time.time(),
+            "bytes": sum(blob_sizes.values()) - reclaimed,
+            "byte_limit": byte_limit
+        }
+
+    def _referenced(self, snapshots):
+        return {
+            entry["sha256"]
+            for snapshot in snapshots
+            for entry in snapshot["files"].values()
+            if entry["sha256"]
+        }
+
+    def _blob_sizes(self):
+        sizes = {}
+        for root, _, file_names in os.walk(self.blobs_dir):
+            for file_name in file_names:
+                if file_name.endswith(".z"):
+                    sizes[file_name[:-2]] = os.path.getsize(os.path.join(root, file_name))
+        return sizes
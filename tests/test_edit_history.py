@@ -0,0 +1,25 @@
+import unittest
+
+from edit_history import EditHistory, ValueEdit
+
+
+class EditHistoryTest(unittest.TestCase):
+    def test_push_after_undoing_past_save_point(self):
+        value_obj = {"name": "Toggle", "value": 0}
+        history = EditHistory()
+        history.clear([])
+
+        history.push(ValueEdit(value_obj, 0, 1))
+        history.mark_saved()
+        history.undo()
+        history.push(ValueEdit(value_obj, 0, 2))
+
+        self.assertEqual(value_obj["value"], 2)
+        self.assertTrue(history.is_dirty())
+        self.assertFalse(history.can_revert())
+        self.assertEqual(history.undo().new_value, 2)
+        self.assertEqual(value_obj["value"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
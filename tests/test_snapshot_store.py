@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+from snapshot_store import SnapshotStore
+
+
+class SnapshotStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_profile(self, name, size):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))  # Doesn't compress below the byte limit
+        return path
+
+    def test_newest_snapshot_over_byte_limit_is_pruned_once(self):
+        store = SnapshotStore(os.path.join(self.temp_dir.name, "snapshots"), max_bytes=1024)
+        prunes = []
+        prune = store._prune
+        store._prune = lambda: (prunes.append(1), prune())
+        large = self.write_profile("large.advavtr", 4096)
+
+        for _ in range(5):
+            store.capture([large], "Save")
+
+        self.assertEqual(len(prunes), 1)
+        self.assertEqual(len(store.list_snapshots()), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
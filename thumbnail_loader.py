@@ -0,0 +1,99 @@
+"""
+Thumbnail decoding on worker threads.
+
+Thumbnails are decoded with QImageReader at the size they are shown at, so
+the JPEG decoder can skip most of the work for large source images, and the
+decoding happens on a thread pool instead of the GUI thread. Decoded images
+are kept in a bounded LRU cache, and concurrent requests for the same
+thumbnail share one decode. Callers get the QImage through a callback on the
+GUI thread (a null QImage if the file is missing or unreadable) and show a
+placeholder until then.
+"""
+import logging
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QThread, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('THUMBNAIL_LOADER')
+
+
+def decode_thumbnail(path, size):
+    """Decode an image scaled to fit in size x size pixels; returns a null QImage on failure."""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid():
+        scaled_size = source_size.scaled(QSize(size, size), Qt.AspectRatioMode.KeepAspectRatio)
+        if scaled_size.width() < source_size.width():
+            reader.setScaledSize(scaled_size)
+    image = reader.read()
+    if image.isNull():
+        logger.info(f"Could not decode thumbnail {path}: {reader.errorString()}")
+    return image
+
+
+class _DecodeTask(QRunnable):
+    def __init__(self, loader, path, size):
+        super().__init__()
+        self.loader = loader
+        self.path = path
+        self.size = size
+
+    def run(self):
+        self.loader.image_decoded.emit(self.path, self.size, decode_thumbnail(self.path, self.size))
+
+
+class ThumbnailLoader(QObject):
+    """Decodes thumbnails in the background and caches the results."""
+    image_decoded = pyqtSignal(str, int, QImage)  # Emitted from the worker threads
+
+    def __init__(self, max_cached=2000, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QThread.idealThreadCount() // 2))
+        self.max_cached = max_cached
+        self.cache = OrderedDict()  # (path, size) -> QImage, least recently used first
+        self.pending = {}  # (path, size) -> callbacks waiting for the decode
+        self.image_decoded.connect(self.on_image_decoded)
+
+    def request(self, path, size, callback):
+        """Call callback(image) with the thumbnail at path scaled to size.
+
+        Called right away if the thumbnail is cached, otherwise once it is decoded.
+        """
+        key = (path, size)
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)
+            callback(image)
+            return
+        if key in self.pending:
+            self.pending[key].append(callback)
+            return
+        self.pending[key] = [callback]
+        self.pool.start(_DecodeTask(self, path, size))
+
+    def on_image_decoded(self, path, size, image):
+        key = (path, size)
+        if not image.isNull():  # Missing thumbnails may still be downloaded
+            self.cache[key] = image
+            while len(self.cache) > self.max_cached:
+                self.cache.popitem(last=False)
+        for callback in self.pending.pop(key, []):
+            try:
+                callback(image)
+            except RuntimeError:
+                pass  # The widget was deleted while the thumbnail was decoded
+
+    def invalidate(self, path):
+        """Forget the decoded images of a thumbnail that was replaced."""
+        for key in [key for key in self.cache if key[0] == path]:
+            del self.cache[key]
+
+    def shutdown(self):
+        """Drop queued decodes and wait for the running ones."""
+        self.pool.clear()
+        self.pool.waitForDone()